@@ -0,0 +1 @@
+"""Helpers shared by the portfolio's ETL projects."""
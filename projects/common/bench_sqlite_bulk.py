@@ -0,0 +1,94 @@
+"""
+Rows/sec of a chunked SQLite load with and without sqlite_bulk.bulk_load.
+
+Both runs load the same synthetic daily fact (date, entity, two measures,
+a label) into a fresh database file with a primary key and two secondary
+indexes, committing every --batch rows the way the chunked loaders do:
+
+- default: rollback journal, synchronous=FULL, indexes maintained row by row
+- bulk:    bulk_load(conn, defer_indexes=[table]) around the same inserts
+
+Usage: python bench_sqlite_bulk.py [--rows N] [--batch N] [--repeat N]
+"""
+import argparse
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.sqlite_bulk import bulk_load
+
+TABLE = "fact_bench_daily"
+DDL = f"""
+CREATE TABLE {TABLE} (
+    date_id INTEGER NOT NULL,
+    entity_id INTEGER NOT NULL,
+    amount REAL,
+    ratio REAL,
+    label TEXT,
+    PRIMARY KEY (date_id, entity_id)
+);
+CREATE INDEX ix_{TABLE}_entity_id ON {TABLE} (entity_id);
+CREATE INDEX ix_{TABLE}_label ON {TABLE} (label, amount);
+"""
+LABELS = ['Sunny', 'Cloudy', 'Rain', 'Snow', 'Heatwave', 'Typhoon']
+ENTITIES = 250
+
+def generate_rows(n_rows, seed=42):
+    rng = random.Random(seed)
+    return [
+        (20000101 + i // ENTITIES, i % ENTITIES, rng.random() * 1000, rng.random(), rng.choice(LABELS))
+        for i in range(n_rows)
+    ]
+
+def load(db_path, rows, batch, bulk):
+    conn = sqlite3.connect(db_path)
+    conn.executescript(DDL)
+    started = time.perf_counter()
+    if bulk:
+        with bulk_load(conn, defer_indexes=[TABLE]):
+            insert_batches(conn, rows, batch)
+    else:
+        insert_batches(conn, rows, batch)
+    elapsed = time.perf_counter() - started
+    count = conn.execute(f"SELECT COUNT(*) FROM {TABLE}").fetchone()[0]
+    conn.close()
+    assert count == len(rows), (count, len(rows))
+    return elapsed
+
+def insert_batches(conn, rows, batch):
+    for start in range(0, len(rows), batch):
+        conn.executemany(f"INSERT INTO {TABLE} VALUES (?, ?, ?, ?, ?)", rows[start:start + batch])
+        conn.commit()
+
+def run_benchmark(n_rows=500_000, batch=10_000, repeat=3):
+    rows = generate_rows(n_rows)
+    print(f"{n_rows:,} rows, commit every {batch:,}, median of {repeat}")
+    print(f"{'Mode':10} {'Seconds':>8} {'Rows/sec':>12}")
+    print("-" * 32)
+    results = {}
+    for mode in ('default', 'bulk'):
+        timings = []
+        for run in range(repeat):
+            with tempfile.TemporaryDirectory() as tmp:
+                timings.append(load(Path(tmp) / f"{mode}_{run}.db", rows, batch, mode == 'bulk'))
+        results[mode] = statistics.median(timings)
+        print(f"{mode:10} {results[mode]:8.2f} {n_rows / results[mode]:12,.0f}")
+    print("-" * 32)
+    print(f"Speedup: {results['default'] / results['bulk']:.1f}x")
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark chunked SQLite loads with and without bulk_load.")
+    parser.add_argument('--rows', type=int, default=500_000, help="Rows to load")
+    parser.add_argument('--batch', type=int, default=10_000, help="Rows per executemany + commit")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per mode (median reported)")
+    args = parser.parse_args(argv)
+    run_benchmark(args.rows, args.batch, args.repeat)
+
+if __name__ == "__main__":
+    main()
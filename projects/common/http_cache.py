@@ -0,0 +1,173 @@
+"""
+On-disk HTTP response cache shared by the ETL fetchers.
+
+CachedSession is a drop-in requests.Session that stores successful GET
+responses in SQLite, keyed by the full URL (query string included):
+
+- per-endpoint TTLs: the first (url substring, seconds) rule that matches wins
+- stale entries with an ETag/Last-Modified are revalidated with a
+  conditional request; a 304 refreshes the entry without re-downloading
+- the cache is bounded to max_bytes, evicting least recently used entries
+- hits, misses, revalidations, stores and evictions are counted in .stats
+
+Responses served from the cache without a request carry `from_cache = True`,
+so callers can skip their rate-limit sleeps for them. A 304 revalidation
+is a real round-trip, so its response carries `from_cache = False` like a
+download.
+"""
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_TTL = 24 * 3600  # Seconds
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS http_cache (
+    url TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_http_cache_accessed ON http_cache (accessed_at);
+"""
+
+
+class CachedSession(requests.Session):
+    """requests.Session with a SQLite-backed response cache for GET requests."""
+
+    def __init__(self, cache_path, ttl=DEFAULT_TTL, endpoint_ttls=(), max_bytes=DEFAULT_MAX_BYTES):
+        super().__init__()
+        Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.endpoint_ttls = list(endpoint_ttls)
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stores': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(cache_path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+    def ttl_for(self, url):
+        for pattern, seconds in self.endpoint_ttls:
+            if pattern in url:
+                return seconds
+        return self.ttl
+
+    def is_fresh(self, url):
+        """True when `url` would be served from the cache without a request."""
+        entry = self._lookup(url)
+        return entry is not None and time.time() - entry['stored_at'] < self.ttl_for(url)
+
+    def request(self, method, url, params=None, headers=None, **kwargs):
+        if method.upper() != 'GET':
+            return super().request(method, url, params=params, headers=headers, **kwargs)
+
+        key = requests.Request('GET', url, params=params).prepare().url
+        entry = self._lookup(key)
+        now = time.time()
+
+        if entry is not None and now - entry['stored_at'] < self.ttl_for(key):
+            self._count('hits')
+            self._touch(key, now)
+            return self._build_response(key, entry)
+
+        headers = dict(headers or {})
+        if entry is not None:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        response = super().request('GET', key, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            self._count('revalidated')
+            with self._lock, self._db:
+                self._db.execute(
+                    "UPDATE http_cache SET stored_at = ?, accessed_at = ? WHERE url = ?", (now, now, key)
+                )
+            return self._build_response(key, entry, from_cache=False)
+
+        self._count('misses')
+        response.from_cache = False
+        if response.status_code == 200:
+            self._store(key, response, now)
+        return response
+
+    def summary(self):
+        s = self.stats
+        return (f"cache: {s['hits']} hits, {s['misses']} misses, {s['revalidated']} revalidated, "
+                f"{s['stores']} stored, {s['evictions']} evicted")
+
+    def close(self):
+        super().close()
+        with self._lock:
+            self._db.close()
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _lookup(self, url):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, headers, body, etag, last_modified, stored_at FROM http_cache WHERE url = ?",
+                (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ('status', 'headers', 'body', 'etag', 'last_modified', 'stored_at')
+        return dict(zip(keys, row))
+
+    def _touch(self, url, now):
+        with self._lock, self._db:
+            self._db.execute("UPDATE http_cache SET accessed_at = ? WHERE url = ?", (now, url))
+
+    def _store(self, url, response, now):
+        body = response.content
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO http_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, response.status_code, json.dumps(dict(response.headers)), body,
+                 response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                 len(body), now, now)
+            )
+            self.stats['stores'] += 1
+            self._evict()
+
+    def _evict(self):
+        """Drops least recently used entries until the cache fits max_bytes (lock held)."""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM http_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute("SELECT url, size FROM http_cache ORDER BY accessed_at").fetchall()
+        doomed = []
+        for url, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append((url,))
+            total -= size
+        self._db.executemany("DELETE FROM http_cache WHERE url = ?", doomed)
+        self.stats['evictions'] += len(doomed)
+
+    @staticmethod
+    def _build_response(url, entry, from_cache=True):
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.headers = CaseInsensitiveDict(json.loads(entry['headers']))
+        response._content = entry['body']
+        response.url = url
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.reason = 'OK'
+        response.from_cache = from_cache
+        return response
@@ -0,0 +1,114 @@
+"""
+Bulk-load settings for the portfolio's SQLite warehouses.
+
+bulk_load(conn) wraps a rebuild or a large load on one connection:
+
+- journal_mode=WAL: commits append to the log instead of copying every
+  touched page to a rollback journal first
+- synchronous=OFF for rebuilds (a crash mid-load only loses tables that
+  are rebuilt from their raw files anyway), NORMAL for incremental loads
+- cache_size / mmap_size sized for the load, temp_store=MEMORY for the
+  sorts behind index builds
+- explicit indexes of the `defer_indexes` tables are dropped before the
+  load and recreated (then ANALYZEd) once after it succeeds, instead of
+  being maintained row by row
+
+On exit the WAL is checkpointed and the previous journal mode,
+synchronous, cache, mmap and temp store settings are restored, so the
+database is a single self-contained file again for its readers
+(including read-only connections).
+
+Usage:
+    with bulk_load(conn, defer_indexes=['fact_daily_performance']):
+        conn.executemany(...)
+        conn.commit()
+"""
+import sqlite3
+from contextlib import contextmanager
+
+DEFAULT_CACHE_MB = 256
+DEFAULT_MMAP_MB = 256
+
+# profile -> settings that differ between a rebuild and an incremental load
+PROFILES = {
+    'rebuild': {'synchronous': 'OFF'},
+    'incremental': {'synchronous': 'NORMAL'},
+}
+RESTORED_PRAGMAS = ('journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store')
+
+def pragma(conn, name, value=None):
+    """Reads a PRAGMA, or sets it and returns the value SQLite reports back."""
+    statement = f"PRAGMA {name}" if value is None else f"PRAGMA {name} = {value}"
+    row = conn.execute(statement).fetchone()
+    return row[0] if row else None
+
+def bulk_settings(profile='rebuild', cache_mb=DEFAULT_CACHE_MB, mmap_mb=DEFAULT_MMAP_MB):
+    return {
+        'journal_mode': 'WAL',
+        'cache_size': -int(cache_mb * 1024),  # Negative = KiB rather than pages
+        'mmap_size': int(mmap_mb * 2**20),
+        'temp_store': 'MEMORY',
+        **PROFILES[profile],
+    }
+
+def table_indexes(conn, table):
+    """(name, sql) of the explicit indexes on `table`; key and UNIQUE indexes have no SQL and stay."""
+    return conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+        (table,),
+    ).fetchall()
+
+def restore_indexes(conn, dropped):
+    """Recreates the dropped indexes that are still missing and whose table still exists."""
+    for name, table, sql in dropped:
+        # A loader that recreated its own tables may already have rebuilt the index
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (name,)).fetchone():
+            continue
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone():
+            conn.execute(sql)
+    conn.commit()
+
+@contextmanager
+def deferred_indexes(conn, tables):
+    """
+    Drops the explicit indexes of `tables` for the duration of the block,
+    then rebuilds and ANALYZEs them once. If the block raises, its work is
+    rolled back, the indexes are restored best-effort and the original
+    error propagates.
+    """
+    dropped = [(name, table, sql) for table in tables for name, sql in table_indexes(conn, table)]
+    for name, _, _ in dropped:
+        conn.execute(f'DROP INDEX "{name}"')
+    conn.commit()
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        try:
+            restore_indexes(conn, dropped)
+        except sqlite3.Error:
+            pass
+        raise
+    else:
+        conn.commit()
+        restore_indexes(conn, dropped)
+        for table in tables:
+            conn.execute(f'ANALYZE "{table}"')
+        conn.commit()
+
+@contextmanager
+def bulk_load(conn, profile='rebuild', cache_mb=DEFAULT_CACHE_MB, mmap_mb=DEFAULT_MMAP_MB, defer_indexes=()):
+    """Applies the bulk-load settings to `conn` for the block and restores the previous ones after."""
+    # journal_mode cannot change inside a transaction
+    conn.commit()
+    saved = {name: pragma(conn, name) for name in RESTORED_PRAGMAS}
+    for name, value in bulk_settings(profile, cache_mb, mmap_mb).items():
+        pragma(conn, name, value)
+    try:
+        with deferred_indexes(conn, defer_indexes):
+            yield conn
+    finally:
+        conn.commit()
+        # Leaving WAL checkpoints the log back into the main file
+        for name in RESTORED_PRAGMAS:
+            pragma(conn, name, saved[name])
@@ -1,11 +1,30 @@
+// Each chart lists the data sections it needs (see data/manifest.json)
+const CHARTS = [
+    { canvas: 'trendChart', sections: ['monthly_trend'], render: d => renderTrendChart(d.monthly_trend) },
+    { canvas: 'marketChart', sections: ['top_countries_2024'], render: d => renderMarketChart(d.top_countries_2024) },
+    { canvas: 'seasonalityChart', sections: ['seasonality'], render: d => renderSeasonalityChart(seasonalityByCountry(d.seasonality)) },
+    { canvas: 'fxChart', sections: ['fx_impact'], render: d => renderFXChart(d.fx_impact) },
+    { canvas: 'fxSensitivityChart', sections: ['fx_sensitivity'], render: d => renderFXSensitivityChart(d.fx_sensitivity) },
+    { canvas: 'weatherChart', sections: ['weather_risk'], render: d => renderWeatherChart(d.weather_risk) },
+    { canvas: 'flightsChart', sections: ['airport_capacity'], render: d => renderFlightsChart(d.airport_capacity) },
+    // NEW: Prescriptive analytics
+    { canvas: 'marketingChart', sections: ['marketing_recommendations'], render: d => renderMarketingChart(d.marketing_recommendations) },
+    { canvas: 'staffingChart', sections: ['staffing_forecast', 'demand_scenarios'], render: d => renderStaffingChart(d.staffing_forecast, d.demand_scenarios) },
+    { canvas: 'capacityChart', sections: ['capacity_health'], render: d => renderCapacityChart(d.capacity_health) }
+];
+const KPI_SECTIONS = ['monthly_trend', 'top_countries_2024'];
+// Section payload formats this page can decode (manifest.json "version")
+const FORMAT_VERSIONS = [1, 2];
+
 document.addEventListener('DOMContentLoaded', async () => {
     try {
-        const response = await fetch('data/dashboard_data.json');
-        if (!response.ok) {
-            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
-        }
-        const data = await response.json();
-        initDashboard(data);
+        const loadSections = await createSectionLoader();
+        const kpis = loadSections(KPI_SECTIONS).then(renderKPIs);
+        // Charts fetch their sections only when scrolled near the viewport
+        const charts = CHARTS.map(chart => whenVisible(chart.canvas)
+            .then(() => loadSections(chart.sections))
+            .then(chart.render));
+        await Promise.all([kpis, ...charts]);
     } catch (error) {
         const container = document.querySelector('.container');
         if (container) {
@@ -18,18 +37,76 @@ document.addEventListener('DOMContentLoaded', async () => {
     }
 });
 
-function initDashboard(data) {
-    renderKPIs(data);
-    renderTrendChart(data.monthly_trend);
-    renderMarketChart(data.top_countries_2024);
-    renderSeasonalityChart(data.seasonality);
-    renderFXChart(data.fx_impact);
-    renderWeatherChart(data.weather_risk);
-    renderFlightsChart(data.airport_capacity);
-    // NEW: Prescriptive analytics
-    renderMarketingChart(data.marketing_recommendations);
-    renderStaffingChart(data.staffing_forecast);
-    renderCapacityChart(data.capacity_health);
+async function fetchJSON(url, options) {
+    const response = await fetch(url, options);
+    if (!response.ok) {
+        throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+    }
+    return response.json();
+}
+
+// Format 2 columnar table -> array of records
+function decodeColumnar({ columns, values, dictionaries }) {
+    const decoded = columns.map((col, i) => dictionaries[col]
+        ? values[i].map(code => (code === null ? null : dictionaries[col][code]))
+        : values[i]);
+    const length = decoded.length ? decoded[0].length : 0;
+    return Array.from({ length }, (_, row) =>
+        Object.fromEntries(columns.map((col, i) => [col, decoded[i][row]])));
+}
+
+function decodeSection(encoding, payload) {
+    if (encoding === 'columnar') return decodeColumnar(payload);
+    return payload;  // 'records', or a 'matrix' consumed as is
+}
+
+// Returns loadSections(names) -> Promise<{name: data}>. Section files are
+// content-hashed and cached for good; only the small manifest is revalidated.
+// Falls back to the monolithic dashboard_data.json when there is no manifest
+// or its format version is unknown to this page.
+async function createSectionLoader() {
+    let manifest;
+    try {
+        manifest = await fetchJSON('data/manifest.json', { cache: 'no-cache' });
+        if (!FORMAT_VERSIONS.includes(manifest.version)) {
+            throw new Error(`Unsupported data format version ${manifest.version}`);
+        }
+    } catch (error) {
+        const data = fetchJSON('data/dashboard_data.json');
+        return async names => {
+            const all = await data;
+            return Object.fromEntries(names.map(name => [name, all[name]]));
+        };
+    }
+
+    const cache = new Map();
+    const loadSection = name => {
+        if (!cache.has(name)) {
+            const entry = manifest.sections[name];
+            cache.set(name, fetchJSON(`data/${entry.file}`)
+                .then(payload => decodeSection(entry.encoding || 'records', payload)));
+        }
+        return cache.get(name);
+    };
+    return async names => Object.fromEntries(
+        await Promise.all(names.map(async name => [name, await loadSection(name)]))
+    );
+}
+
+function whenVisible(canvasId) {
+    const element = document.getElementById(canvasId);
+    if (!element || !('IntersectionObserver' in window)) {
+        return Promise.resolve();
+    }
+    return new Promise(resolve => {
+        const observer = new IntersectionObserver(entries => {
+            if (entries.some(entry => entry.isIntersecting)) {
+                observer.disconnect();
+                resolve();
+            }
+        }, { rootMargin: '200px' });
+        observer.observe(element);
+    });
 }
 
 function renderKPIs(data) {
@@ -112,17 +189,30 @@ function renderMarketChart(marketData) {
     });
 }
 
-function renderSeasonalityChart(seasonalityData) {
-    const ctx = document.getElementById('seasonalityChart').getContext('2d');
-
-    // Aggregate by country and month
+// Seasonality as {country: [Jan..Dec avg visitors]}, from records or a country x month matrix
+function seasonalityByCountry(seasonalityData) {
     const countryMonthMap = {};
-    seasonalityData.forEach(d => {
-        if (!countryMonthMap[d.country_name_en]) {
-            countryMonthMap[d.country_name_en] = Array(12).fill(0);
-        }
-        countryMonthMap[d.country_name_en][d.month - 1] = d.avg_visitors;
+    if (Array.isArray(seasonalityData)) {
+        seasonalityData.forEach(d => {
+            if (!countryMonthMap[d.country_name_en]) {
+                countryMonthMap[d.country_name_en] = Array(12).fill(0);
+            }
+            countryMonthMap[d.country_name_en][d.month - 1] = d.avg_visitors;
+        });
+        return countryMonthMap;
+    }
+    const { rows, cols, values } = seasonalityData;
+    rows.forEach((country, i) => {
+        countryMonthMap[country] = Array(12).fill(0);
+        cols.forEach((month, j) => {
+            if (values[i][j] !== null) countryMonthMap[country][month - 1] = values[i][j];
+        });
     });
+    return countryMonthMap;
+}
+
+function renderSeasonalityChart(countryMonthMap) {
+    const ctx = document.getElementById('seasonalityChart').getContext('2d');
 
     // Pick top 5 markets by total visitors
     const topCountries = Object.entries(countryMonthMap)
@@ -230,18 +320,86 @@ function renderFXChart(fxData) {
     });
 }
 
+// Lagged FX-arrivals correlations of one market against every currency, picked from a select
+function renderFXSensitivityChart(sensitivityData) {
+    const canvas = document.getElementById('fxSensitivityChart');
+    const select = document.getElementById('fxMarketSelect');
+    // Data exported before 33_build_fx_correlations.py has no such section
+    if (!sensitivityData || sensitivityData.length === 0) {
+        select.hidden = true;
+        const empty = document.createElement('p');
+        empty.className = 'chart-empty';
+        empty.textContent = 'FX sensitivity data is not available in this export.';
+        canvas.replaceWith(empty);
+        return;
+    }
+    const ctx = canvas.getContext('2d');
+
+    // {country: {currency: {home, correlation: [lag 0..N]}}}
+    const byMarket = {};
+    sensitivityData.forEach(d => {
+        const market = byMarket[d.country_name_en] ??= {};
+        const currency = market[d.currency_code] ??= { home: Boolean(d.is_home_currency), correlation: [] };
+        currency.correlation[d.lag_months] = d.correlation;
+    });
+    const markets = Object.keys(byMarket).sort();
+    const lags = Math.max(...sensitivityData.map(d => d.lag_months)) + 1;
+    select.replaceChildren(...markets.map(name => new Option(name, name)));
+
+    const datasetsFor = market => Object.entries(byMarket[market]).map(([code, currency]) => ({
+        label: currency.home ? `${code} (home)` : code,
+        data: currency.correlation,
+        backgroundColor: currency.home ? '#e60012' : 'rgba(127, 140, 141, 0.45)'
+    }));
+
+    const chart = new Chart(ctx, {
+        type: 'bar',
+        data: {
+            labels: Array.from({ length: lags }, (_, lag) => lag === 0 ? 'Same month' : `${lag}m earlier`),
+            datasets: datasetsFor(markets[0])
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            scales: {
+                y: { suggestedMin: -0.5, suggestedMax: 0.5, title: { display: true, text: 'Correlation' } }
+            },
+            plugins: { legend: { position: 'bottom' } }
+        }
+    });
+
+    select.addEventListener('change', () => {
+        chart.data.datasets = datasetsFor(select.value);
+        chart.update();
+    });
+}
+
+// Every city arrives in one section; a select switches between them (Tokyo first)
 function renderWeatherChart(weatherData) {
     const ctx = document.getElementById('weatherChart').getContext('2d');
+    const select = document.getElementById('weatherCitySelect');
 
     // Filter last 2 years for clarity
     const recentData = weatherData.filter(d => d.year >= 2023);
-
-    const labels = recentData.map(d => `${d.year}-${String(d.month).padStart(2, '0')}`);
-    const temp = recentData.map(d => d.avg_max_temp);
-    const heatwave = recentData.map(d => d.heatwave_days);
-    const rain = recentData.map(d => d.rainy_days);
-
-    new Chart(ctx, {
+    // Older exports carry a single (Tokyo) series without city_name: chart it as is, no selector
+    const byCity = recentData.some(d => d.city_name !== undefined);
+    const cities = byCity
+        ? [...new Set(recentData.map(d => d.city_name))].sort((a, b) => (b === 'Tokyo') - (a === 'Tokyo'))
+        : [];
+    select.hidden = !byCity;
+    select.replaceChildren(...cities.map(name => new Option(name, name)));
+
+    const cityData = city => byCity ? recentData.filter(d => d.city_name === city) : recentData;
+    const seriesFor = rows => [
+        rows.map(d => d.avg_max_temp),
+        rows.map(d => d.heatwave_days),
+        rows.map(d => d.rainy_days)
+    ];
+    const rows = cityData(cities[0]);
+    const labels = rows.map(d => `${d.year}-${String(d.month).padStart(2, '0')}`);
+    const [temp, heatwave, rain] = seriesFor(rows);
+
+    const chart = new Chart(ctx, {
         type: 'bar',
         data: {
             labels: labels,
@@ -293,6 +451,11 @@ function renderWeatherChart(weatherData) {
             }
         }
     });
+
+    select.addEventListener('change', () => {
+        seriesFor(cityData(select.value)).forEach((data, i) => { chart.data.datasets[i].data = data; });
+        chart.update();
+    });
 }
 
 function renderFlightsChart(flightsData) {
@@ -376,13 +539,43 @@ function renderMarketingChart(marketingData) {
 }
 
 // NEW: Staffing Forecast Chart
-function renderStaffingChart(staffingData) {
+function renderStaffingChart(staffingData, scenarioData) {
     const ctx = document.getElementById('staffingChart').getContext('2d');
 
     const monthNames = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'];
     const labels = staffingData.map(d => monthNames[d.month - 1]);
     const projectedVisitors = staffingData.map(d => d.projected_visitors);
     const recommendedStaff = staffingData.map(d => d.recommended_staff);
+    // Simulated 10th-90th percentile demand for the same months (national total), when exported
+    const band = new Map((scenarioData || [])
+        .filter(d => d.country_name_en === 'All markets')
+        .map(d => [`${d.year}-${d.month}`, d]));
+    const scenarioLow = staffingData.map(d => band.get(`${d.year}-${d.month}`)?.visitors_p10 ?? null);
+    const scenarioHigh = staffingData.map(d => band.get(`${d.year}-${d.month}`)?.visitors_p90 ?? null);
+    const scenarioDatasets = band.size === 0 ? [] : [
+        {
+            label: 'Scenario P10',
+            data: scenarioLow,
+            borderColor: '#7f8c8d',
+            borderDash: [4, 4],
+            pointRadius: 0,
+            type: 'line',
+            yAxisID: 'y',
+            order: 0
+        },
+        {
+            label: 'Scenario P90',
+            data: scenarioHigh,
+            borderColor: '#7f8c8d',
+            backgroundColor: 'rgba(127, 140, 141, 0.15)',
+            borderDash: [4, 4],
+            pointRadius: 0,
+            fill: '-1',
+            type: 'line',
+            yAxisID: 'y',
+            order: 0
+        }
+    ];
 
     new Chart(ctx, {
         type: 'bar',
@@ -405,7 +598,8 @@ function renderStaffingChart(staffingData) {
                     yAxisID: 'y1',
                     order: 1,
                     tension: 0.4
-                }
+                },
+                ...scenarioDatasets
             ]
         },
         options: {
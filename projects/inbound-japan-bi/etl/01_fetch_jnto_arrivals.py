@@ -1,102 +1,152 @@
+import argparse
 import pandas as pd
-import os
 import numpy as np
-from datetime import datetime, timedelta
 from pathlib import Path
 
+from staging import FORMATS, raw_exists, write_frame
+
 # Configuration - cross-platform path resolution
 RAW_DIR = Path(__file__).parent.parent / "data" / "raw"
 OUTPUT_FILE = RAW_DIR / "jnto_arrivals.csv"
+START_MONTH = "2019-01"
+END_MONTH = "2025-11"  # Through November 2025
+
+# Monthly multipliers (Jan..Dec) referenced by the country table
+SEASONALITY_PROFILES = {
+    # Cherry blossom / Autumn peaks, summer bump, quieter winter
+    'standard': [0.9, 0.9, 1.0, 1.3, 1.0, 1.0, 1.0, 1.1, 1.0, 1.0, 1.3, 1.0],
+    # Ski markets peaking in Jan-Feb
+    'ski': [1.4, 1.3, 1.1, 1.0, 0.8, 0.8, 0.9, 0.9, 0.8, 0.9, 1.0, 1.3],
+    # School-holiday driven summer peak
+    'summer': [0.8, 0.8, 0.9, 1.1, 1.0, 1.0, 1.3, 1.4, 1.0, 0.9, 1.0, 0.9],
+    'flat': [1.0] * 12,
+}
+
+# Pluggable country table: base monthly volume, macro region, seasonality profile
+COUNTRIES = pd.DataFrame([
+    ('South Korea', 'East Asia', 500000, 'standard'),
+    ('China', 'East Asia', 500000, 'standard'),
+    ('Taiwan', 'East Asia', 500000, 'standard'),
+    ('Hong Kong', 'East Asia', 150000, 'standard'),
+    ('Thailand', 'Southeast Asia', 150000, 'standard'),
+    ('United States', 'North America', 150000, 'standard'),
+    ('Australia', 'Oceania', 50000, 'standard'),
+    ('United Kingdom', 'Europe', 50000, 'standard'),
+    ('France', 'Europe', 50000, 'standard'),
+    ('Germany', 'Europe', 50000, 'standard'),
+    ('Vietnam', 'Southeast Asia', 50000, 'standard'),
+    ('Philippines', 'Southeast Asia', 50000, 'standard'),
+    ('Singapore', 'Southeast Asia', 50000, 'standard'),
+    ('Malaysia', 'Southeast Asia', 50000, 'standard'),
+    ('Indonesia', 'Southeast Asia', 50000, 'standard'),
+    ('Canada', 'North America', 50000, 'standard'),
+    ('Italy', 'Europe', 50000, 'standard'),
+    ('Spain', 'Europe', 50000, 'standard'),
+    ('Russia', 'Europe', 50000, 'standard'),
+    ('India', 'South Asia', 50000, 'standard'),
+], columns=['country', 'region', 'base_volume', 'seasonality_profile'])
 
 def ensure_directories():
     RAW_DIR.mkdir(parents=True, exist_ok=True)
 
-def generate_mock_data():
+def load_country_table(path=None, n_markets=None, rng=None):
+    """
+    Returns the country table used by the generator.
+    `path` replaces COUNTRIES with a CSV of the same columns; `n_markets`
+    pads the table with synthetic long-tail markets for scale testing.
+    """
+    table = pd.read_csv(path) if path else COUNTRIES.copy()
+    unknown = set(table['seasonality_profile']) - set(SEASONALITY_PROFILES)
+    if unknown:
+        raise ValueError(f"Unknown seasonality profile(s): {sorted(unknown)}")
+
+    if n_markets is None:
+        return table
+    if n_markets <= len(table):
+        return table.head(n_markets)
+
+    rng = rng if rng is not None else np.random.default_rng()
+    n_extra = n_markets - len(table)
+    regions = table['region'].unique()
+    synthetic = pd.DataFrame({
+        'country': [f"Market {i:03d}" for i in range(len(table) + 1, n_markets + 1)],
+        'region': rng.choice(regions, n_extra),
+        'base_volume': np.round(rng.lognormal(np.log(8000), 1.0, n_extra)).astype(int),
+        'seasonality_profile': rng.choice(list(SEASONALITY_PROFILES), n_extra),
+    })
+    return pd.concat([table, synthetic], ignore_index=True)
+
+def covid_factor(years, months):
+    """COVID impact per month (vectorized)."""
+    factor = np.ones(len(years))
+    factor[(years >= 2020) & (years <= 2022)] = 0.01  # Borders closed
+    factor[(years == 2020) & (months < 3)] = 1.0
+    factor[(years == 2022) & (months > 9)] = 0.3  # Reopening
+    recovery = years >= 2023
+    factor[recovery] = 0.8 + (0.05 * (years[recovery] - 2023))  # Recovery
+    return factor
+
+def simulate_arrivals(periods, countries, rng):
+    """Returns the (n_months, n_countries) visitor arrivals grid."""
+    years = periods.year.to_numpy()
+    months = periods.month.to_numpy()
+
+    profiles = np.array([SEASONALITY_PROFILES[p] for p in countries['seasonality_profile']])  # (countries, 12)
+    seasonality = profiles[:, months - 1].T  # (months, countries)
+    base = countries['base_volume'].to_numpy(dtype=float)
+    variation = rng.uniform(0.9, 1.1, seasonality.shape)  # Random variation
+
+    return (base * seasonality * covid_factor(years, months)[:, None] * variation).astype(np.int64)
+
+def generate_mock_data(start_month=START_MONTH, end_month=END_MONTH, countries=None,
+                       rng=None, output_file=OUTPUT_FILE, fmt='csv'):
     """
     Generates a realistic mock dataset for JNTO visitor arrivals
     if the official CSV is not present (since JNTO requires form submission).
     """
     print("⚠️  Official JNTO CSV not found. Generating realistic mock data...")
-    
-    countries = [
-        'South Korea', 'China', 'Taiwan', 'Hong Kong', 'Thailand', 
-        'United States', 'Australia', 'United Kingdom', 'France', 'Germany',
-        'Vietnam', 'Philippines', 'Singapore', 'Malaysia', 'Indonesia',
-        'Canada', 'Italy', 'Spain', 'Russia', 'India'
-    ]
-    
-    # Generate monthly data from Jan 2019 to Nov 2025 (current)
-    start_date = datetime(2019, 1, 1)
-    end_date = datetime(2025, 11, 1)  # Through November 2025
-    
-    records = []
-    current_date = start_date
-    
-    while current_date <= end_date:
-        month_str = current_date.strftime("%Y-%m")
-        year = current_date.year
-        month = current_date.month
-        
-        for country in countries:
-            # Base volume depending on country size (approximate)
-            if country in ['South Korea', 'China', 'Taiwan']:
-                base = 500000
-            elif country in ['United States', 'Hong Kong', 'Thailand']:
-                base = 150000
-            else:
-                base = 50000
-            
-            # Seasonality factor (simplified)
-            seasonality = 1.0
-            if month in [4, 11]: # Cherry blossom / Autumn
-                seasonality = 1.3
-            elif month in [8]: # Summer
-                seasonality = 1.1
-            elif month in [1, 2]: # Winter (ski)
-                seasonality = 0.9
-            
-            # COVID impact (simplified)
-            covid_factor = 1.0
-            if 2020 <= year <= 2022:
-                if year == 2020 and month < 3:
-                    covid_factor = 1.0
-                elif year == 2022 and month > 9:
-                    covid_factor = 0.3 # Reopening
-                else:
-                    covid_factor = 0.01 # Borders closed
-            elif year >= 2023:
-                covid_factor = 0.8 + (0.05 * (year - 2023)) # Recovery
-            
-            # Random variation
-            variation = np.random.uniform(0.9, 1.1)
-            
-            visitors = int(base * seasonality * covid_factor * variation)
-            
-            records.append({
-                'Year': year,
-                'Month': month,
-                'Country': country,
-                'Visitor Arrivals': visitors
-            })
-        
-        # Move to next month
-        if current_date.month == 12:
-            current_date = datetime(current_date.year + 1, 1, 1)
-        else:
-            current_date = datetime(current_date.year, current_date.month + 1, 1)
-            
-    df = pd.DataFrame(records)
-    df.to_csv(OUTPUT_FILE, index=False)
-    print(f"✅ Mock data generated at: {OUTPUT_FILE}")
+
+    rng = rng if rng is not None else np.random.default_rng()
+    countries = countries if countries is not None else load_country_table()
+    periods = pd.period_range(start=start_month, end=end_month, freq='M')
+    visitors = simulate_arrivals(periods, countries, rng)
+
+    n_countries = len(countries)
+    df = pd.DataFrame({
+        'Year': np.repeat(periods.year.to_numpy(), n_countries),
+        'Month': np.repeat(periods.month.to_numpy(), n_countries),
+        'Country': np.tile(countries['country'].to_numpy(), len(periods)),
+        'Region': np.tile(countries['region'].to_numpy(), len(periods)),
+        'Visitor Arrivals': visitors.ravel()
+    })
+    output_file = write_frame(df, output_file, fmt)
+    print(f"✅ Mock data generated at: {output_file} "
+          f"({len(df)} rows: {len(periods)} months x {n_countries} markets)")
     print("ℹ️  To use real data, download 'Visitor Arrivals' CSV from JNTO website and overwrite this file.")
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch or generate JNTO visitor arrivals.")
+    parser.add_argument('--start', default=START_MONTH, help="First month (YYYY-MM)")
+    parser.add_argument('--end', default=END_MONTH, help="Last month (YYYY-MM)")
+    parser.add_argument('--countries-file', type=Path, default=None,
+                        help="CSV with country, region, base_volume, seasonality_profile")
+    parser.add_argument('--markets', type=int, default=None,
+                        help="Total number of source markets (pads with synthetic markets)")
+    parser.add_argument('--seed', type=int, default=None, help="Seed for reproducible output")
+    parser.add_argument('--output', type=Path, default=OUTPUT_FILE, help="CSV destination")
+    parser.add_argument('--format', choices=FORMATS, default='csv',
+                        help="csv, or a typed staged sibling (feather / npy)")
+    parser.add_argument('--force', action='store_true', help="Regenerate even if the CSV exists")
+    args = parser.parse_args(argv)
+
     ensure_directories()
-    
-    if OUTPUT_FILE.exists():
-        print(f"✅ Found existing data at: {OUTPUT_FILE}")
+
+    if raw_exists(args.output) and not args.force:
+        print(f"✅ Found existing data at: {args.output}")
     else:
-        generate_mock_data()
+        rng = np.random.default_rng(args.seed)
+        countries = load_country_table(args.countries_file, args.markets, rng)
+        generate_mock_data(args.start, args.end, countries, rng, args.output, args.format)
 
 if __name__ == "__main__":
     main()
@@ -1,10 +1,19 @@
+import argparse
 import requests
+import numpy as np
 import pandas as pd
 import os
+import sys
 from datetime import datetime, timedelta
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common.http_cache import CachedSession
+from staging import FORMATS, write_frame
+
 # Config - cross-platform path resolution
 RAW_DIR = Path(__file__).parent.parent / "data" / "raw"
 OUTPUT_FILE = os.path.join(RAW_DIR, "fx_rates.csv")
@@ -20,85 +29,299 @@ CURRENCIES_TO_FETCH = ['USD', 'EUR', 'KRW', 'CNY', 'AUD', 'THB']
 START_DATE = "2019-01-01"
 # END_DATE = datetime.now().strftime("%Y-%m-%d")
 
+API_BASE_URL = "https://api.frankfurter.app"
+REQUEST_TIMEOUT = 15
+MAX_IN_FLIGHT = 1  # Concurrent requests; raise for large currency lists
+REQUESTS_PER_SECOND = 2.0  # Polite ceiling shared by all workers
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5  # Seconds, doubled on each retry
+BULK_BATCH_SIZE = 30  # Currencies per from=JPY request in bulk mode
+CACHE_FILE = Path(__file__).parent.parent / "data" / "cache" / "http_cache.sqlite"
+CACHE_TTL = 6 * 3600  # Open-ended ranges gain a new day at most daily
+
 def ensure_directories():
     if not os.path.exists(RAW_DIR):
         os.makedirs(RAW_DIR)
 
-def fetch_rates():
+class RateLimiter:
+    """Spaces request starts at least 1/rate seconds apart, across threads."""
+
+    def __init__(self, rate_per_sec):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+def create_session(pool_size, use_cache=True):
+    """Keep-alive (optionally cached) session whose pool can serve every worker."""
+    session = CachedSession(CACHE_FILE, ttl=CACHE_TTL) if use_cache else requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max(pool_size, 1))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def get_rates_json(session, limiter, url):
+    """
+    GETs one Frankfurter time series, retrying transient failures
+    (connection errors, 429, 5xx) with exponential backoff.
+    Returns the 'rates' mapping; raises the last error once retries run out.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        if not (isinstance(session, CachedSession) and session.is_fresh(url)):
+            limiter.wait()  # Be nice to API
+        try:
+            response = session.get(url, timeout=REQUEST_TIMEOUT)
+            if response.status_code == 429 or response.status_code >= 500:
+                raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+            response.raise_for_status()
+            return response.json().get('rates', {})
+        except requests.RequestException as e:
+            retryable = e.response is None or e.response.status_code == 429 or e.response.status_code >= 500
+            if not retryable or attempt == MAX_RETRIES:
+                raise
+            time.sleep(RETRY_BACKOFF * 2 ** attempt)
+
+def fetch_currency(session, limiter, currency, start_date, base_url=API_BASE_URL):
+    """Fetches one currency quoted directly in JPY. Returns {currency: records}."""
+    # We want: How much JPY is 1 Unit of Currency? (e.g. 150 JPY = 1 USD)
+    # API: https://api.frankfurter.app/2019-01-01..?from=USD&to=JPY
+    url = f"{base_url}/{start_date}..?from={currency}&to=JPY"
+    rates = get_rates_json(session, limiter, url)
+    return {currency: [
+        {'date': date_str, 'base_currency': currency, 'target_currency': 'JPY', 'rate': rate_dict['JPY']}
+        for date_str, rate_dict in rates.items() if rate_dict.get('JPY')
+    ]}
+
+def fetch_currency_batch(session, limiter, currencies, start_date, base_url=API_BASE_URL):
+    """
+    Fetches many currencies in one request quoted from JPY
+    (from=JPY&to=USD,EUR,...) and inverts them to JPY per currency.
+    Returns {currency: records}.
+    """
+    url = f"{base_url}/{start_date}..?from={BASE_CURRENCY}&to={','.join(currencies)}"
+    rates = get_rates_json(session, limiter, url)
+    jpy_per_currency = invert_rates(rates, currencies)
+    return {
+        currency: [
+            {'date': date_str, 'base_currency': currency, 'target_currency': 'JPY', 'rate': rate}
+            for date_str, rate in series.dropna().items()
+        ]
+        for currency, series in jpy_per_currency.items()
+    }
+
+def invert_rates(rates, currencies):
+    """
+    Turns a {date: {currency: units per JPY}} payload into a date x currency
+    frame of JPY per unit of currency, rounded to 6 significant digits.
+    Missing or zero quotes become NaN.
+    """
+    frame = pd.DataFrame.from_dict(rates, orient='index').reindex(columns=currencies)
+    values = frame.to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inverted = np.where(values > 0, 1.0 / values, np.nan)
+        scale = 10.0 ** (5 - np.floor(np.log10(inverted)))
+        inverted = np.rint(inverted * scale) / scale
+    return pd.DataFrame(inverted, index=frame.index, columns=currencies)
+
+def last_stored_dates(path=OUTPUT_FILE):
+    """Latest date already in fx_rates.csv per currency ({} if no file)."""
+    if not os.path.exists(path):
+        return {}
+    stored = pd.read_csv(path, usecols=['date', 'base_currency'])
+    return stored.groupby('base_currency')['date'].max().to_dict()
+
+def fetch_rates(currencies=None, start_date=START_DATE, max_in_flight=1,
+                rate_per_sec=REQUESTS_PER_SECOND, base_url=API_BASE_URL, incremental=False,
+                bulk=False, use_cache=True):
+    """Fetches and stores the rates; False when an incremental run could not fetch anything."""
     print("⏳ Fetching FX rates from Frankfurter API...")
     
-    all_data = []
-    
-    for currency in CURRENCIES_TO_FETCH:
-        try:
-            # We want: How much JPY is 1 Unit of Currency? (e.g. 150 JPY = 1 USD)
-            # API: https://api.frankfurter.app/2019-01-01..?from=USD&to=JPY
-            url = f"https://api.frankfurter.app/{START_DATE}..?from={currency}&to=JPY"
-            print(f"   Fetching {currency} -> JPY...")
-            
-            response = requests.get(url, timeout=15)
-            if response.status_code == 200:
-                data = response.json()
-                rates = data.get('rates', {})
-                
-                for date_str, rate_dict in rates.items():
-                    val = rate_dict.get('JPY')
-                    if val:
-                        all_data.append({
-                            'date': date_str,
-                            'base_currency': currency,
-                            'target_currency': 'JPY',
-                            'rate': val
-                        })
-            else:
-                print(f"❌ Failed to fetch {currency}: {response.status_code}")
-            
-            time.sleep(0.5) # Be nice to API
-            
-        except Exception as e:
-            print(f"❌ Error fetching {currency}: {e}")
+    currencies = currencies or CURRENCIES_TO_FETCH
+    started = time.perf_counter()
+
+    # Incremental: request only the days after the last stored date per currency
+    last_dates = last_stored_dates() if incremental else {}
+    today = datetime.now().strftime("%Y-%m-%d")
+    start_dates = {}
+    for currency in currencies:
+        last = last_dates.get(currency)
+        next_date = (pd.Timestamp(last) + timedelta(days=1)).strftime("%Y-%m-%d") if last else start_date
+        if next_date <= today:
+            start_dates[currency] = next_date
+    if incremental:
+        print(f"   Incremental: {len(start_dates)}/{len(currencies)} currencies have missing days")
+        if not start_dates:
+            print("✅ FX rates already up to date")
+            return True
+
+    limiter = RateLimiter(rate_per_sec)
+    results, failed = {}, {}
+
+    # Bulk: one request per batch of currencies, from the batch's earliest start
+    if bulk:
+        pending = list(start_dates)
+        jobs = [
+            (fetch_currency_batch, batch, min(start_dates[c] for c in batch))
+            for batch in (pending[i:i + BULK_BATCH_SIZE] for i in range(0, len(pending), BULK_BATCH_SIZE))
+        ]
+    else:
+        jobs = [(fetch_currency, [currency], start) for currency, start in start_dates.items()]
+
+    with create_session(max_in_flight, use_cache) as session, ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        futures = {
+            pool.submit(job, session, limiter, batch if bulk else batch[0], start, base_url): batch
+            for job, batch, start in jobs
+        }
+        for future in as_completed(futures):
+            batch = futures[future]
+            try:
+                for currency, records in future.result().items():
+                    results[currency] = records
+                    print(f"   Fetched {currency} -> JPY ({len(records)} rates)")
+            except Exception as e:
+                for currency in batch:
+                    failed[currency] = e
+                print(f"❌ Error fetching {', '.join(batch)}: {e}")
+        if use_cache:
+            print(f"   {session.summary()}")
+
+    all_data = [record for currency in currencies for record in results.get(currency, [])]
+    elapsed = time.perf_counter() - started
+    print(f"   {len(results)}/{len(start_dates)} currencies in {elapsed:.1f}s "
+          f"({len(jobs)} requests, {max_in_flight} in flight, {rate_per_sec or 'unlimited'} req/s)")
+    if failed:
+        print(f"⚠️ Failed after {MAX_RETRIES} retries: {', '.join(failed)}")
+
+    if incremental and last_dates:
+        if not results:
+            print(f"❌ Every FX fetch failed; {OUTPUT_FILE} left unchanged")
+            return False
+        append_new_rates(all_data, last_dates, failed)
+        return True
 
     if not all_data:
         print("⚠️ No data fetched. Generating mock data instead.")
-        generate_mock_fx_data()
-        return
+        generate_mock_fx_data(currencies, start_date)
+        return True
 
     df = pd.DataFrame(all_data)
     df.to_csv(OUTPUT_FILE, index=False)
     print(f"✅ FX rates saved to: {OUTPUT_FILE} ({len(df)} rows)")
+    return True
+
+def append_new_rates(records, last_dates, failed=()):
+    """Appends only rows newer than the stored history of their currency."""
+    df = pd.DataFrame(records, columns=['date', 'base_currency', 'target_currency', 'rate'])
+    # The API snaps a range start back to the previous business day, so
+    # drop anything already stored.
+    stored_until = df['base_currency'].map(last_dates).fillna("")
+    df = df[df['date'] > stored_until]
+    if df.empty:
+        if failed:
+            print(f"⚠️ No new FX rates for the fetched currencies; {', '.join(failed)} not updated")
+        else:
+            print("✅ FX rates already up to date")
+        return
+    df.to_csv(OUTPUT_FILE, mode='a', header=False, index=False)
+    print(f"✅ FX rates appended to: {OUTPUT_FILE} ({len(df)} new rows)")
+
+# Mock FX simulator: geometric random walk with piecewise drift regimes
+MOCK_SEED = 2019
+MOCK_BASE_RATES = {'USD': 110, 'EUR': 120, 'KRW': 0.09, 'CNY': 15, 'AUD': 80, 'THB': 3.5}  # JPY per unit
+MOCK_VOLATILITY = 0.08  # Annualized
+# (regime start, annualized drift of JPY per currency); positive = yen weakening
+DRIFT_REGIMES = [
+    ("2019-01-01", 0.0),
+    ("2022-01-01", 0.15),  # Yen weakens sharply from 2022
+    ("2024-07-01", -0.02),  # Partial rebound after the 2024 lows
+]
+
+def mock_base_rate(currency, seed=MOCK_SEED):
+    """Starting JPY rate; currencies outside MOCK_BASE_RATES get a seeded pseudo-rate."""
+    if currency in MOCK_BASE_RATES:
+        return MOCK_BASE_RATES[currency]
+    rng = np.random.default_rng([seed, *currency.encode('ascii')])
+    return round(float(np.exp(rng.uniform(np.log(0.01), np.log(200)))), 4)
 
-def generate_mock_fx_data():
-    # Fallback if API fails
+def simulate_fx_paths(dates, currencies, seed=MOCK_SEED, regimes=DRIFT_REGIMES, volatility=MOCK_VOLATILITY):
+    """
+    Returns the (n_dates, n_currencies) matrix of JPY per currency.
+    Each currency draws from its own stream seeded by (seed, currency code),
+    so adding or removing currencies never changes the other paths.
+    """
+    dt = 1 / 365
+    regime_starts = pd.to_datetime([start for start, _ in regimes])
+    drifts = np.array([drift for _, drift in regimes])
+    regime = np.clip(regime_starts.searchsorted(dates, side='right') - 1, 0, None)
+    drift_per_day = (drifts[regime] - 0.5 * volatility ** 2) * dt
+
+    shocks = np.column_stack([
+        np.random.default_rng([seed, *c.encode('ascii')]).standard_normal(len(dates))
+        for c in currencies
+    ]) * volatility * np.sqrt(dt)
+    log_returns = drift_per_day[:, None] + shocks
+    log_returns[0] = 0.0  # Path starts at the base rate
+
+    base = np.array([mock_base_rate(c, seed) for c in currencies])
+    return base * np.exp(np.cumsum(log_returns, axis=0))
+
+def generate_mock_fx_data(currencies=None, start_date=START_DATE, end_date=None,
+                          seed=MOCK_SEED, output_file=OUTPUT_FILE, fmt='csv'):
+    # Fallback if API fails; identical seed and range give byte-identical CSVs
     print("⚠️ Generating mock FX data...")
-    dates = pd.date_range(start=START_DATE, end=datetime.now())
-    records = []
-    
-    # Base rates approx
-    bases = {'USD': 110, 'EUR': 120, 'KRW': 0.09, 'CNY': 15, 'AUD': 80, 'THB': 3.5}
-    
-    for d in dates:
-        date_str = d.strftime("%Y-%m-%d")
-        # Trend: Yen gets weaker (rate goes UP) over time, esp 2022-2024
-        trend_factor = 1.0
-        if d.year >= 2022:
-            trend_factor = 1.0 + (0.0005 * (d - datetime(2022,1,1)).days) # Linear weakening
-            
-        for curr, base_rate in bases.items():
-            rate = base_rate * trend_factor * (1 + (hash(date_str + curr) % 100 / 1000.0)) # Noise
-            records.append({
-                'date': date_str,
-                'base_currency': curr,
-                'target_currency': 'JPY',
-                'rate': rate
-            })
-            
-    df = pd.DataFrame(records)
-    df.to_csv(OUTPUT_FILE, index=False)
-    print(f"✅ Mock FX rates saved to: {OUTPUT_FILE}")
+    currencies = currencies or CURRENCIES_TO_FETCH
+    dates = pd.date_range(start=start_date, end=end_date or datetime.now().strftime("%Y-%m-%d"))
+    rates = simulate_fx_paths(dates, currencies, seed)
+
+    df = pd.DataFrame({
+        'date': np.repeat(dates.to_numpy(), len(currencies)),  # Midnight datetimes write as YYYY-MM-DD
+        'base_currency': np.tile(currencies, len(dates)),
+        'target_currency': 'JPY',
+        'rate': np.round(rates.ravel(), 6)
+    })
+    output_file = write_frame(df, output_file, fmt)
+    print(f"✅ Mock FX rates saved to: {output_file} ({len(df)} rows)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch daily FX rates (JPY per currency).")
+    parser.add_argument('--mock', action='store_true', help="Skip the API and simulate rates")
+    parser.add_argument('--seed', type=int, default=MOCK_SEED, help="Seed for the mock simulator")
+    parser.add_argument('--currencies', default=",".join(CURRENCIES_TO_FETCH),
+                        help="Comma-separated currency codes")
+    parser.add_argument('--start', default=START_DATE, help="First date (YYYY-MM-DD)")
+    parser.add_argument('--max-in-flight', type=int, default=MAX_IN_FLIGHT,
+                        help="Concurrent API requests")
+    parser.add_argument('--rate', type=float, default=REQUESTS_PER_SECOND,
+                        help="Max requests per second across workers (0 = unlimited)")
+    parser.add_argument('--base-url', default=API_BASE_URL,
+                        help="API root, e.g. a local stand-in server for load tests")
+    parser.add_argument('--bulk', action='store_true',
+                        help="Fetch many currencies per request (from=JPY) and invert the rates")
+    parser.add_argument('--no-cache', action='store_true', help="Bypass the on-disk HTTP cache")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Fetch and append only days missing from fx_rates.csv")
+    parser.add_argument('--end', default=None, help="Last date of mock data (default: today)")
+    parser.add_argument('--format', choices=FORMATS, default='csv',
+                        help="Mock output: csv, or a typed staged sibling (feather / npy)")
+    args = parser.parse_args(argv)
 
-def main():
+    currencies = [c.strip().upper() for c in args.currencies.split(",") if c.strip()]
     ensure_directories()
-    fetch_rates()
+    if args.mock:
+        generate_mock_fx_data(currencies, args.start, args.end, args.seed, fmt=args.format)
+    else:
+        fetched = fetch_rates(currencies, args.start, args.max_in_flight, args.rate, args.base_url,
+                              args.incremental, args.bulk, not args.no_cache)
+        if not fetched:
+            # Non-zero exit, so run_pipeline marks the stage failed instead of fresh
+            raise SystemExit("every FX fetch failed")
 
 if __name__ == "__main__":
     main()
@@ -1,85 +1,196 @@
+import argparse
+import time
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import os
+from datetime import datetime
 from pathlib import Path
 
+from csv_chunks import encode_decimal, encode_text, write_chunk
+from staging import FORMATS, ColumnWriter
+
 # Config - cross-platform path resolution
 RAW_DIR = Path(__file__).parent.parent / "data" / "raw"
 OUTPUT_FILE = RAW_DIR / "weather_daily.csv"
 START_DATE = "2019-01-01"
 END_DATE = datetime.now().strftime("%Y-%m-%d")
+CHUNK_DAYS = 365  # Dates per CSV chunk; rows per chunk = CHUNK_DAYS x cities
 
 CITIES = {
     'Tokyo': {'base_temp': 16, 'amp': 12, 'rain_prob': 0.3},
     'Osaka': {'base_temp': 17, 'amp': 13, 'rain_prob': 0.3},
-    'Sapporo': {'base_temp': 9, 'amp': 14, 'rain_prob': 0.4}, # Colder
+    'Sapporo': {'base_temp': 9, 'amp': 14, 'rain_prob': 0.4, 'snow': True}, # Colder
     'Fukuoka': {'base_temp': 17, 'amp': 11, 'rain_prob': 0.35},
     'Naha': {'base_temp': 23, 'amp': 6, 'rain_prob': 0.4} # Tropical
 }
 
+# Condition labels, indexed by the integer codes built in simulate_weather()
+CONDITIONS = np.array(['Clear', 'Rain', 'Heatwave', 'Snow', 'Typhoon'])
+CLEAR, RAIN, HEATWAVE, SNOW, TYPHOON = range(len(CONDITIONS))
+
+# Column types of the staged (feather / npy) variant
+STAGED_DTYPES = {
+    'date': 'datetime64[s]',
+    'city_name': 'int32',
+    'temp_avg': 'float64',
+    'temp_max': 'float64',
+    'temp_min': 'float64',
+    'condition': 'int32',
+    'precipitation_mm': 'float64'
+}
+
 def ensure_directories():
     RAW_DIR.mkdir(parents=True, exist_ok=True)
 
-def generate_weather_data():
+def build_city_table(n_cities=None, rng=None):
+    """
+    Returns per-city parameter arrays (name, base_temp, amp, rain_prob, snow).
+    The real CITIES come first; when n_cities is larger, synthetic stations
+    are derived from them with jittered climate parameters for stress tests.
+    """
+    names = list(CITIES)
+    base_temp = np.array([p['base_temp'] for p in CITIES.values()], dtype=float)
+    amp = np.array([p['amp'] for p in CITIES.values()], dtype=float)
+    rain_prob = np.array([p['rain_prob'] for p in CITIES.values()], dtype=float)
+    snow = np.array([p.get('snow', False) for p in CITIES.values()])
+
+    n_cities = len(names) if n_cities is None else n_cities
+    if n_cities <= len(names):
+        return {
+            'city_name': np.array(names[:n_cities]),
+            'base_temp': base_temp[:n_cities],
+            'amp': amp[:n_cities],
+            'rain_prob': rain_prob[:n_cities],
+            'snow': snow[:n_cities],
+        }
+
+    rng = rng if rng is not None else np.random.default_rng()
+    n_extra = n_cities - len(names)
+    template = np.arange(n_extra) % len(names)
+    extra_base = base_temp[template] + rng.uniform(-3, 3, n_extra)
+    return {
+        'city_name': np.array(names + [f"Station_{i:05d}" for i in range(len(names) + 1, n_cities + 1)]),
+        'base_temp': np.concatenate([base_temp, extra_base]),
+        'amp': np.concatenate([amp, np.clip(amp[template] + rng.uniform(-2, 2, n_extra), 3, None)]),
+        'rain_prob': np.concatenate([rain_prob, np.clip(rain_prob[template] + rng.uniform(-0.05, 0.05, n_extra), 0, 1)]),
+        'snow': np.concatenate([snow, extra_base < 12]),
+    }
+
+def simulate_weather(dates, cities, rng):
+    """
+    Simulates the full (date x city) grid in one pass.
+    Every returned array is shaped (n_dates, n_cities); condition holds
+    integer codes into CONDITIONS.
+    """
+    shape = (len(dates), len(cities['city_name']))
+
+    # Sinusoidal temperature curve, peak in summer (approx day 200)
+    temp_seasonality = -np.cos((dates.dayofyear.to_numpy() - 20) * 2 * np.pi / 365)
+    avg_temp = cities['base_temp'] + np.outer(temp_seasonality, cities['amp'])
+
+    # Random daily variation
+    temp_avg = avg_temp + rng.normal(0, 2, shape)
+    temp_max = temp_avg + rng.uniform(3, 8, shape)
+    temp_min = temp_avg - rng.uniform(3, 8, shape)
+
+    # Conditions
+    is_rainy = rng.random(shape) < cities['rain_prob']
+    precipitation = np.where(is_rainy, rng.exponential(5, shape), 0.0)  # mm
+    temp_max -= 2 * is_rainy  # Cooler when raining
+    condition = np.where(is_rainy, RAIN, CLEAR)
+
+    # Extreme events
+    condition = np.where(temp_max > 35, HEATWAVE, condition)
+    condition = np.where((temp_max < 0) & cities['snow'], SNOW, condition)
+
+    # Typhoon season (Aug-Sep)
+    typhoon_season = np.isin(dates.month.to_numpy(), [8, 9])[:, None]
+    is_typhoon = typhoon_season & (rng.random(shape) < 0.05)
+    condition = np.where(is_typhoon, TYPHOON, condition)
+    precipitation = np.where(is_typhoon, rng.uniform(50, 200, shape), precipitation)
+
+    return {
+        'temp_avg': temp_avg,
+        'temp_max': temp_max,
+        'temp_min': temp_min,
+        'condition': condition,
+        'precipitation_mm': precipitation
+    }
+
+def encode_weather_chunk(dates, city_labels, grid):
+    """Renders one simulated grid as CSV columns (date-major row order)."""
+    n_cities = len(city_labels)
+    return {
+        'date': np.repeat(encode_text(dates.strftime("%Y-%m-%d")), n_cities),
+        'city_name': np.tile(city_labels, len(dates)),
+        'temp_avg': encode_decimal(grid['temp_avg'].ravel()),
+        'temp_max': encode_decimal(grid['temp_max'].ravel()),
+        'temp_min': encode_decimal(grid['temp_min'].ravel()),
+        'condition': encode_text(CONDITIONS)[grid['condition'].ravel()],
+        'precipitation_mm': encode_decimal(grid['precipitation_mm'].ravel())
+    }
+
+def typed_weather_chunk(dates, n_cities, grid):
+    """Same chunk as encode_weather_chunk, as typed columns for staging."""
+    return {
+        'date': np.repeat(dates.to_numpy().astype('datetime64[s]'), n_cities),
+        'city_name': np.tile(np.arange(n_cities, dtype=np.int32), len(dates)),
+        'temp_avg': np.round(grid['temp_avg'], 1).ravel(),
+        'temp_max': np.round(grid['temp_max'], 1).ravel(),
+        'temp_min': np.round(grid['temp_min'], 1).ravel(),
+        'condition': grid['condition'].ravel(),
+        'precipitation_mm': np.round(grid['precipitation_mm'], 1).ravel()
+    }
+
+def generate_weather_data(start_date=START_DATE, end_date=END_DATE, n_cities=None,
+                          seed=None, chunk_days=CHUNK_DAYS, output_file=OUTPUT_FILE, fmt='csv'):
     print("🌦️ Generating mock Weather data...")
-    
-    dates = pd.date_range(start=START_DATE, end=END_DATE)
-    records = []
-    
-    for d in dates:
-        day_of_year = d.dayofyear
-        
-        for city, params in CITIES.items():
-            # Sinusoidal temperature curve
-            # Peak in summer (approx day 200)
-            temp_seasonality = -np.cos((day_of_year - 20) * 2 * np.pi / 365)
-            avg_temp = params['base_temp'] + (params['amp'] * temp_seasonality)
-            
-            # Random daily variation
-            daily_var = np.random.normal(0, 2)
-            temp_avg = avg_temp + daily_var
-            temp_max = temp_avg + np.random.uniform(3, 8)
-            temp_min = temp_avg - np.random.uniform(3, 8)
-            
-            # Conditions
-            is_rainy = np.random.random() < params['rain_prob']
-            condition = 'Clear'
-            precipitation = 0.0
-            
-            if is_rainy:
-                condition = 'Rain'
-                precipitation = np.random.exponential(5) # mm
-                temp_max -= 2 # Cooler when raining
-            
-            # Extreme events
-            if temp_max > 35:
-                condition = 'Heatwave'
-            elif temp_max < 0 and city == 'Sapporo':
-                condition = 'Snow'
-            
-            # Typhoon season (Aug-Sep)
-            if d.month in [8, 9] and np.random.random() < 0.05:
-                condition = 'Typhoon'
-                precipitation = np.random.uniform(50, 200)
-            
-            records.append({
-                'date': d.strftime("%Y-%m-%d"),
-                'city_name': city,
-                'temp_avg': round(temp_avg, 1),
-                'temp_max': round(temp_max, 1),
-                'temp_min': round(temp_min, 1),
-                'condition': condition,
-                'precipitation_mm': round(precipitation, 1)
-            })
-            
-    df = pd.DataFrame(records)
-    df.to_csv(OUTPUT_FILE, index=False)
-    print(f"✅ Weather data saved to: {OUTPUT_FILE} ({len(df)} rows)")
-
-def main():
+    started = time.perf_counter()
+
+    rng = np.random.default_rng(seed)
+    cities = build_city_table(n_cities, rng)
+    dates = pd.date_range(start=start_date, end=end_date)
+
+    n_cities = len(cities['city_name'])
+    city_labels = encode_text(cities['city_name'])
+    writer = None
+    if fmt != 'csv':
+        writer = ColumnWriter(output_file, fmt, STAGED_DTYPES, len(dates) * n_cities,
+                              {'city_name': cities['city_name'], 'condition': CONDITIONS})
+        output_file = writer.path
+
+    total_rows = 0
+    for offset in range(0, len(dates), chunk_days):
+        chunk_dates = dates[offset:offset + chunk_days]
+        grid = simulate_weather(chunk_dates, cities, rng)
+        if writer:
+            writer.write(typed_weather_chunk(chunk_dates, n_cities, grid))
+            total_rows += len(chunk_dates) * n_cities
+        else:
+            columns = encode_weather_chunk(chunk_dates, city_labels, grid)
+            total_rows += write_chunk(output_file, columns, append=offset > 0)
+    if writer:
+        writer.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Weather data saved to: {output_file} ({total_rows} rows, "
+          f"{len(cities['city_name'])} cities, {elapsed:.1f}s)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate mock daily weather data.")
+    parser.add_argument('--start', default=START_DATE, help="First date (YYYY-MM-DD)")
+    parser.add_argument('--end', default=END_DATE, help="Last date (YYYY-MM-DD)")
+    parser.add_argument('--cities', type=int, default=None,
+                        help="Number of locations (default: the real CITIES only)")
+    parser.add_argument('--seed', type=int, default=None, help="Seed for reproducible output")
+    parser.add_argument('--chunk-days', type=int, default=CHUNK_DAYS, help="Dates per CSV chunk")
+    parser.add_argument('--output', type=Path, default=OUTPUT_FILE, help="CSV destination")
+    parser.add_argument('--format', choices=FORMATS, default='csv',
+                        help="csv, or a typed staged sibling (feather / npy)")
+    args = parser.parse_args(argv)
+
     ensure_directories()
-    generate_weather_data()
+    generate_weather_data(args.start, args.end, args.cities, args.seed,
+                          args.chunk_days, args.output, args.format)
 
 if __name__ == "__main__":
     main()
@@ -1,14 +1,23 @@
+import argparse
+import time
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import os
+from datetime import datetime
 from pathlib import Path
 
+from csv_chunks import encode_int, encode_text, write_chunk
+from staging import FORMATS, ColumnWriter
+
 # Config - cross-platform path resolution
 RAW_DIR = Path(__file__).parent.parent / "data" / "raw"
 OUTPUT_FILE = RAW_DIR / "flights_daily.csv"
 START_DATE = "2019-01-01"
 END_DATE = datetime.now().strftime("%Y-%m-%d")
+CHUNK_DAYS = 365  # Dates per CSV chunk; rows per chunk = CHUNK_DAYS x airports
+BORDER_REOPENING = pd.Timestamp(2022, 10, 11)
+
+# Column types of the staged (feather / npy) variant
+STAGED_DTYPES = {'date': 'datetime64[s]', 'airport_code': 'int32', 'flights_count': 'int64'}
 
 AIRPORTS = {
     'NRT': {'name': 'Narita', 'base_flights': 400, 'recovery_speed': 0.8},
@@ -21,52 +30,111 @@ AIRPORTS = {
 def ensure_directories():
     RAW_DIR.mkdir(parents=True, exist_ok=True)
 
-def generate_flight_data():
+def build_airport_matrix(n_airports=None, rng=None):
+    """
+    Returns (codes, base) where base[i] = base_flights x recovery_speed.
+    The real AIRPORTS come first; larger counts add synthetic regional
+    airports (codes J001, J002, ...) with small, skewed traffic volumes.
+    """
+    codes = list(AIRPORTS)
+    base = np.array([p['base_flights'] * p['recovery_speed'] for p in AIRPORTS.values()])
+
+    n_airports = len(codes) if n_airports is None else n_airports
+    if n_airports <= len(codes):
+        return np.array(codes[:n_airports]), base[:n_airports]
+
+    rng = rng if rng is not None else np.random.default_rng()
+    n_extra = n_airports - len(codes)
+    extra_base = rng.lognormal(mean=np.log(15), sigma=0.8, size=n_extra) * rng.uniform(0.6, 0.95, n_extra)
+    extra_codes = [f"J{i:03d}" for i in range(1, n_extra + 1)]
+    return np.array(codes + extra_codes), np.concatenate([base, extra_base])
+
+def covid_factor(dates):
+    """COVID impact factor per date (vectorized)."""
+    year = dates.year.to_numpy()
+    month = dates.month.to_numpy()
+
+    factor = np.ones(len(dates))
+    closed = (year >= 2020) & (year <= 2022)
+    factor[closed] = 0.05  # Almost grounded
+    factor[(year == 2020) & (month < 3)] = 1.0
+    factor[(year == 2022) & (month > 9)] = 0.4
+
+    # Recovery curve
+    recovering = year >= 2023
+    days_since_opening = (dates - BORDER_REOPENING).days.to_numpy()
+    factor[recovering] = np.minimum(1.0, 0.4 + days_since_opening[recovering] / 600)
+    return factor
+
+def date_factors(dates):
+    """Combined date-indexed multiplier: COVID x seasonality x weekend."""
+    # Seasonality (more flights in holidays)
+    seasonality = np.where(np.isin(dates.month.to_numpy(), [4, 8, 12]), 1.15, 1.0)
+    # Daily variation
+    day_factor = np.where(dates.weekday.to_numpy() >= 5, 1.1, 1.0)  # Weekend
+    return covid_factor(dates) * seasonality * day_factor
+
+def simulate_flights(dates, base, rng):
+    """Returns the (n_dates, n_airports) flights_count grid."""
+    noise = rng.uniform(0.9, 1.1, (len(dates), len(base)))
+    return (np.outer(date_factors(dates), base) * noise).astype(np.int64)
+
+def generate_flight_data(start_date=START_DATE, end_date=END_DATE, n_airports=None,
+                         seed=None, chunk_days=CHUNK_DAYS, output_file=OUTPUT_FILE, fmt='csv'):
     print("Generating mock Flight data...")
-    
-    dates = pd.date_range(start=START_DATE, end=END_DATE)
-    records = []
-    
-    for d in dates:
-        year = d.year
-        month = d.month
-        
-        # COVID Impact Factor
-        covid_factor = 1.0
-        if 2020 <= year <= 2022:
-            if year == 2020 and month < 3: covid_factor = 1.0
-            elif year == 2022 and month > 9: covid_factor = 0.4
-            else: covid_factor = 0.05 # Almost grounded
-        elif year >= 2023:
-            # Recovery curve
-            days_since_opening = (d - datetime(2022, 10, 11)).days
-            covid_factor = min(1.0, 0.4 + (days_since_opening / 600))
-            
-        for code, params in AIRPORTS.items():
-            # Seasonality (more flights in holidays)
-            seasonality = 1.0
-            if month in [4, 8, 12]: seasonality = 1.15
-            
-            # Daily variation
-            day_factor = 1.0
-            if d.weekday() >= 5: day_factor = 1.1 # Weekend
-            
-            base = params['base_flights'] * params['recovery_speed']
-            flights = int(base * covid_factor * seasonality * day_factor * np.random.uniform(0.9, 1.1))
-            
-            records.append({
-                'date': d.strftime("%Y-%m-%d"),
-                'airport_code': code,
-                'flights_count': flights
+    started = time.perf_counter()
+
+    rng = np.random.default_rng(seed)
+    codes, base = build_airport_matrix(n_airports, rng)
+    dates = pd.date_range(start=start_date, end=end_date)
+
+    code_labels = encode_text(codes)
+    writer = None
+    if fmt != 'csv':
+        writer = ColumnWriter(output_file, fmt, STAGED_DTYPES, len(dates) * len(codes), {'airport_code': codes})
+        output_file = writer.path
+
+    total_rows = 0
+    for offset in range(0, len(dates), chunk_days):
+        chunk_dates = dates[offset:offset + chunk_days]
+        flights = simulate_flights(chunk_dates, base, rng)
+        if writer:
+            writer.write({
+                'date': np.repeat(chunk_dates.to_numpy().astype('datetime64[s]'), len(codes)),
+                'airport_code': np.tile(np.arange(len(codes), dtype=np.int32), len(chunk_dates)),
+                'flights_count': flights.ravel()
             })
-            
-    df = pd.DataFrame(records)
-    df.to_csv(OUTPUT_FILE, index=False)
-    print(f"✅ Flight data saved to: {OUTPUT_FILE} ({len(df)} rows)")
+            total_rows += flights.size
+            continue
+        columns = {
+            'date': np.repeat(encode_text(chunk_dates.strftime("%Y-%m-%d")), len(codes)),
+            'airport_code': np.tile(code_labels, len(chunk_dates)),
+            'flights_count': encode_int(flights.ravel())
+        }
+        total_rows += write_chunk(output_file, columns, append=offset > 0)
+    if writer:
+        writer.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Flight data saved to: {output_file} ({total_rows} rows, "
+          f"{len(codes)} airports, {elapsed:.1f}s)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate mock daily inbound flight data.")
+    parser.add_argument('--start', default=START_DATE, help="First date (YYYY-MM-DD)")
+    parser.add_argument('--end', default=END_DATE, help="Last date (YYYY-MM-DD)")
+    parser.add_argument('--airports', type=int, default=None,
+                        help="Number of airports (default: the real AIRPORTS only)")
+    parser.add_argument('--seed', type=int, default=None, help="Seed for reproducible output")
+    parser.add_argument('--chunk-days', type=int, default=CHUNK_DAYS, help="Dates per CSV chunk")
+    parser.add_argument('--output', type=Path, default=OUTPUT_FILE, help="CSV destination")
+    parser.add_argument('--format', choices=FORMATS, default='csv',
+                        help="csv, or a typed staged sibling (feather / npy)")
+    args = parser.parse_args(argv)
 
-def main():
     ensure_directories()
-    generate_flight_data()
+    generate_flight_data(args.start, args.end, args.airports, args.seed,
+                         args.chunk_days, args.output, args.format)
 
 if __name__ == "__main__":
     main()
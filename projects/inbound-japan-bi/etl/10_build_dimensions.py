@@ -1,90 +1,172 @@
+import argparse
+import calendar
+import numpy as np
 import pandas as pd
 import sqlite3
 import os
-from datetime import datetime, timedelta
+import sys
 from pathlib import Path
 
+import jp_holidays
+import schema
+from staging import raw_exists, read_raw
+from warehouse import has_key, replace_table, upsert
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common.sqlite_bulk import bulk_load
+
 # Config - cross-platform path resolution
 DB_PATH = Path(__file__).parent.parent / "data" / "inbound_japan.db"
 RAW_FILE = Path(__file__).parent.parent / "data" / "raw" / "jnto_arrivals.csv"
 
+# Calendar range; dim_date/dim_month only ever grow to cover it
+DEFAULT_START = '2019-01-01'
+DEFAULT_END = '2026-12-31'  # Extended through 2026 for forecasting
+FISCAL_YEAR_START_MONTH = 4  # Japanese fiscal year: April-March, named by the year it starts in
+
+# Indexed by month number (0 unused)
+MONTH_NAMES = np.array(list(calendar.month_name))
+SEASONS = np.array(['', 'Winter', 'Winter', 'Spring', 'Spring', 'Spring', 'Summer',
+                    'Summer', 'Summer', 'Autumn', 'Autumn', 'Autumn', 'Winter'])
+
+# Home currency of each market in dim_fx_currency; the rest price Japan in USD
+COUNTRY_CURRENCY = {
+    'Australia': 'AUD',
+    'China': 'CNY',
+    'South Korea': 'KRW',
+    'Thailand': 'THB',
+    'France': 'EUR',
+    'Germany': 'EUR',
+    'Italy': 'EUR',
+    'Spain': 'EUR',
+}
+DEFAULT_CURRENCY = 'USD'
+DEFAULT_REGION = 'Other'  # Markets whose raw file carries no Region
+
 def create_connection():
     conn = sqlite3.connect(DB_PATH)
     return conn
 
-def build_dim_date(conn):
-    start_date = datetime(2019, 1, 1)
-    end_date = datetime(2026, 12, 31)  # Extended through 2026 for forecasting
-    
-    dates = []
-    current = start_date
-    while current <= end_date:
-        dates.append({
-            'date_id': int(current.strftime('%Y%m%d')),
-            'date': current.strftime('%Y-%m-%d'),
-            'year': current.year,
-            'month': current.month,
-            'day': current.day,
-            'quarter': (current.month - 1) // 3 + 1,
-            'day_of_week': current.weekday(), # 0=Monday
-            'is_weekend': 1 if current.weekday() >= 5 else 0
-        })
-        current += timedelta(days=1)
-        
-    df = pd.DataFrame(dates)
-    df.to_sql('dim_date', conn, if_exists='replace', index=False)
-    print(f"✅ dim_date created: {len(df)} rows")
-
-def build_dim_month(conn):
-    # Generate months from 2019 to 2026
-    months = []
-    for year in range(2019, 2027):  # Extended through 2026
-        for month in range(1, 13):
-            months.append({
-                'month_id': int(f"{year}{month:02d}"),
-                'year': year,
-                'month': month,
-                'month_name': datetime(year, month, 1).strftime('%B'),
-                'season': get_season(month)
-            })
-    
-    df = pd.DataFrame(months)
-    df.to_sql('dim_month', conn, if_exists='replace', index=False)
-    print(f"✅ dim_month created: {len(df)} rows")
-
-def get_season(month):
-    if month in [3, 4, 5]: return 'Spring'
-    if month in [6, 7, 8]: return 'Summer'
-    if month in [9, 10, 11]: return 'Autumn'
-    return 'Winter'
+def fiscal_periods(years, months):
+    """Fiscal year, quarter and period (1 = first fiscal month) of calendar years and months."""
+    period = (months - FISCAL_YEAR_START_MONTH) % 12 + 1
+    return np.where(months >= FISCAL_YEAR_START_MONTH, years, years - 1), (period - 1) // 3 + 1, period
+
+def date_dimension(start, end):
+    """dim_date rows for every day from start to end, built column-wise from pd.date_range."""
+    dates = pd.date_range(start, end, freq='D')
+    year = dates.year.to_numpy(np.int64)
+    month = dates.month.to_numpy(np.int64)
+    day = dates.day.to_numpy(np.int64)
+    day_of_week = dates.dayofweek.to_numpy(np.int64)  # 0=Monday
+    iso = dates.isocalendar()
+    holiday_names = jp_holidays.holidays(year[0], year[-1]).reindex(dates)
+    is_holiday = holiday_names.notna().to_numpy()
+    is_weekend = day_of_week >= 5
+    fiscal_year, fiscal_quarter, fiscal_period = fiscal_periods(year, month)
+    return pd.DataFrame({
+        'date_id': year * 10000 + month * 100 + day,
+        'date': np.datetime_as_string(dates.values, unit='D'),
+        'year': year,
+        'month': month,
+        'day': day,
+        'quarter': (month - 1) // 3 + 1,
+        'day_of_week': day_of_week,
+        'is_weekend': is_weekend.astype(np.int64),
+        'iso_year': iso['year'].to_numpy(np.int64),
+        'iso_week': iso['week'].to_numpy(np.int64),
+        'fiscal_year': fiscal_year,
+        'fiscal_quarter': fiscal_quarter,
+        'fiscal_period': fiscal_period,
+        'is_holiday': is_holiday.astype(np.int64),
+        'holiday_name': holiday_names.to_numpy(),
+        'is_business_day': (~is_weekend & ~is_holiday).astype(np.int64),
+    })
+
+def month_dimension(start, end):
+    """dim_month rows for every month touched by start..end, aggregated from their days."""
+    first = pd.Timestamp(start).to_period('M').start_time
+    last = pd.Timestamp(end).to_period('M').end_time.normalize()
+    days = date_dimension(first, last)
+    months = days.groupby(days['date_id'] // 100).agg(
+        year=('year', 'first'),
+        month=('month', 'first'),
+        fiscal_year=('fiscal_year', 'first'),
+        fiscal_quarter=('fiscal_quarter', 'first'),
+        fiscal_period=('fiscal_period', 'first'),
+        days_in_month=('day', 'size'),
+        business_days=('is_business_day', 'sum'),
+    )
+    months = months.rename_axis('month_id').reset_index()
+    months['month_name'] = MONTH_NAMES[months['month']]
+    months['season'] = SEASONS[months['month']]
+    return months[[name for name, _ in schema.TABLES['dim_month']['columns']]]
+
+def current_range(conn, table, key):
+    """(min, max) key of a calendar table built with the current schema, else None (rebuild)."""
+    columns = [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+    if columns != [name for name, _ in schema.TABLES[table]['columns']] or not has_key(conn, table):
+        return None
+    low, high = conn.execute(f"SELECT MIN({key}), MAX({key}) FROM {table}").fetchone()
+    return None if low is None else (low, high)
+
+def write_calendar(conn, table, key, df, current):
+    """Creates `table`, or appends only the rows of df outside its current key range."""
+    span = f"{df[key].iloc[0]}-{df[key].iloc[-1]}"
+    if current is None:
+        replace_table(conn, df, table)
+        print(f"✅ {table} created: {len(df)} rows ({span})")
+        return
+    inserted, _ = upsert(conn, df[(df[key] < current[0]) | (df[key] > current[1])], table)
+    print(f"✅ {table} extended: {inserted} rows ({span})")
+
+def build_dim_date(conn, start, end, rebuild=False):
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    current = None if rebuild else current_range(conn, 'dim_date', 'date_id')
+    if current:
+        low, high = (pd.to_datetime(str(key), format='%Y%m%d') for key in current)
+        if low <= start and end <= high:
+            print(f"✅ dim_date up to date ({current[0]}-{current[1]})")
+            return
+        # Never shrink (facts reference the existing days) and never leave a gap
+        start, end = min(start, low), max(end, high)
+    write_calendar(conn, 'dim_date', 'date_id', date_dimension(start, end), current)
+
+def build_dim_month(conn, start, end, rebuild=False):
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    current = None if rebuild else current_range(conn, 'dim_month', 'month_id')
+    if current:
+        low, high = (pd.to_datetime(str(key), format='%Y%m') for key in current)
+        if low <= start and end <= high + pd.offsets.MonthEnd(0):
+            print(f"✅ dim_month up to date ({current[0]}-{current[1]})")
+            return
+        start, end = min(start, low), max(end, high)
+    write_calendar(conn, 'dim_month', 'month_id', month_dimension(start, end), current)
 
 def build_dim_country(conn):
     # Read raw data to get unique countries
-    if not RAW_FILE.exists():
+    if not raw_exists(RAW_FILE):
         print("⚠️ Raw data not found. Run 01_fetch_jnto_arrivals.py first.")
         return
 
-    df_raw = pd.read_csv(RAW_FILE)
-    countries = df_raw['Country'].unique()
-    
+    df_raw = read_raw(RAW_FILE)
+    # Regions come from the generator's country table via the Region column;
+    # an official JNTO CSV has none, so its markets stay 'Other'
+    if 'Region' not in df_raw:
+        df_raw['Region'] = DEFAULT_REGION
+    countries = df_raw.drop_duplicates('Country')
+
     country_data = []
-    for i, country in enumerate(countries, 1):
-        region = 'Other'
-        if country in ['China', 'South Korea', 'Taiwan', 'Hong Kong']: region = 'East Asia'
-        elif country in ['Thailand', 'Vietnam', 'Philippines', 'Singapore', 'Malaysia', 'Indonesia']: region = 'Southeast Asia'
-        elif country in ['United States', 'Canada']: region = 'North America'
-        elif country in ['United Kingdom', 'France', 'Germany', 'Italy', 'Spain', 'Russia']: region = 'Europe'
-        elif country in ['Australia']: region = 'Oceania'
-        elif country in ['India']: region = 'South Asia'
-        
+    for i, (country, region) in enumerate(zip(countries['Country'], countries['Region'].fillna(DEFAULT_REGION)), 1):
         country_data.append({
             'country_id': i,
             'country_name_en': country,
-            'region_macro': region
+            'region_macro': region,
+            'currency_code': COUNTRY_CURRENCY.get(country, DEFAULT_CURRENCY)
         })
-        
+
     df = pd.DataFrame(country_data)
-    df.to_sql('dim_country', conn, if_exists='replace', index=False)
+    replace_table(conn, df, 'dim_country')
     print(f"✅ dim_country created: {len(df)} rows")
 
 def build_dim_fx_currency(conn):
@@ -97,7 +179,7 @@ def build_dim_fx_currency(conn):
         {'currency_code': 'THB', 'currency_name': 'Thai Baht'}
     ]
     df = pd.DataFrame(currencies)
-    df.to_sql('dim_fx_currency', conn, if_exists='replace', index=False)
+    replace_table(conn, df, 'dim_fx_currency')
     print(f"✅ dim_fx_currency created: {len(df)} rows")
 
 def build_dim_weather_location(conn):
@@ -109,7 +191,7 @@ def build_dim_weather_location(conn):
         {'weather_loc_id': 5, 'city_name': 'Naha', 'region_jp': 'Okinawa'}
     ]
     df = pd.DataFrame(locations)
-    df.to_sql('dim_weather_location', conn, if_exists='replace', index=False)
+    replace_table(conn, df, 'dim_weather_location')
     print(f"✅ dim_weather_location created: {len(df)} rows")
 
 def build_dim_airport(conn):
@@ -121,17 +203,25 @@ def build_dim_airport(conn):
         {'airport_id': 5, 'airport_code': 'CTS', 'airport_name': 'New Chitose', 'region_jp': 'Hokkaido'}
     ]
     df = pd.DataFrame(airports)
-    df.to_sql('dim_airport', conn, if_exists='replace', index=False)
+    replace_table(conn, df, 'dim_airport')
     print(f"✅ dim_airport created: {len(df)} rows")
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the dimension tables.")
+    parser.add_argument('--start', default=DEFAULT_START, help="First calendar date (YYYY-MM-DD)")
+    parser.add_argument('--end', default=DEFAULT_END, help="Last calendar date (YYYY-MM-DD)")
+    parser.add_argument('--rebuild-calendar', action='store_true',
+                        help="Rewrite dim_date/dim_month instead of extending them (e.g. after a rule change)")
+    args = parser.parse_args(argv)
+
     conn = create_connection()
-    build_dim_date(conn)
-    build_dim_month(conn)
-    build_dim_country(conn)
-    build_dim_fx_currency(conn)
-    build_dim_weather_location(conn)
-    build_dim_airport(conn)
+    with bulk_load(conn):
+        build_dim_date(conn, args.start, args.end, args.rebuild_calendar)
+        build_dim_month(conn, args.start, args.end, args.rebuild_calendar)
+        build_dim_country(conn)
+        build_dim_fx_currency(conn)
+        build_dim_weather_location(conn)
+        build_dim_airport(conn)
     conn.close()
 
 if __name__ == "__main__":
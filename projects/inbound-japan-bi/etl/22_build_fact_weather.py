@@ -1,43 +1,30 @@
-import pandas as pd
-import sqlite3
 from pathlib import Path
 
+from fact_builder import run
+
 # Config - cross-platform path resolution
 DB_PATH = Path(__file__).parent.parent / "data" / "inbound_japan.db"
 RAW_FILE = Path(__file__).parent.parent / "data" / "raw" / "weather_daily.csv"
 
-def main():
-    conn = sqlite3.connect(DB_PATH)
-    
-    if not RAW_FILE.exists():
-        print("⚠️ Raw Weather data not found. Run 03_fetch_weather_daily.py first.")
-        return
+# Grain: Day x Location
+SPEC = {
+    'table': 'fact_weather_daily',
+    'raw_file': RAW_FILE,
+    'source': "Weather",
+    'fetch_script': '03_fetch_weather_daily.py',
+    'date_id': 'date',
+    'lookups': {'weather_loc_id': ('dim_weather_location', 'city_name', 'city_name')},
+    'columns': {
+        'temp_avg': 'temp_avg',
+        'temp_max': 'temp_max',
+        'temp_min': 'temp_min',
+        'condition': 'condition',
+        'precipitation_mm': 'precipitation_mm',
+    },
+}
 
-    # Load Raw
-    df_raw = pd.read_csv(RAW_FILE)
-    
-    # Load Dimensions
-    df_loc = pd.read_sql("SELECT weather_loc_id, city_name FROM dim_weather_location", conn)
-    
-    # Merge Location ID
-    df_merged = df_raw.merge(df_loc, on='city_name', how='left')
-    
-    # Date ID
-    df_merged['date_obj'] = pd.to_datetime(df_merged['date'])
-    df_merged['date_id'] = df_merged['date_obj'].dt.strftime('%Y%m%d').astype(int)
-    
-    # Select columns
-    fact_table = df_merged[[
-        'date_id', 'weather_loc_id', 
-        'temp_avg', 'temp_max', 'temp_min', 
-        'condition', 'precipitation_mm'
-    ]].copy()
-    
-    # Save
-    fact_table.to_sql('fact_weather_daily', conn, if_exists='replace', index=False)
-    print(f"✅ fact_weather_daily created: {len(fact_table)} rows")
-    
-    conn.close()
+def main(argv=None):
+    run(SPEC, argv, DB_PATH)
 
 if __name__ == "__main__":
     main()
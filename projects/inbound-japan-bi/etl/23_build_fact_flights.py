@@ -1,41 +1,24 @@
-import pandas as pd
-import sqlite3
 from pathlib import Path
 
+from fact_builder import run
+
 # Config - cross-platform path resolution
 DB_PATH = Path(__file__).parent.parent / "data" / "inbound_japan.db"
 RAW_FILE = Path(__file__).parent.parent / "data" / "raw" / "flights_daily.csv"
 
-def main():
-    conn = sqlite3.connect(DB_PATH)
-    
-    if not RAW_FILE.exists():
-        print("⚠️ Raw Flight data not found. Run 04_fetch_opensky_flights.py first.")
-        return
+# Grain: Day x Airport
+SPEC = {
+    'table': 'fact_flights_daily',
+    'raw_file': RAW_FILE,
+    'source': "Flight",
+    'fetch_script': '04_fetch_opensky_flights.py',
+    'date_id': 'date',
+    'lookups': {'airport_id': ('dim_airport', 'airport_code', 'airport_code')},
+    'columns': {'flights_count': 'flights_count'},
+}
 
-    # Load Raw
-    df_raw = pd.read_csv(RAW_FILE)
-    
-    # Load Dimensions
-    df_airport = pd.read_sql("SELECT airport_id, airport_code FROM dim_airport", conn)
-    
-    # Merge Airport ID
-    df_merged = df_raw.merge(df_airport, on='airport_code', how='left')
-    
-    # Date ID
-    df_merged['date_obj'] = pd.to_datetime(df_merged['date'])
-    df_merged['date_id'] = df_merged['date_obj'].dt.strftime('%Y%m%d').astype(int)
-    
-    # Select columns
-    fact_table = df_merged[[
-        'date_id', 'airport_id', 'flights_count'
-    ]].copy()
-    
-    # Save
-    fact_table.to_sql('fact_flights_daily', conn, if_exists='replace', index=False)
-    print(f"✅ fact_flights_daily created: {len(fact_table)} rows")
-    
-    conn.close()
+def main(argv=None):
+    run(SPEC, argv, DB_PATH)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,120 @@
+import argparse
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+import schema
+from warehouse import changed_months, clear_changed_months, has_key, transaction
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common.sqlite_bulk import bulk_load
+
+# Config - cross-platform path resolution
+DB_PATH = Path(__file__).parent.parent / "data" / "inbound_japan.db"
+
+# rollup table -> daily fact, entity column, monthly measures
+# month_id is date_id / 100 (YYYYMMDD -> YYYYMM), so no date formatting per row
+ROLLUPS = {
+    'agg_fx_monthly': {
+        'fact': 'fact_fx_rate_daily',
+        'entity': 'currency_code',
+        'measures': """
+            AVG(rate_jpy_per_currency) AS avg_rate,
+            MIN(rate_jpy_per_currency) AS min_rate,
+            MAX(rate_jpy_per_currency) AS max_rate""",
+    },
+    'agg_weather_monthly': {
+        'fact': 'fact_weather_daily',
+        'entity': 'weather_loc_id',
+        'measures': """
+            AVG(temp_avg) AS avg_temp,
+            AVG(temp_max) AS avg_max_temp,
+            AVG(temp_min) AS avg_min_temp,
+            SUM(precipitation_mm) AS total_precipitation_mm,
+            SUM(CASE WHEN condition = 'Heatwave' THEN 1 ELSE 0 END) AS heatwave_days,
+            SUM(CASE WHEN condition IN ('Rain', 'Typhoon') THEN 1 ELSE 0 END) AS rainy_days,
+            SUM(CASE WHEN condition = 'Snow' THEN 1 ELSE 0 END) AS snow_days""",
+    },
+    'agg_flights_monthly': {
+        'fact': 'fact_flights_daily',
+        'entity': 'airport_id',
+        'measures': """
+            SUM(flights_count) AS total_flights""",
+    },
+}
+
+def rollup_select(spec, where="1"):
+    return f"""
+        SELECT date_id / 100 AS month_id, {spec['entity']}, {spec['measures'].strip()}, COUNT(*) AS days
+        FROM {spec['fact']}
+        WHERE {where}
+        GROUP BY 1, 2
+    """
+
+def dirty_months(conn, table, spec):
+    """
+    Months to recompute: those the fact builders inserted or revised rows
+    in (recorded by warehouse.merge_rows), plus those whose daily row count
+    differs from the rollup, which catches removed days. The counts come
+    from the fact's primary key.
+    """
+    rows = conn.execute(f"""
+        WITH daily AS (
+            SELECT date_id / 100 AS month_id, COUNT(*) AS days FROM {spec['fact']} GROUP BY 1
+        ),
+        rolled AS (
+            SELECT month_id, SUM(days) AS days FROM {table} GROUP BY 1
+        )
+        SELECT d.month_id FROM daily d LEFT JOIN rolled r ON r.month_id = d.month_id WHERE r.days IS NOT d.days
+        UNION
+        SELECT r.month_id FROM rolled r LEFT JOIN daily d ON d.month_id = r.month_id WHERE d.days IS NULL
+    """).fetchall()
+    return sorted({month_id for month_id, in rows} | set(changed_months(conn, spec['fact'])))
+
+def rebuild_rollup(conn, table, spec):
+    with transaction(conn):
+        schema.create_table(conn, table)
+        conn.execute(f"INSERT INTO {table} {rollup_select(spec)}")
+        schema.create_indexes(conn, table)
+        schema.analyze(conn, table)
+        clear_changed_months(conn, spec['fact'])
+    rows = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    print(f"✅ {table} created: {rows} rows")
+
+def refresh_rollup(conn, table, spec):
+    months = dirty_months(conn, table, spec)
+    if not months:
+        print(f"✅ {table} up to date")
+        return
+    # The date_id range lets SQLite seek on the fact's primary key
+    where = (f"date_id BETWEEN {months[0] * 100} AND {months[-1] * 100 + 99} "
+             f"AND date_id / 100 IN (SELECT value FROM json_each(:months))")
+    with transaction(conn):
+        conn.execute(f"DELETE FROM {table} WHERE month_id IN (SELECT value FROM json_each(:months))",
+                     {'months': json.dumps(months)})
+        conn.execute(f"INSERT INTO {table} {rollup_select(spec, where)}", {'months': json.dumps(months)})
+        schema.analyze(conn, table)
+        clear_changed_months(conn, spec['fact'])
+    print(f"✅ {table} refreshed: {len(months)} months ({months[0]}-{months[-1]})")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Materialize monthly rollups of the daily fact tables.")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Recompute only months whose daily rows changed")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(DB_PATH)
+    with bulk_load(conn, 'incremental' if args.incremental else 'rebuild'):
+        for table, spec in ROLLUPS.items():
+            if not has_key(conn, spec['fact']):
+                print(f"⚠️ {spec['fact']} not found. Run the 2x fact builders first.")
+                continue
+            if args.incremental and has_key(conn, table):
+                refresh_rollup(conn, table, spec)
+            else:
+                rebuild_rollup(conn, table, spec)
+    conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from forecasting import METHODS, forecast_batch
+from warehouse import has_key, replace_table
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common.sqlite_bulk import bulk_load
+
+# Config - cross-platform path resolution
+DB_PATH = Path(__file__).parent.parent / "data" / "inbound_japan.db"
+
+FACT_TABLE = 'fact_inbound_arrivals_monthly'
+TOTAL_ID = 0  # country_id of the national total series
+FIT_WORKERS = os.cpu_count() or 1
+HORIZON = 24  # Months ahead; always spans the next full calendar year
+
+def month_ids(first, periods):
+    """`periods` consecutive YYYYMM keys starting at month_id `first`."""
+    months = pd.period_range(pd.Period(f"{first // 100}-{first % 100:02d}", freq='M'), periods=periods, freq='M')
+    return (months.year * 100 + months.month).to_numpy(np.int64)
+
+def load_series(conn):
+    """Visitors as an (n_series, n_months) frame: the national total first, then one row per country."""
+    df = pd.read_sql(f"SELECT month_id, country_id, visitors_total FROM {FACT_TABLE}", conn)
+    wide = df.pivot_table(index='country_id', columns='month_id', values='visitors_total',
+                          aggfunc='sum', fill_value=0)
+    # A month missing from the fact counts as zero visitors, so every column is one calendar month
+    first, last = wide.columns.min(), wide.columns.max()
+    n_months = (last // 100 - first // 100) * 12 + last % 100 - first % 100 + 1
+    wide = wide.reindex(columns=month_ids(first, n_months), fill_value=0)
+    total = wide.sum(axis=0).to_frame(TOTAL_ID).T
+    return pd.concat([total, wide])
+
+def build_forecasts(series, horizon, method, workers):
+    last = int(series.columns[-1])
+    forecast, lower, upper = forecast_batch(series.to_numpy(), horizon, method, workers=workers)
+    n_series = len(series)
+    return pd.DataFrame({
+        'month_id': np.tile(month_ids(last, horizon + 1)[1:], n_series),
+        'country_id': np.repeat(series.index.to_numpy(np.int64), horizon),
+        'horizon': np.tile(np.arange(1, horizon + 1), n_series),
+        'visitors_forecast': forecast.ravel(),
+        'visitors_lower': lower.ravel(),
+        'visitors_upper': upper.ravel(),
+        'method': method,
+        'fitted_through': last,
+    })
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Forecast monthly arrivals per country and in total.")
+    parser.add_argument('--method', choices=list(METHODS), default='holt_winters', help="Forecasting model")
+    parser.add_argument('--horizon', type=int, default=HORIZON, help="Months ahead")
+    parser.add_argument('--workers', type=int, default=FIT_WORKERS,
+                        help="Processes for fitting once the series span several blocks")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(DB_PATH)
+    if not has_key(conn, FACT_TABLE):
+        print(f"⚠️ {FACT_TABLE} not found. Run 20_build_fact_inbound_arrivals.py first.")
+        conn.close()
+        return
+
+    series = load_series(conn)
+    started = time.perf_counter()
+    df = build_forecasts(series, args.horizon, args.method, args.workers)
+    elapsed = time.perf_counter() - started
+
+    with bulk_load(conn):
+        rows = replace_table(conn, df, 'fact_forecast_monthly')
+    conn.close()
+    print(f"✅ fact_forecast_monthly created: {rows} rows ({len(series)} series x {args.horizon} months, "
+          f"{args.method}, fitted in {elapsed:.2f}s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import argparse
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from forecasting import Z_SCORE
+from scenarios import PERCENTILES, monthly_anomaly, percentile_bands, simulate
+from warehouse import has_key, replace_table
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common.sqlite_bulk import bulk_load
+
+# Config - cross-platform path resolution
+DB_PATH = Path(__file__).parent.parent / "data" / "inbound_japan.db"
+
+N_SCENARIOS = 10_000
+N_MONTHS = 24
+DEFAULT_SEED = 42
+# Months of history to resample: recent enough to leave out the 2020-2022 border
+# closures, whose capacity collapse the baseline forecast does not expect to repeat
+HISTORY_MONTHS = 36
+TOTAL_ID = 0  # country_id of the national total, as in fact_forecast_monthly
+REQUIRED_TABLES = {
+    'fact_forecast_monthly': '31_build_forecasts.py',
+    'agg_fx_monthly': '30_build_monthly_rollups.py',
+    'agg_weather_monthly': '30_build_monthly_rollups.py',
+    'agg_flights_monthly': '30_build_monthly_rollups.py',
+}
+FALLBACK_CURRENCY = 'USD'  # For a home currency missing from the FX history
+
+def load_baseline(conn, n_months):
+    """Per-country forecast and log-space sigma as (country x month) frames for the first n_months, plus currencies."""
+    df = pd.read_sql("""
+        SELECT f.month_id, f.country_id, c.currency_code, f.visitors_forecast, f.visitors_upper
+        FROM fact_forecast_monthly f
+        JOIN dim_country c ON f.country_id = c.country_id
+    """, conn)
+    months = np.sort(df['month_id'].unique())[:n_months]
+    df = df[df['month_id'].isin(months)]
+    forecast = df.pivot(index='country_id', columns='month_id', values='visitors_forecast')
+    upper = df.pivot(index='country_id', columns='month_id', values='visitors_upper')
+    # The 80% upper bound sits Z_SCORE sigmas above the forecast in log1p space
+    sigma = (np.log1p(upper) - np.log1p(forecast)) / Z_SCORE
+    currencies = df.drop_duplicates('country_id').set_index('country_id')['currency_code'].reindex(forecast.index)
+    return forecast, sigma, currencies
+
+def load_history(conn, n_months):
+    """
+    Monthly shocks over the last n_months every source covers: JPY log
+    returns (month x currency), the bad-weather day share anomaly across
+    cities and the log daily-flights anomaly across airports.
+    """
+    fx = pd.read_sql("SELECT month_id, currency_code, avg_rate FROM agg_fx_monthly", conn)
+    fx_returns = np.log(fx.pivot(index='month_id', columns='currency_code', values='avg_rate')).diff().dropna()
+    weather = pd.read_sql("""
+        SELECT month_id, SUM(heatwave_days + rainy_days + snow_days) * 1.0 / SUM(days) AS bad_share
+        FROM agg_weather_monthly GROUP BY month_id
+    """, conn).set_index('month_id')['bad_share']
+    flights = pd.read_sql("""
+        SELECT month_id, SUM(total_flights) * 1.0 / SUM(days) AS daily_flights
+        FROM agg_flights_monthly GROUP BY month_id
+    """, conn).set_index('month_id')['daily_flights']
+
+    months = fx_returns.index.intersection(weather.index).intersection(flights.index)[-n_months:]
+    return (fx_returns.loc[months],
+            monthly_anomaly(months, weather.loc[months].to_numpy()),
+            monthly_anomaly(months, np.log(flights.loc[months].to_numpy())))
+
+def band_rows(month_ids, country_ids, bands, mean, n_scenarios):
+    """One row per (country, month) from (percentile, country, month) bands and the (country, month) mean."""
+    n_countries, n_months = mean.shape
+    df = pd.DataFrame({
+        'month_id': np.tile(month_ids, n_countries),
+        'country_id': np.repeat(country_ids, n_months),
+        'scenarios': n_scenarios,
+    })
+    for p, band in zip(PERCENTILES, bands):
+        df[f'visitors_p{p}'] = band.ravel()
+    df['visitors_mean'] = mean.ravel()
+    return df
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate FX, weather and flight-capacity demand scenarios.")
+    parser.add_argument('--scenarios', type=int, default=N_SCENARIOS, help="Number of simulated paths")
+    parser.add_argument('--months', type=int, default=N_MONTHS, help="Forecast months to simulate")
+    parser.add_argument('--history-months', type=int, default=HISTORY_MONTHS,
+                        help="Most recent months to draw shocks from")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help="Random seed; the same seed and warehouse give the same bands")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(DB_PATH)
+    for table, script in REQUIRED_TABLES.items():
+        if not has_key(conn, table):
+            print(f"⚠️ {table} not found. Run {script} first.")
+            conn.close()
+            return
+
+    forecast, sigma, currencies = load_baseline(conn, args.months)
+    fx_returns, weather, capacity = load_history(conn, args.history_months)
+    columns = list(fx_returns.columns)
+    currency_of = np.array([
+        columns.index(currency if currency in columns else FALLBACK_CURRENCY) for currency in currencies
+    ])
+
+    started = time.perf_counter()
+    visitors = simulate(forecast.to_numpy(), sigma.to_numpy(), currency_of, fx_returns.to_numpy(),
+                        weather, capacity, args.scenarios, np.random.default_rng(args.seed))
+    bands, mean = percentile_bands(visitors)
+    # The national band comes from each scenario's sum over countries, not from summed percentiles
+    total_bands, total_mean = percentile_bands(visitors.sum(axis=1))
+    elapsed = time.perf_counter() - started
+
+    df = band_rows(forecast.columns.to_numpy(np.int64),
+                   np.concatenate([[TOTAL_ID], forecast.index.to_numpy(np.int64)]),
+                   np.concatenate([total_bands[:, None], bands], axis=1),
+                   np.concatenate([total_mean[None], mean]),
+                   args.scenarios)
+    with bulk_load(conn):
+        rows = replace_table(conn, df, 'fact_scenario_monthly')
+    conn.close()
+    print(f"✅ fact_scenario_monthly created: {rows} rows ({args.scenarios:,} scenarios x "
+          f"{len(forecast)} countries x {forecast.shape[1]} months from {len(fx_returns)} historical months, "
+          f"seed {args.seed}, simulated in {elapsed:.2f}s)")
+
+if __name__ == "__main__":
+    main()
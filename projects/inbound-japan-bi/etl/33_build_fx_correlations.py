@@ -0,0 +1,88 @@
+import argparse
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from correlation import lagged_regression
+from warehouse import has_key, replace_table
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common.sqlite_bulk import bulk_load
+
+# Config - cross-platform path resolution
+DB_PATH = Path(__file__).parent.parent / "data" / "inbound_japan.db"
+
+MAX_LAG = 6  # Months by which FX may lead arrivals
+# Border closures and reopening (Feb 2020 - Dec 2022): arrival swings there have nothing to do with FX
+EXCLUDED_MONTHS = (202002, 202212)
+REQUIRED_TABLES = {
+    'agg_fx_monthly': '30_build_monthly_rollups.py',
+    'fact_inbound_arrivals_monthly': '20_build_fact_inbound_arrivals.py',
+}
+
+def load_matrices(conn):
+    """Monthly FX rates (month x currency) and arrivals (month x country) over one consecutive month index."""
+    fx = pd.read_sql("SELECT month_id, currency_code, avg_rate FROM agg_fx_monthly", conn)
+    fx = fx.pivot(index='month_id', columns='currency_code', values='avg_rate')
+    arrivals = pd.read_sql("""
+        SELECT month_id, country_id, SUM(visitors_total) AS visitors
+        FROM fact_inbound_arrivals_monthly GROUP BY month_id, country_id
+    """, conn).pivot(index='month_id', columns='country_id', values='visitors')
+
+    first, last = min(fx.index.min(), arrivals.index.min()), max(fx.index.max(), arrivals.index.max())
+    periods = pd.period_range(f"{first // 100}-{first % 100:02d}", f"{last // 100}-{last % 100:02d}", freq='M')
+    months = periods.year * 100 + periods.month
+    return fx.reindex(months), arrivals.reindex(months)
+
+def arrivals_growth(arrivals):
+    """Month-over-month log growth minus its calendar-month mean, NaN over EXCLUDED_MONTHS."""
+    growth = np.log1p(arrivals).diff()
+    growth[(growth.index >= EXCLUDED_MONTHS[0]) & (growth.index <= EXCLUDED_MONTHS[1])] = np.nan
+    return growth - growth.groupby(growth.index % 100).transform('mean')
+
+def build_cube(fx, arrivals, max_lag):
+    """One row per (country, currency, lag) relating arrivals growth to earlier FX returns."""
+    fx_returns = np.log(fx).diff()
+    observations, correlation, elasticity = lagged_regression(
+        fx_returns.to_numpy(), arrivals_growth(arrivals).to_numpy(), max_lag)
+    # (lag, currency, country) -> country-major rows
+    lag, currency, country = np.indices(observations.shape).reshape(3, -1)
+    order = np.lexsort((lag, currency, country))
+    return pd.DataFrame({
+        'country_id': arrivals.columns.to_numpy(np.int64)[country[order]],
+        'currency_code': fx.columns.to_numpy()[currency[order]],
+        'lag_months': lag[order],
+        'observations': observations.ravel()[order],
+        'correlation': correlation.ravel()[order],
+        'elasticity': elasticity.ravel()[order],
+    })
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Correlate every currency with every market's arrivals at lags 0-N.")
+    parser.add_argument('--max-lag', type=int, default=MAX_LAG, help="Longest FX lead in months")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(DB_PATH)
+    for table, script in REQUIRED_TABLES.items():
+        if not has_key(conn, table):
+            print(f"⚠️ {table} not found. Run {script} first.")
+            conn.close()
+            return
+
+    fx, arrivals = load_matrices(conn)
+    started = time.perf_counter()
+    df = build_cube(fx, arrivals, args.max_lag)
+    elapsed = time.perf_counter() - started
+
+    with bulk_load(conn):
+        rows = replace_table(conn, df, 'fact_fx_correlation')
+    conn.close()
+    print(f"✅ fact_fx_correlation created: {rows} rows ({fx.shape[1]} currencies x {arrivals.shape[1]} countries x "
+          f"{args.max_lag + 1} lags over {len(fx)} months, computed in {elapsed * 1000:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
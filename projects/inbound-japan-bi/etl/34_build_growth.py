@@ -0,0 +1,106 @@
+import argparse
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from warehouse import has_key, replace_table
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common.sqlite_bulk import bulk_load
+
+# Config - cross-platform path resolution
+DB_PATH = Path(__file__).parent.parent / "data" / "inbound_japan.db"
+
+FACT_TABLE = 'fact_inbound_arrivals_monthly'
+TOTAL_ID = 0  # country_id of the national total, as in fact_forecast_monthly
+# Marketing priority from YTD growth against the same months a year earlier
+HIGH_PRIORITY_GROWTH = 0.15
+MEDIUM_PRIORITY_GROWTH = 0.05
+
+def load_series(conn):
+    """Visitors as a (series x month) frame over consecutive months: the national total first, then each country."""
+    df = pd.read_sql(f"SELECT month_id, country_id, visitors_total FROM {FACT_TABLE}", conn)
+    wide = df.pivot_table(index='country_id', columns='month_id', values='visitors_total',
+                          aggfunc='sum', fill_value=0)
+    first, last = wide.columns.min(), wide.columns.max()
+    periods = pd.period_range(f"{first // 100}-{first % 100:02d}", f"{last // 100}-{last % 100:02d}", freq='M')
+    wide = wide.reindex(columns=periods.year * 100 + periods.month, fill_value=0)
+    return pd.concat([wide.sum(axis=0).to_frame(TOTAL_ID).T, wide])
+
+def window_sums(cumulative, ends, lengths):
+    """
+    Sums of the `lengths` months ending at month index `ends` (inclusive),
+    from a (series, months + 1) cumulative sum that starts at zero: two
+    lookups per cell whatever the window. NaN where the window starts
+    before the first month.
+    """
+    starts = ends + 1 - lengths
+    sums = cumulative[:, np.maximum(ends + 1, 0)] - cumulative[:, np.maximum(starts, 0)]
+    return np.where(starts >= 0, sums, np.nan)
+
+def growth(current, prior):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(prior > 0, current / prior - 1, np.nan)
+
+def build_growth(series):
+    """
+    Month, YTD and trailing-12-month visitors with their year-over-year
+    growth for every (as-of month, series). A window reaching back before
+    the first month is NaN rather than a partial sum, so a history that
+    starts mid-year has no YTD until the next January and growth never
+    compares a partial period with a full one.
+    """
+    values = series.to_numpy(np.float64)
+    cumulative = np.concatenate([np.zeros((len(values), 1)), np.cumsum(values, axis=1)], axis=1)
+    month_ids = series.columns.to_numpy(np.int64)
+    t = np.arange(len(month_ids))
+    ytd_months = month_ids % 100
+
+    current = {name: window_sums(cumulative, t, lengths)
+               for name, lengths in (('month', 1), ('ytd', ytd_months), ('t12m', 12))}
+    prior = {name: window_sums(cumulative, t - 12, lengths)
+             for name, lengths in (('month', 1), ('ytd', ytd_months), ('t12m', 12))}
+    ytd_growth = growth(current['ytd'], prior['ytd'])
+    recommendation = np.select(
+        [ytd_growth >= HIGH_PRIORITY_GROWTH, ytd_growth >= MEDIUM_PRIORITY_GROWTH, np.isnan(ytd_growth)],
+        ['High Priority', 'Medium Priority', None], default='Maintain')
+
+    return pd.DataFrame({
+        'month_id': np.tile(month_ids, len(series)),
+        'country_id': np.repeat(series.index.to_numpy(np.int64), len(month_ids)),
+        'visitors_month': current['month'].ravel(),
+        'visitors_ytd': current['ytd'].ravel(),
+        'visitors_t12m': current['t12m'].ravel(),
+        'yoy_growth': growth(current['month'], prior['month']).ravel(),
+        'ytd_growth': ytd_growth.ravel(),
+        't12m_growth': growth(current['t12m'], prior['t12m']).ravel(),
+        'recommendation': recommendation.ravel(),
+    })
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute YoY, YTD and trailing-12-month growth for every as-of month.")
+    parser.parse_args(argv)
+
+    conn = sqlite3.connect(DB_PATH)
+    if not has_key(conn, FACT_TABLE):
+        print(f"⚠️ {FACT_TABLE} not found. Run 20_build_fact_inbound_arrivals.py first.")
+        conn.close()
+        return
+
+    series = load_series(conn)
+    started = time.perf_counter()
+    df = build_growth(series)
+    elapsed = time.perf_counter() - started
+
+    with bulk_load(conn):
+        rows = replace_table(conn, df, 'agg_growth_monthly')
+    conn.close()
+    print(f"✅ agg_growth_monthly created: {rows} rows ({len(series)} series x {series.shape[1]} as-of months, "
+          f"computed in {elapsed * 1000:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
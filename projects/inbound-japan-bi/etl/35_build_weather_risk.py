@@ -0,0 +1,109 @@
+import argparse
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from warehouse import has_key, replace_table
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common.sqlite_bulk import bulk_load
+
+# Config - cross-platform path resolution
+DB_PATH = Path(__file__).parent.parent / "data" / "inbound_japan.db"
+
+FACT_TABLE = 'fact_weather_daily'
+PRECIPITATION_PERCENTILES = (50, 90)
+# measure -> daily conditions it counts
+CONDITION_DAYS = {
+    'heatwave_days': ['Heatwave'],
+    'rainy_days': ['Rain', 'Typhoon'],
+    'typhoon_days': ['Typhoon'],
+    'snow_days': ['Snow'],
+}
+
+def grouped_percentiles(groups, values, n_groups, percentiles):
+    """
+    Linear-interpolation percentiles of `values` within each of n_groups
+    integer groups, NaN values ignored: one sort by (group, value), then
+    every group's ranks are offsets from its start. Returns
+    (n_groups, len(percentiles)), NaN for empty groups.
+    """
+    valid = ~np.isnan(values)
+    groups, values = groups[valid], values[valid]
+    result = np.full((n_groups, len(percentiles)), np.nan)
+    if not len(values):
+        return result
+    sorted_values = values[np.lexsort((values, groups))]
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+
+    present = counts > 0
+    position = (counts[present, None] - 1) * (np.asarray(percentiles) / 100)
+    below = np.floor(position).astype(np.int64)
+    above = np.minimum(below + 1, counts[present, None] - 1)
+    low = sorted_values[starts[present, None] + below]
+    high = sorted_values[starts[present, None] + above]
+    result[present] = low + (high - low) * (position - below)
+    return result
+
+def grouped_extreme(ufunc, groups, values, n_groups, initial):
+    out = np.full(n_groups, initial)
+    ufunc.at(out, groups, values)
+    return np.where(np.isinf(out), np.nan, out)
+
+def build_risk(daily):
+    """Every (month, city) weather-risk measure from one pass over the daily rows."""
+    cells, groups = np.unique(np.column_stack([daily['date_id'].to_numpy() // 100,
+                                               daily['weather_loc_id'].to_numpy()]), axis=0, return_inverse=True)
+    groups = groups.ravel()
+    n_groups = len(cells)
+    temp_max = daily['temp_max'].to_numpy(np.float64)
+    temp_min = daily['temp_min'].to_numpy(np.float64)
+    precipitation = daily['precipitation_mm'].to_numpy(np.float64)
+
+    df = pd.DataFrame({'month_id': cells[:, 0], 'weather_loc_id': cells[:, 1],
+                       'days': np.bincount(groups, minlength=n_groups)})
+    condition = daily['condition'].to_numpy()
+    for column, conditions in CONDITION_DAYS.items():
+        df[column] = np.bincount(groups, weights=np.isin(condition, conditions), minlength=n_groups).astype(np.int64)
+
+    has_max = ~np.isnan(temp_max)
+    df['avg_max_temp'] = (np.bincount(groups[has_max], weights=temp_max[has_max], minlength=n_groups)
+                          / np.bincount(groups[has_max], minlength=n_groups))
+    df['temp_max'] = grouped_extreme(np.fmax, groups, temp_max, n_groups, -np.inf)
+    df['temp_min'] = grouped_extreme(np.fmin, groups, temp_min, n_groups, np.inf)
+    bands = grouped_percentiles(groups, precipitation, n_groups, PRECIPITATION_PERCENTILES)
+    for p, band in zip(PRECIPITATION_PERCENTILES, bands.T):
+        df[f'precipitation_p{p}_mm'] = band
+    df['precipitation_max_mm'] = grouped_extreme(np.fmax, groups, precipitation, n_groups, -np.inf)
+    return df
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the city x month weather-risk matrix from the daily weather fact.")
+    parser.parse_args(argv)
+
+    conn = sqlite3.connect(DB_PATH)
+    if not has_key(conn, FACT_TABLE):
+        print(f"⚠️ {FACT_TABLE} not found. Run 22_build_fact_weather.py first.")
+        conn.close()
+        return
+
+    started = time.perf_counter()
+    daily = pd.read_sql(f"""
+        SELECT date_id, weather_loc_id, temp_max, temp_min, condition, precipitation_mm FROM {FACT_TABLE}
+    """, conn)
+    df = build_risk(daily)
+    elapsed = time.perf_counter() - started
+
+    with bulk_load(conn):
+        rows = replace_table(conn, df, 'agg_weather_risk_monthly')
+    conn.close()
+    print(f"✅ agg_weather_risk_monthly created: {rows} rows ({df['weather_loc_id'].nunique()} cities x "
+          f"{df['month_id'].nunique()} months from {len(daily):,} daily rows in {elapsed * 1000:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
@@ -1,259 +1,409 @@
+import argparse
+import gzip
+import hashlib
+import os
 import pandas as pd
 import sqlite3
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+try:
+    import brotli
+except ImportError:  # optional: .br siblings are skipped without it
+    brotli = None
+
 # Config - cross-platform path resolution
 DB_PATH = Path(__file__).parent.parent / "data" / "inbound_japan.db"
 OUTPUT_DIR = Path(__file__).parent.parent / "dashboard" / "data"
 OUTPUT_FILE = OUTPUT_DIR / "dashboard_data.json"
+MANIFEST_FILE = OUTPUT_DIR / "manifest.json"
+SECTIONS_DIR = OUTPUT_DIR / "sections"
+HASH_LENGTH = 12  # Hex digits of the content hash kept in section file names
+# Section payload format: 1 = list of records, 2 = columnar (see encode_columnar)
+FORMAT_VERSION = 2
+# Sections exported as a dense matrix in format 2: (row key, column key, value)
+MATRIX_SECTIONS = {'seasonality': ('country_name_en', 'month', 'avg_visitors')}
+QUERY_WORKERS = 4  # Concurrent read-only connections; 1 runs the queries in order
 
-def main():
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-        
-    conn = sqlite3.connect(DB_PATH)
-    
-    # Query 1: Total Monthly Visitors
-    query_monthly = """
+# Query 1: Total Monthly Visitors
+QUERY_MONTHLY = """
+SELECT 
+    m.year, m.month, m.month_name,
+    SUM(f.visitors_total) as total_visitors
+FROM fact_inbound_arrivals_monthly f
+JOIN dim_month m ON f.month_id = m.month_id
+GROUP BY m.year, m.month
+ORDER BY m.year, m.month
+"""
+
+# Query 2: Top Countries (Latest Year)
+QUERY_COUNTRIES = """
+SELECT 
+    c.country_name_en,
+    SUM(f.visitors_total) as total_visitors
+FROM fact_inbound_arrivals_monthly f
+JOIN dim_country c ON f.country_id = c.country_id
+JOIN dim_month m ON f.month_id = m.month_id
+WHERE m.year = 2024
+GROUP BY c.country_name_en
+ORDER BY total_visitors DESC
+LIMIT 10
+"""
+
+# Query 3: Seasonality Heatmap Data (Avg visitors per month per country)
+QUERY_SEASONALITY = """
+SELECT 
+    c.country_name_en,
+    m.month,
+    AVG(f.visitors_total) as avg_visitors
+FROM fact_inbound_arrivals_monthly f
+JOIN dim_country c ON f.country_id = c.country_id
+JOIN dim_month m ON f.month_id = m.month_id
+WHERE m.year >= 2019
+GROUP BY c.country_name_en, m.month
+"""
+
+# Query 4: FX Rates vs Total Visitors (Monthly Avg)
+# Monthly avg rates come from agg_fx_monthly to match visitor grain
+QUERY_FX_IMPACT = """
+WITH monthly_visitors AS (
     SELECT 
-        m.year, m.month, m.month_name,
-        SUM(f.visitors_total) as total_visitors
-    FROM fact_inbound_arrivals_monthly f
-    JOIN dim_month m ON f.month_id = m.month_id
-    GROUP BY m.year, m.month
-    ORDER BY m.year, m.month
-    """
-    df_monthly = pd.read_sql(query_monthly, conn)
-    
-    # Query 2: Top Countries (Latest Year)
-    query_countries = """
+        v.month_id, m.year, m.month,
+        SUM(v.visitors_total) as total_visitors
+    FROM fact_inbound_arrivals_monthly v
+    JOIN dim_month m ON v.month_id = m.month_id
+    GROUP BY 1
+)
+SELECT 
+    v.year, v.month,
+    v.total_visitors,
+    fx.avg_rate as usd_rate
+FROM monthly_visitors v
+JOIN agg_fx_monthly fx ON fx.month_id = v.month_id
+WHERE fx.currency_code = 'USD' -- Focus on USD for main chart
+ORDER BY v.year, v.month
+"""
+
+# Query 5: Weather Risk (every city, agg_weather_risk_monthly, 35_build_weather_risk.py)
+QUERY_WEATHER = """
+SELECT
+    m.year, m.month,
+    l.city_name,
+    w.avg_max_temp,
+    w.temp_max,
+    w.temp_min,
+    w.heatwave_days,
+    w.rainy_days,
+    w.typhoon_days,
+    w.precipitation_p90_mm,
+    w.precipitation_max_mm
+FROM agg_weather_risk_monthly w
+JOIN dim_month m ON w.month_id = m.month_id
+JOIN dim_weather_location l ON w.weather_loc_id = l.weather_loc_id
+ORDER BY w.weather_loc_id, w.month_id
+"""
+
+# Query 6: Airport Capacity (Monthly Flights by Airport)
+QUERY_FLIGHTS = """
+SELECT 
+    m.year, m.month,
+    a.airport_code,
+    f.total_flights
+FROM agg_flights_monthly f
+JOIN dim_month m ON f.month_id = m.month_id
+JOIN dim_airport a ON f.airport_id = a.airport_id
+WHERE m.year >= 2023
+ORDER BY 1, 2, 3
+"""
+
+# ==== PRESCRIPTIVE ANALYTICS ====
+
+# Query 7: Marketing Recommendations (YTD growth as of the latest month, agg_growth_monthly, 34_build_growth.py)
+QUERY_MARKETING_PRIORITY = """
+WITH as_of AS (
+    SELECT MAX(month_id) AS month_id FROM agg_growth_monthly
+)
+SELECT
+    g.month_id / 100 as year,
+    g.month_id % 100 as month,
+    c.country_name_en,
+    g.visitors_ytd,
+    ROUND(g.ytd_growth * 100, 1) as growth_rate,
+    g.recommendation
+FROM agg_growth_monthly g
+JOIN as_of a ON g.month_id = a.month_id
+JOIN dim_country c ON g.country_id = c.country_id
+WHERE g.ytd_growth IS NOT NULL
+ORDER BY g.ytd_growth DESC
+LIMIT 8
+"""
+
+# Query 8: Staffing Forecast (national total from fact_forecast_monthly, 31_build_forecasts.py)
+# Covers the first forecast calendar year with all 12 months; staff = visitors / visitors per staff member
+PEAK_MONTHS = (3, 4, 10, 11)
+VISITORS_PER_STAFF_PEAK = 80
+VISITORS_PER_STAFF_OFF_PEAK = 120
+QUERY_STAFFING = f"""
+WITH national AS (
+    SELECT month_id / 100 AS year, month_id % 100 AS month, visitors_forecast, visitors_lower, visitors_upper
+    FROM fact_forecast_monthly
+    WHERE country_id = 0
+),
+target_year AS (
+    SELECT MIN(year) AS year FROM (SELECT year FROM national GROUP BY year HAVING COUNT(*) = 12)
+)
+SELECT
+    n.year,
+    n.month,
+    ROUND(n.visitors_forecast) as projected_visitors,
+    ROUND(n.visitors_lower) as projected_visitors_low,
+    ROUND(n.visitors_upper) as projected_visitors_high,
+    ROUND(n.visitors_forecast / CASE
+        WHEN n.month IN ({", ".join(map(str, PEAK_MONTHS))}) THEN {VISITORS_PER_STAFF_PEAK}
+        ELSE {VISITORS_PER_STAFF_OFF_PEAK}
+    END) as recommended_staff
+FROM national n
+JOIN target_year t ON n.year = t.year
+ORDER BY n.month
+"""
+
+# Query 9: Capacity Health (Airport Utilization)
+QUERY_CAPACITY = """
+WITH recent_flights AS (
     SELECT 
-        c.country_name_en,
-        SUM(f.visitors_total) as total_visitors
-    FROM fact_inbound_arrivals_monthly f
-    JOIN dim_country c ON f.country_id = c.country_id
+        a.airport_code,
+        a.airport_name,
+        AVG(f.total_flights) as avg_monthly_flights
+    FROM agg_flights_monthly f
     JOIN dim_month m ON f.month_id = m.month_id
+    JOIN dim_airport a ON f.airport_id = a.airport_id
     WHERE m.year = 2024
-    GROUP BY c.country_name_en
-    ORDER BY total_visitors DESC
-    LIMIT 10
-    """
-    df_countries = pd.read_sql(query_countries, conn)
-    
-    # Query 3: Seasonality Heatmap Data (Avg visitors per month per country)
-    query_seasonality = """
-    SELECT 
-        c.country_name_en,
-        m.month,
-        AVG(f.visitors_total) as avg_visitors
-    FROM fact_inbound_arrivals_monthly f
-    JOIN dim_country c ON f.country_id = c.country_id
-    JOIN dim_month m ON f.month_id = m.month_id
-    WHERE m.year >= 2019
-    GROUP BY c.country_name_en, m.month
-    """
-    df_seasonality = pd.read_sql(query_seasonality, conn)
-    
-    # Query 4: FX Rates vs Total Visitors (Monthly Avg)
-    # We aggregate daily rates to monthly avg to match visitor grain
-    query_fx_impact = """
-    WITH monthly_fx AS (
-        SELECT 
-            strftime('%Y', d.date) as year,
-            strftime('%m', d.date) as month,
-            f.currency_code,
-            AVG(f.rate_jpy_per_currency) as avg_rate
-        FROM fact_fx_rate_daily f
-        JOIN dim_date d ON f.date_id = d.date_id
-        WHERE f.currency_code = 'USD' -- Focus on USD for main chart
-        GROUP BY 1, 2, 3
-    ),
-    monthly_visitors AS (
-        SELECT 
-            m.year, m.month,
-            SUM(v.visitors_total) as total_visitors
-        FROM fact_inbound_arrivals_monthly v
-        JOIN dim_month m ON v.month_id = m.month_id
-        GROUP BY 1, 2
+    GROUP BY a.airport_code, a.airport_name
+),
+capacity_limits AS (
+    SELECT 'NRT' as code, 8000 as capacity UNION
+    SELECT 'HND', 7500 UNION
+    SELECT 'KIX', 5000 UNION
+    SELECT 'FUK', 3000 UNION
+    SELECT 'CTS', 2500
+)
+SELECT 
+    r.airport_code,
+    r.airport_name,
+    ROUND(r.avg_monthly_flights) as current_flights,
+    c.capacity as max_capacity,
+    ROUND((r.avg_monthly_flights * 100.0 / c.capacity), 1) as utilization_pct,
+    CASE 
+        WHEN (r.avg_monthly_flights / c.capacity) >= 0.85 THEN 'Critical'
+        WHEN (r.avg_monthly_flights / c.capacity) >= 0.70 THEN 'Warning'
+        ELSE 'Healthy'
+    END as status
+FROM recent_flights r
+JOIN capacity_limits c ON r.airport_code = c.code
+ORDER BY utilization_pct DESC
+"""
+
+# Query 10: Demand Scenarios (simulated FX / weather / capacity bands, 32_build_scenarios.py)
+# Same year as the staffing forecast; the national total first, then each country
+QUERY_SCENARIOS = """
+WITH target_year AS (
+    SELECT MIN(year) AS year FROM (
+        SELECT month_id / 100 AS year FROM fact_scenario_monthly
+        WHERE country_id = 0 GROUP BY year HAVING COUNT(*) = 12
     )
-    SELECT 
-        v.year, v.month,
-        v.total_visitors,
-        fx.avg_rate as usd_rate
-    FROM monthly_visitors v
-    JOIN monthly_fx fx ON v.year = fx.year AND v.month = fx.month
-    ORDER BY v.year, v.month
+)
+SELECT
+    s.month_id / 100 as year,
+    s.month_id % 100 as month,
+    COALESCE(c.country_name_en, 'All markets') as country_name_en,
+    ROUND(s.visitors_p10) as visitors_p10,
+    ROUND(s.visitors_p50) as visitors_p50,
+    ROUND(s.visitors_p90) as visitors_p90
+FROM fact_scenario_monthly s
+JOIN target_year t ON s.month_id / 100 = t.year
+LEFT JOIN dim_country c ON s.country_id = c.country_id
+ORDER BY s.country_id, s.month_id
+"""
+
+# Query 11: FX Sensitivity (every market x currency x lag, 33_build_fx_correlations.py)
+QUERY_FX_SENSITIVITY = """
+SELECT
+    c.country_name_en,
+    f.currency_code,
+    f.currency_code = c.currency_code as is_home_currency,
+    f.lag_months,
+    f.observations,
+    ROUND(f.correlation, 3) as correlation,
+    ROUND(f.elasticity, 3) as elasticity
+FROM fact_fx_correlation f
+JOIN dim_country c ON f.country_id = c.country_id
+ORDER BY c.country_name_en, f.currency_code, f.lag_months
+"""
+
+# JSON key -> query, in export order
+QUERIES = {
+    "monthly_trend": QUERY_MONTHLY,
+    "top_countries_2024": QUERY_COUNTRIES,
+    "seasonality": QUERY_SEASONALITY,
+    "fx_impact": QUERY_FX_IMPACT,
+    "weather_risk": QUERY_WEATHER,
+    "airport_capacity": QUERY_FLIGHTS,
+    "marketing_recommendations": QUERY_MARKETING_PRIORITY,
+    "staffing_forecast": QUERY_STAFFING,
+    "capacity_health": QUERY_CAPACITY,
+    "demand_scenarios": QUERY_SCENARIOS,
+    "fx_sensitivity": QUERY_FX_SENSITIVITY
+}
+
+def connect_read_only(db_path=DB_PATH):
+    # mode=ro fails instead of creating an empty database, and never takes a write lock
+    return sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+
+def run_query(name, query, db_path=DB_PATH):
+    """Runs one export query on its own connection. Returns (name, DataFrame, seconds)."""
+    t0 = time.perf_counter()
+    conn = connect_read_only(db_path)
+    try:
+        df = pd.read_sql(query, conn)
+    finally:
+        conn.close()
+    return name, df, time.perf_counter() - t0
+
+def run_queries(queries=QUERIES, db_path=DB_PATH, workers=QUERY_WORKERS):
     """
-    df_fx_impact = pd.read_sql(query_fx_impact, conn)
+    Runs the independent export queries on a pool of read-only connections
+    (sqlite3 releases the GIL while a query steps). Returns
+    {name: (DataFrame, seconds)} in `queries` order.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(run_query, name, query, db_path) for name, query in queries.items()]
+        results = {name: (df, seconds) for name, df, seconds in (f.result() for f in futures)}
+    return {name: results[name] for name in queries}
 
-    # Query 5: Weather Risk (Tokyo Heatwaves/Rain)
-    # Aggregated by Month for simple visualization
-    query_weather = """
-    SELECT 
-        strftime('%Y', d.date) as year,
-        strftime('%m', d.date) as month,
-        AVG(w.temp_max) as avg_max_temp,
-        SUM(CASE WHEN w.condition = 'Heatwave' THEN 1 ELSE 0 END) as heatwave_days,
-        SUM(CASE WHEN w.condition IN ('Rain', 'Typhoon') THEN 1 ELSE 0 END) as rainy_days
-    FROM fact_weather_daily w
-    JOIN dim_date d ON w.date_id = d.date_id
-    JOIN dim_weather_location l ON w.weather_loc_id = l.weather_loc_id
-    WHERE l.city_name = 'Tokyo' -- Focus on Tokyo for summary
-    GROUP BY 1, 2
-    ORDER BY 1, 2
+def print_timings(results, wall):
+    print(f"{'Query':28} {'Rows':>7} {'ms':>9}")
+    for name, (df, seconds) in sorted(results.items(), key=lambda item: -item[1][1]):
+        print(f"{name:28} {len(df):7} {seconds * 1000:9.1f}")
+    total = sum(seconds for _, seconds in results.values())
+    print(f"⏱️  Wall {wall * 1000:.1f} ms for {total * 1000:.1f} ms of queries")
+
+def json_values(values):
+    # NaN is not valid JSON; export missing numbers as null
+    return [None if v != v else v for v in values]
+
+def encode_columnar(df):
     """
-    df_weather = pd.read_sql(query_weather, conn)
+    Format 2 table: one array per column instead of one dict per row.
+    String columns are dictionary-encoded: their array holds indexes into
+    dictionaries[column] (null for missing values).
+    """
+    values, dictionaries = [], {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            values.append(json_values(series.tolist()))
+        else:
+            codes, labels = pd.factorize(series)
+            dictionaries[col] = labels.tolist()
+            values.append([None if c < 0 else c for c in codes.tolist()])
+    return {'columns': list(df.columns), 'values': values, 'dictionaries': dictionaries}
 
-    # Query 6: Airport Capacity (Monthly Flights by Airport)
-    query_flights = """
-    SELECT 
-        strftime('%Y', d.date) as year,
-        strftime('%m', d.date) as month,
-        a.airport_code,
-        SUM(f.flights_count) as total_flights
-    FROM fact_flights_daily f
-    JOIN dim_date d ON f.date_id = d.date_id
-    JOIN dim_airport a ON f.airport_id = a.airport_id
-    WHERE d.year >= 2023
-    GROUP BY 1, 2, 3
-    ORDER BY 1, 2, 3
+def encode_matrix(df, row_key, col_key, value_key):
+    """Format 2 dense matrix: values[i][j] is value_key for rows[i] x cols[j] (null when absent)."""
+    grid = df.pivot(index=row_key, columns=col_key, values=value_key)
+    return {
+        'row_key': row_key, 'col_key': col_key, 'value_key': value_key,
+        'rows': grid.index.tolist(), 'cols': grid.columns.tolist(),
+        'values': [json_values(row) for row in grid.to_numpy().tolist()]
+    }
+
+def encode_section(name, df, version=FORMAT_VERSION):
+    """Returns (encoding, payload) for one query result."""
+    if version == 1:
+        return 'records', df.to_dict(orient="records")
+    if name in MATRIX_SECTIONS:
+        return 'matrix', encode_matrix(df, *MATRIX_SECTIONS[name])
+    return 'columnar', encode_columnar(df)
+
+def write_if_missing(path, payload):
+    # Content-addressed: an existing file already holds exactly these bytes
+    if not path.exists():
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(payload)
+        os.replace(tmp, path)
+
+def write_section(name, df, version=FORMAT_VERSION, sections_dir=SECTIONS_DIR):
     """
-    df_flights = pd.read_sql(query_flights, conn)
-
-    # ==== NEW: PRESCRIPTIVE ANALYTICS ====
-    
-    # Query 7: Marketing Recommendations (2025 Growth + FX Scoring)
-    query_marketing_priority = """
-    WITH country_growth AS (
-        SELECT 
-            c.country_name_en,
-            SUM(CASE WHEN m.year = 2025 AND m.month <= 11 THEN f.visitors_total ELSE 0 END) as visitors_2025_ytd,
-            SUM(CASE WHEN m.year = 2024 AND m.month <= 11 THEN f.visitors_total ELSE 0 END) as visitors_2024_ytd
-        FROM fact_inbound_arrivals_monthly f
-        JOIN dim_country c ON f.country_id = c.country_id
-        JOIN dim_month m ON f.month_id = m.month_id
-        WHERE m.year IN (2024, 2025)
-        GROUP BY c.country_name_en
-    )
-    SELECT 
-        country_name_en,
-        visitors_2025_ytd,
-        ROUND((visitors_2025_ytd * 1.0 / NULLIF(visitors_2024_ytd, 0) - 1) * 100, 1) as growth_rate,
-        CASE 
-            WHEN (visitors_2025_ytd * 1.0 / NULLIF(visitors_2024_ytd, 0) - 1) >= 0.15 THEN 'High Priority'
-            WHEN (visitors_2025_ytd * 1.0 / NULLIF(visitors_2024_ytd, 0) - 1) >= 0.05 THEN 'Medium Priority'
-            ELSE 'Maintain'
-        END as recommendation
-    FROM country_growth
-    WHERE visitors_2024_ytd > 0
-    ORDER BY growth_rate DESC
-    LIMIT 8
+    Writes one section as <name>.<hash>.json plus precompressed .gz / .br
+    siblings. Returns its manifest entry.
     """
-    df_marketing = pd.read_sql(query_marketing_priority, conn)
-    
-    # Query 8: Staffing Forecast (2026 Projection Based on 2025 Actuals)
-    # Using 2024→2025 growth to project 2026 demand
-    query_staffing = """
-    WITH base_2024 AS (
-        SELECT 
-            m.month,
-            SUM(f.visitors_total) as actual_2024
-        FROM fact_inbound_arrivals_monthly f
-        JOIN dim_month m ON f.month_id = m.month_id
-        WHERE m.year = 2024
-        GROUP BY m.month
-    ),
-    growth_factor AS (
-        -- Calculate average growth rate from available 2025 data
-        SELECT 
-            CASE 
-                WHEN SUM(total_2024) > 0 THEN AVG(total_2025 * 1.0 / NULLIF(total_2024, 0))
-                ELSE 1.08  -- Default 8% growth if no data
-            END as growth
-        FROM (
-            SELECT 
-                SUM(CASE WHEN m.year = 2025 THEN f.visitors_total ELSE 0 END) as total_2025,
-                SUM(CASE WHEN m.year = 2024 AND m.month <= 11 THEN f.visitors_total ELSE 0 END) as total_2024
-            FROM fact_inbound_arrivals_monthly f
-            JOIN dim_month m ON f.month_id = m.month_id
-            WHERE m.year IN (2024, 2025)
-        )
-    )
-    SELECT 
-        b.month,
-        ROUND(b.actual_2024 * g.growth) as projected_2026_visitors,
-        CASE 
-            WHEN b.month IN (3, 4, 10, 11) THEN ROUND((b.actual_2024 * g.growth) / 80)
-            ELSE ROUND((b.actual_2024 * g.growth) / 120)
-        END as recommended_staff
-    FROM base_2024 b, growth_factor g
-    ORDER BY b.month
+    encoding, content = encode_section(name, df, version)
+    payload = json.dumps(content, separators=(',', ':')).encode()
+    digest = hashlib.sha256(payload).hexdigest()
+    path = sections_dir / f"{name}.{digest[:HASH_LENGTH]}.json"
+
+    write_if_missing(path, payload)
+    write_if_missing(path.with_name(path.name + ".gz"), gzip.compress(payload, compresslevel=9, mtime=0))
+    if brotli is not None:
+        write_if_missing(path.with_name(path.name + ".br"), brotli.compress(payload, quality=11))
+    return {'file': path.relative_to(sections_dir.parent).as_posix(), 'encoding': encoding,
+            'rows': len(df), 'bytes': len(payload), 'sha256': digest}
+
+def write_bundle(frames, version=FORMAT_VERSION, output_dir=OUTPUT_DIR):
     """
-    df_staffing = pd.read_sql(query_staffing, conn)
-    
-    # Query 9: Capacity Health (Airport Utilization)
-    query_capacity = """
-    WITH recent_flights AS (
-        SELECT 
-            a.airport_code,
-            a.airport_name,
-            AVG(f.total_flights) as avg_monthly_flights
-        FROM (
-            SELECT 
-                airport_id,
-                strftime('%Y', d.date) as year,
-                strftime('%m', d.date) as month,
-                SUM(flights_count) as total_flights
-            FROM fact_flights_daily
-            JOIN dim_date d ON fact_flights_daily.date_id = d.date_id
-            WHERE d.year = 2024
-            GROUP BY airport_id, year, month
-        ) f
-        JOIN dim_airport a ON f.airport_id = a.airport_id
-        GROUP BY a.airport_code, a.airport_name
-    ),
-    capacity_limits AS (
-        SELECT 'NRT' as code, 8000 as capacity UNION
-        SELECT 'HND', 7500 UNION
-        SELECT 'KIX', 5000 UNION
-        SELECT 'FUK', 3000 UNION
-        SELECT 'CTS', 2500
-    )
-    SELECT 
-        r.airport_code,
-        r.airport_name,
-        ROUND(r.avg_monthly_flights) as current_flights,
-        c.capacity as max_capacity,
-        ROUND((r.avg_monthly_flights * 100.0 / c.capacity), 1) as utilization_pct,
-        CASE 
-            WHEN (r.avg_monthly_flights / c.capacity) >= 0.85 THEN 'Critical'
-            WHEN (r.avg_monthly_flights / c.capacity) >= 0.70 THEN 'Warning'
-            ELSE 'Healthy'
-        END as status
-    FROM recent_flights r
-    JOIN capacity_limits c ON r.airport_code = c.code
-    ORDER BY utilization_pct DESC
+    Writes every section file, then swaps in manifest.json, the only
+    mutable file. Sections referenced by neither the new nor the previous
+    manifest are pruned, so a page that loaded the old manifest can still
+    fetch its sections.
     """
-    df_capacity = pd.read_sql(query_capacity, conn)
-
-    data = {
-        "monthly_trend": df_monthly.to_dict(orient="records"),
-        "top_countries_2024": df_countries.to_dict(orient="records"),
-        "seasonality": df_seasonality.to_dict(orient="records"),
-        "fx_impact": df_fx_impact.to_dict(orient="records"),
-        "weather_risk": df_weather.to_dict(orient="records"),
-        "airport_capacity": df_flights.to_dict(orient="records"),
-        # NEW: Prescriptive insights
-        "marketing_recommendations": df_marketing.to_dict(orient="records"),
-        "staffing_forecast": df_staffing.to_dict(orient="records"),
-        "capacity_health": df_capacity.to_dict(orient="records")
+    sections_dir = output_dir / SECTIONS_DIR.name
+    manifest_file = output_dir / MANIFEST_FILE.name
+    sections_dir.mkdir(parents=True, exist_ok=True)
+
+    previous = json.loads(manifest_file.read_text()) if manifest_file.exists() else {'sections': {}}
+    manifest = {
+        'version': version,
+        'generated_at': time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        'sections': {name: write_section(name, df, version, sections_dir) for name, df in frames.items()}
     }
-    
-    with open(OUTPUT_FILE, "w") as f:
-        json.dump(data, f)
+    tmp = manifest_file.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp, manifest_file)
+
+    keep = {Path(entry['file']).name for m in (manifest, previous) for entry in m['sections'].values()}
+    for path in sections_dir.iterdir():
+        if path.name.split(".json")[0] + ".json" not in keep:
+            path.unlink()
+    return manifest
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export warehouse aggregates to dashboard JSON.")
+    parser.add_argument('--workers', type=int, default=QUERY_WORKERS,
+                        help="Queries run concurrently on read-only connections (1 = sequential)")
+    parser.add_argument('--single-file', action='store_true',
+                        help="Also write the monolithic dashboard_data.json (records)")
+    parser.add_argument('--format-version', type=int, choices=(1, 2), default=FORMAT_VERSION,
+                        help="Section payloads: 1 = records, 2 = columnar / matrix")
+    args = parser.parse_args(argv)
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    started = time.perf_counter()
+    results = run_queries(QUERIES, DB_PATH, args.workers)
+    frames = {name: df for name, (df, _) in results.items()}
+
+    manifest = write_bundle(frames, args.format_version)
+    if args.single_file:
+        data = {name: df.to_dict(orient="records") for name, df in frames.items()}
+        with open(OUTPUT_FILE, "w") as f:
+            json.dump(data, f)
         
-    print(f"✅ Dashboard data exported to: {OUTPUT_FILE}")
-    conn.close()
+    print_timings(results, time.perf_counter() - started)
+    total_bytes = sum(entry['bytes'] for entry in manifest['sections'].values())
+    print(f"✅ Dashboard data exported to: {MANIFEST_FILE} "
+          f"({len(manifest['sections'])} sections, {total_bytes / 1024:.1f} KiB)")
 
 if __name__ == "__main__":
     main()
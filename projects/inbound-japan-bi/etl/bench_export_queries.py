@@ -0,0 +1,301 @@
+"""
+Before/after benchmark of the dashboard export queries.
+
+"Before" is the nine original export queries on a copy of inbound_japan.db
+rebuilt the way pandas to_sql used to create it: every existing table copied
+with CREATE TABLE AS SELECT, so no primary keys, no indexes and no planner
+statistics. "After" is the current QUERIES of 99_export_for_dashboard.py
+on the warehouse as built from schema.py. Each section reports its median
+latency on both sides; queries whose tables have not been built yet are
+reported as missing, and sections added since as n/a before.
+
+Usage: python bench_export_queries.py [--db PATH] [--repeat N]
+"""
+import argparse
+import sqlite3
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from run_pipeline import DB_PATH, load_stage
+from schema import TABLES
+
+BASELINE_MONTHLY = """
+SELECT
+    m.year, m.month, m.month_name,
+    SUM(f.visitors_total) as total_visitors
+FROM fact_inbound_arrivals_monthly f
+JOIN dim_month m ON f.month_id = m.month_id
+GROUP BY m.year, m.month
+ORDER BY m.year, m.month
+"""
+
+BASELINE_COUNTRIES = """
+SELECT
+    c.country_name_en,
+    SUM(f.visitors_total) as total_visitors
+FROM fact_inbound_arrivals_monthly f
+JOIN dim_country c ON f.country_id = c.country_id
+JOIN dim_month m ON f.month_id = m.month_id
+WHERE m.year = 2024
+GROUP BY c.country_name_en
+ORDER BY total_visitors DESC
+LIMIT 10
+"""
+
+BASELINE_SEASONALITY = """
+SELECT
+    c.country_name_en,
+    m.month,
+    AVG(f.visitors_total) as avg_visitors
+FROM fact_inbound_arrivals_monthly f
+JOIN dim_country c ON f.country_id = c.country_id
+JOIN dim_month m ON f.month_id = m.month_id
+WHERE m.year >= 2019
+GROUP BY c.country_name_en, m.month
+"""
+
+BASELINE_FX_IMPACT = """
+WITH monthly_fx AS (
+    SELECT
+        strftime('%Y', d.date) as year,
+        strftime('%m', d.date) as month,
+        f.currency_code,
+        AVG(f.rate_jpy_per_currency) as avg_rate
+    FROM fact_fx_rate_daily f
+    JOIN dim_date d ON f.date_id = d.date_id
+    WHERE f.currency_code = 'USD' -- Focus on USD for main chart
+    GROUP BY 1, 2, 3
+),
+monthly_visitors AS (
+    SELECT
+        m.year, m.month,
+        SUM(v.visitors_total) as total_visitors
+    FROM fact_inbound_arrivals_monthly v
+    JOIN dim_month m ON v.month_id = m.month_id
+    GROUP BY 1, 2
+)
+SELECT
+    v.year, v.month,
+    v.total_visitors,
+    fx.avg_rate as usd_rate
+FROM monthly_visitors v
+JOIN monthly_fx fx ON v.year = fx.year AND v.month = fx.month
+ORDER BY v.year, v.month
+"""
+
+BASELINE_WEATHER = """
+SELECT
+    strftime('%Y', d.date) as year,
+    strftime('%m', d.date) as month,
+    AVG(w.temp_max) as avg_max_temp,
+    SUM(CASE WHEN w.condition = 'Heatwave' THEN 1 ELSE 0 END) as heatwave_days,
+    SUM(CASE WHEN w.condition IN ('Rain', 'Typhoon') THEN 1 ELSE 0 END) as rainy_days
+FROM fact_weather_daily w
+JOIN dim_date d ON w.date_id = d.date_id
+JOIN dim_weather_location l ON w.weather_loc_id = l.weather_loc_id
+WHERE l.city_name = 'Tokyo' -- Focus on Tokyo for summary
+GROUP BY 1, 2
+ORDER BY 1, 2
+"""
+
+BASELINE_FLIGHTS = """
+SELECT
+    strftime('%Y', d.date) as year,
+    strftime('%m', d.date) as month,
+    a.airport_code,
+    SUM(f.flights_count) as total_flights
+FROM fact_flights_daily f
+JOIN dim_date d ON f.date_id = d.date_id
+JOIN dim_airport a ON f.airport_id = a.airport_id
+WHERE d.year >= 2023
+GROUP BY 1, 2, 3
+ORDER BY 1, 2, 3
+"""
+
+BASELINE_MARKETING_PRIORITY = """
+WITH country_growth AS (
+    SELECT
+        c.country_name_en,
+        SUM(CASE WHEN m.year = 2025 AND m.month <= 11 THEN f.visitors_total ELSE 0 END) as visitors_2025_ytd,
+        SUM(CASE WHEN m.year = 2024 AND m.month <= 11 THEN f.visitors_total ELSE 0 END) as visitors_2024_ytd
+    FROM fact_inbound_arrivals_monthly f
+    JOIN dim_country c ON f.country_id = c.country_id
+    JOIN dim_month m ON f.month_id = m.month_id
+    WHERE m.year IN (2024, 2025)
+    GROUP BY c.country_name_en
+)
+SELECT
+    country_name_en,
+    visitors_2025_ytd,
+    ROUND((visitors_2025_ytd * 1.0 / NULLIF(visitors_2024_ytd, 0) - 1) * 100, 1) as growth_rate,
+    CASE
+        WHEN (visitors_2025_ytd * 1.0 / NULLIF(visitors_2024_ytd, 0) - 1) >= 0.15 THEN 'High Priority'
+        WHEN (visitors_2025_ytd * 1.0 / NULLIF(visitors_2024_ytd, 0) - 1) >= 0.05 THEN 'Medium Priority'
+        ELSE 'Maintain'
+    END as recommendation
+FROM country_growth
+WHERE visitors_2024_ytd > 0
+ORDER BY growth_rate DESC
+LIMIT 8
+"""
+
+BASELINE_STAFFING = """
+WITH base_2024 AS (
+    SELECT
+        m.month,
+        SUM(f.visitors_total) as actual_2024
+    FROM fact_inbound_arrivals_monthly f
+    JOIN dim_month m ON f.month_id = m.month_id
+    WHERE m.year = 2024
+    GROUP BY m.month
+),
+growth_factor AS (
+    -- Calculate average growth rate from available 2025 data
+    SELECT
+        CASE
+            WHEN SUM(total_2024) > 0 THEN AVG(total_2025 * 1.0 / NULLIF(total_2024, 0))
+            ELSE 1.08  -- Default 8% growth if no data
+        END as growth
+    FROM (
+        SELECT
+            SUM(CASE WHEN m.year = 2025 THEN f.visitors_total ELSE 0 END) as total_2025,
+            SUM(CASE WHEN m.year = 2024 AND m.month <= 11 THEN f.visitors_total ELSE 0 END) as total_2024
+        FROM fact_inbound_arrivals_monthly f
+        JOIN dim_month m ON f.month_id = m.month_id
+        WHERE m.year IN (2024, 2025)
+    )
+)
+SELECT
+    b.month,
+    ROUND(b.actual_2024 * g.growth) as projected_2026_visitors,
+    CASE
+        WHEN b.month IN (3, 4, 10, 11) THEN ROUND((b.actual_2024 * g.growth) / 80)
+        ELSE ROUND((b.actual_2024 * g.growth) / 120)
+    END as recommended_staff
+FROM base_2024 b, growth_factor g
+ORDER BY b.month
+"""
+
+BASELINE_CAPACITY = """
+WITH recent_flights AS (
+    SELECT
+        a.airport_code,
+        a.airport_name,
+        AVG(f.total_flights) as avg_monthly_flights
+    FROM (
+        SELECT
+            airport_id,
+            strftime('%Y', d.date) as year,
+            strftime('%m', d.date) as month,
+            SUM(flights_count) as total_flights
+        FROM fact_flights_daily
+        JOIN dim_date d ON fact_flights_daily.date_id = d.date_id
+        WHERE d.year = 2024
+        GROUP BY airport_id, year, month
+    ) f
+    JOIN dim_airport a ON f.airport_id = a.airport_id
+    GROUP BY a.airport_code, a.airport_name
+),
+capacity_limits AS (
+    SELECT 'NRT' as code, 8000 as capacity UNION
+    SELECT 'HND', 7500 UNION
+    SELECT 'KIX', 5000 UNION
+    SELECT 'FUK', 3000 UNION
+    SELECT 'CTS', 2500
+)
+SELECT
+    r.airport_code,
+    r.airport_name,
+    ROUND(r.avg_monthly_flights) as current_flights,
+    c.capacity as max_capacity,
+    ROUND((r.avg_monthly_flights * 100.0 / c.capacity), 1) as utilization_pct,
+    CASE
+        WHEN (r.avg_monthly_flights / c.capacity) >= 0.85 THEN 'Critical'
+        WHEN (r.avg_monthly_flights / c.capacity) >= 0.70 THEN 'Warning'
+        ELSE 'Healthy'
+    END as status
+FROM recent_flights r
+JOIN capacity_limits c ON r.airport_code = c.code
+ORDER BY utilization_pct DESC
+"""
+
+# JSON key -> the query 99_export_for_dashboard.py ran before the schema rework
+BASELINE_QUERIES = {
+    "monthly_trend": BASELINE_MONTHLY,
+    "top_countries_2024": BASELINE_COUNTRIES,
+    "seasonality": BASELINE_SEASONALITY,
+    "fx_impact": BASELINE_FX_IMPACT,
+    "weather_risk": BASELINE_WEATHER,
+    "airport_capacity": BASELINE_FLIGHTS,
+    "marketing_recommendations": BASELINE_MARKETING_PRIORITY,
+    "staffing_forecast": BASELINE_STAFFING,
+    "capacity_health": BASELINE_CAPACITY
+}
+
+def build_unindexed_copy(db_path, copy_path):
+    conn = sqlite3.connect(copy_path)
+    conn.execute("ATTACH DATABASE ? AS src", (str(db_path),))
+    existing = {name for (name,) in conn.execute("SELECT name FROM src.sqlite_master WHERE type = 'table'")}
+    for table in TABLES:
+        if table in existing:
+            conn.execute(f"CREATE TABLE {table} AS SELECT * FROM src.{table}")
+    conn.commit()
+    conn.execute("DETACH DATABASE src")
+    conn.close()
+
+def time_query(conn, query, repeat):
+    """(median ms, rows), or None when the query's tables do not exist."""
+    timings = []
+    try:
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            rows = conn.execute(query).fetchall()
+            timings.append(time.perf_counter() - t0)
+    except sqlite3.OperationalError:
+        return None
+    return statistics.median(timings) * 1000, len(rows)
+
+def format_timing(timing, blank='missing'):
+    return f"{timing[0]:10.2f} {timing[1]:6}" if timing else f"{blank:>10} {'':6}"
+
+def run_benchmark(db_path=DB_PATH, repeat=5):
+    queries = load_stage('99_export_for_dashboard').QUERIES
+    with tempfile.TemporaryDirectory() as tmp:
+        before_path = Path(tmp) / "unindexed.db"
+        build_unindexed_copy(db_path, before_path)
+        before = sqlite3.connect(before_path)
+        after = sqlite3.connect(db_path)
+
+        print(f"{'Query':28} {'Before ms':>10} {'Rows':>6} {'After ms':>10} {'Rows':>6} {'Speedup':>8}")
+        print("-" * 73)
+        totals = [0.0, 0.0]
+        for name, query in queries.items():
+            before_timing = time_query(before, BASELINE_QUERIES[name], repeat) if name in BASELINE_QUERIES else None
+            after_timing = time_query(after, query, repeat)
+            speedup = ""
+            if before_timing and after_timing:
+                totals[0] += before_timing[0]
+                totals[1] += after_timing[0]
+                speedup = f"{before_timing[0] / after_timing[0]:7.1f}x"
+            # Sections added after the schema rework have no original query
+            before_blank = 'missing' if name in BASELINE_QUERIES else 'n/a'
+            print(f"{name:28} {format_timing(before_timing, before_blank)} {format_timing(after_timing)} {speedup:>8}")
+        print("-" * 73)
+        if totals[1]:
+            print(f"{'Total (both sides)':28} {totals[0]:10.2f} {'':6} {totals[1]:10.2f} {'':6} "
+                  f"{totals[0] / totals[1]:7.1f}x")
+
+        before.close()
+        after.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the original export queries against the current ones.")
+    parser.add_argument('--db', type=Path, default=DB_PATH, help="Warehouse to benchmark")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per query (median reported)")
+    args = parser.parse_args(argv)
+    run_benchmark(args.db, args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Lagged cross-correlation and regression slopes between every column of
+two monthly matrices, all at once.
+
+For x (n_months, n_x), y (n_months, n_y) and lags 0..max_lag, the pair
+(lag, i, j) relates y[t, j] to x[t - lag, i] over the months where both
+are present (NaN marks a missing or excluded month). Counts, sums and
+cross-products for every (lag, x column, y column) come from a handful of
+einsum contractions over one (lag, month, x, y) mask, so the whole cube is
+a single vectorized pass with no loop over pairs.
+"""
+import numpy as np
+
+MIN_OBSERVATIONS = 12  # Fewer overlapping months leave the statistics as NaN
+
+def lagged(x, max_lag):
+    """(max_lag + 1, n_months, n_x) array whose [lag, t] row is x[t - lag], NaN before the start."""
+    source = np.arange(len(x))[None, :] - np.arange(max_lag + 1)[:, None]
+    return np.where((source >= 0)[..., None], x[np.maximum(source, 0)], np.nan)
+
+def lagged_regression(x, y, max_lag, min_observations=MIN_OBSERVATIONS):
+    """
+    Returns (observations, correlation, slope), each (max_lag + 1, n_x, n_y):
+    the overlapping months, the Pearson correlation and the least-squares
+    slope of y on lagged x.
+    """
+    x_lag = lagged(np.asarray(x, dtype=np.float64), max_lag)
+    y = np.asarray(y, dtype=np.float64)
+    mask = (np.isfinite(x_lag)[..., None] & np.isfinite(y)[None, :, None, :]).astype(np.float64)
+    x_lag, y = np.nan_to_num(x_lag), np.nan_to_num(y)
+
+    n = mask.sum(axis=1)
+    sum_x = np.einsum('ltij,lti->lij', mask, x_lag)
+    sum_y = np.einsum('ltij,tj->lij', mask, y)
+    sum_xx = np.einsum('ltij,lti->lij', mask, x_lag ** 2)
+    sum_yy = np.einsum('ltij,tj->lij', mask, y ** 2)
+    sum_xy = np.einsum('ltij,lti,tj->lij', mask, x_lag, y)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sum_xy - sum_x * sum_y / n
+        var_x = sum_xx - sum_x ** 2 / n
+        var_y = sum_yy - sum_y ** 2 / n
+        correlation = cov / np.sqrt(var_x * var_y)
+        slope = cov / var_x
+    too_few = n < min_observations
+    correlation[too_few] = np.nan
+    slope[too_few] = np.nan
+    return n.astype(np.int64), correlation, slope
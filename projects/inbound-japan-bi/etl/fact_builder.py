@@ -0,0 +1,162 @@
+"""
+Shared builder for the 2x fact scripts.
+
+Each fact script declares a SPEC and calls run(SPEC, argv):
+
+    SPEC = {
+        'table': 'fact_flights_daily',
+        'raw_file': RAW_FILE,                      # read via staging.read_raw
+        'source': "Flight",                        # names the raw data in messages
+        'fetch_script': '04_fetch_opensky_flights.py',
+        'date_id': 'date',                         # raw date column -> YYYYMMDD key
+        'month_id': ('Year', 'Month'),             # or raw year/month columns -> YYYYMM key
+        'lookups': {'airport_id': ('dim_airport', 'airport_code', 'airport_code')},
+        'columns': {'flights_count': 'flights_count'},
+    }
+
+- Surrogate date/month keys use integer arithmetic on the parsed dates,
+  never a per-row string round trip.
+- 'lookups' maps an output key column to (dimension, dimension natural
+  key column, raw column). The natural key is resolved through a
+  categorical over the dimension's values (read once per build), so each
+  row costs an array index instead of a hash join.
+- 'columns' maps output columns to raw columns; None writes NULL.
+- Rows are written by warehouse.write_fact: a full rebuild or an upsert,
+  in one transaction either way.
+- --max-memory-mb / --chunk-rows stream the raw file through keying and
+  insert in fixed-size chunks, so memory stays bounded by the chunk rather
+  than the file; progress is printed after each chunk.
+- The build runs under common.sqlite_bulk.bulk_load (WAL, relaxed sync,
+  larger cache), restored to the default settings afterwards.
+"""
+import argparse
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from staging import iter_raw, raw_exists, read_raw
+from warehouse import write_fact
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common.sqlite_bulk import bulk_load
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DB_PATH = Path(__file__).parent.parent / "data" / "inbound_japan.db"
+
+# Streaming: a chunk's working set while it is keyed and inserted, as a
+# multiple of its raw DataFrame size (raw + fact frames, plus the Python
+# values sqlite3 binds, which cost ~4x a NumPy column).
+WORKING_SET_FACTOR = 8
+SAMPLE_ROWS = 1_000
+MIN_CHUNK_ROWS = 1_000
+
+def date_keys(dates):
+    """datetime Series -> int64 YYYYMMDD keys."""
+    dt = pd.to_datetime(dates).dt
+    return (dt.year.to_numpy(np.int64) * 10000 + dt.month.to_numpy(np.int64) * 100
+            + dt.day.to_numpy(np.int64))
+
+def month_keys(years, months):
+    """Year and month Series -> int64 YYYYMM keys."""
+    return years.to_numpy(np.int64) * 100 + months.to_numpy(np.int64)
+
+class DimensionCache:
+    """Reads each dimension mapping once per connection and resolves keys by categorical codes."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._mappings = {}
+
+    def mapping(self, table, natural_col, key_col):
+        cache_key = (table, natural_col, key_col)
+        if cache_key not in self._mappings:
+            dim = pd.read_sql(f"SELECT {natural_col}, {key_col} FROM {table}", self.conn)
+            self._mappings[cache_key] = (pd.Index(dim[natural_col]), dim[key_col].to_numpy(np.int64))
+        return self._mappings[cache_key]
+
+    def lookup(self, values, table, natural_col, key_col):
+        """Natural key values -> nullable Int64 surrogate keys (NA where the dimension has no match)."""
+        categories, keys = self.mapping(table, natural_col, key_col)
+        # Categorical raw columns (staged files) are recoded per category, not per row
+        codes = pd.Categorical(values, categories=categories).codes
+        missing = codes < 0
+        return pd.arrays.IntegerArray(keys[np.where(missing, 0, codes)], missing)
+
+def build_fact_table(spec, df_raw, dimensions):
+    """Returns the fact DataFrame for `spec` from the raw frame."""
+    fact = {}
+    if 'date_id' in spec:
+        fact['date_id'] = date_keys(df_raw[spec['date_id']])
+    if 'month_id' in spec:
+        year_col, month_col = spec['month_id']
+        fact['month_id'] = month_keys(df_raw[year_col], df_raw[month_col])
+    for key_col, (table, natural_col, raw_col) in spec.get('lookups', {}).items():
+        fact[key_col] = dimensions.lookup(df_raw[raw_col], table, natural_col, key_col)
+    for col, raw_col in spec['columns'].items():
+        fact[col] = df_raw[raw_col].to_numpy() if raw_col else None
+    return pd.DataFrame(fact, index=pd.RangeIndex(len(df_raw)))
+
+def chunk_rows_for(raw_file, date_columns, max_memory_mb):
+    """Rows per chunk that keep a chunk's working set under max_memory_mb, sized from a sample."""
+    sample, _ = next(iter_raw(raw_file, SAMPLE_ROWS, date_columns))
+    row_bytes = sample.memory_usage(deep=True, index=False).sum() / max(len(sample), 1)
+    return max(MIN_CHUNK_ROWS, int(max_memory_mb * 2**20 / (row_bytes * WORKING_SET_FACTOR)))
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MiB, or None where unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+def with_progress(chunks, table):
+    """Passes raw chunks through, printing rows, throughput and peak memory once each is written."""
+    started = time.perf_counter()
+    rows = 0
+    for df, fraction in chunks:
+        yield df
+        rows += len(df)
+        rate = rows / max(time.perf_counter() - started, 1e-9)
+        peak = peak_rss_mb()
+        memory = f" · peak {peak:,.0f} MiB" if peak is not None else ""
+        print(f"   ⏳ {table}: {rows:,} rows ({fraction:.0%}) · {rate:,.0f} rows/s{memory}", flush=True)
+
+def run(spec, argv=None, db_path=DB_PATH):
+    parser = argparse.ArgumentParser(description=f"Build {spec['table']} from {Path(spec['raw_file']).name}.")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Upsert new or changed rows (by primary key) instead of rebuilding")
+    parser.add_argument('--max-memory-mb', type=float,
+                        help="Stream the raw file in chunks sized to stay under this working set")
+    parser.add_argument('--chunk-rows', type=int,
+                        help="Stream the raw file in chunks of this many rows (overrides --max-memory-mb)")
+    args = parser.parse_args(argv)
+
+    if not raw_exists(spec['raw_file']):
+        print(f"⚠️ Raw {spec['source']} data not found. Run {spec['fetch_script']} first.")
+        return
+
+    date_columns = [spec['date_id']] if 'date_id' in spec else []
+    conn = sqlite3.connect(db_path)
+    try:
+        with bulk_load(conn, 'incremental' if args.incremental else 'rebuild'):
+            dimensions = DimensionCache(conn)
+            if args.chunk_rows or args.max_memory_mb:
+                chunk_rows = args.chunk_rows or chunk_rows_for(spec['raw_file'], date_columns, args.max_memory_mb)
+                print(f"   Streaming {Path(spec['raw_file']).name} in chunks of {chunk_rows:,} rows")
+                raw_chunks = with_progress(iter_raw(spec['raw_file'], chunk_rows, date_columns), spec['table'])
+                fact_chunks = (build_fact_table(spec, df_raw, dimensions) for df_raw in raw_chunks)
+                write_fact(conn, fact_chunks, spec['table'], args.incremental)
+            else:
+                df_raw = read_raw(spec['raw_file'], date_columns=date_columns)
+                write_fact(conn, build_fact_table(spec, df_raw, dimensions), spec['table'], args.incremental)
+    finally:
+        conn.close()
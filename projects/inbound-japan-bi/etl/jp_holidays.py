@@ -0,0 +1,153 @@
+"""
+Japanese national holidays (国民の祝日), computed from the rules of the
+Public Holiday Act rather than a downloaded list.
+
+- Fixed-date and "Happy Monday" holidays carry the years each rule was in
+  force, so historical calendars follow the law of their time.
+- Equinox days use the standard approximation, valid 1980-2099.
+- One-off holidays (imperial ceremonies) and the 2020/2021 Olympic moves
+  are listed explicitly.
+- Substitute holidays (振替休日): a holiday on a Sunday moves to the next
+  day that is not a holiday (only to the Monday before 2007).
+- Citizens' holidays (国民の休日): a day between two holidays becomes one
+  (from 1986).
+
+Each rule is evaluated for all years at once; holidays() returns a Series
+of English names indexed by date.
+"""
+import numpy as np
+import pandas as pd
+
+FIRST_YEAR, LAST_YEAR = 1980, 2099
+
+# (month, day, name, first year, last year)
+FIXED_HOLIDAYS = [
+    (1, 1, "New Year's Day", 1949, LAST_YEAR),
+    (1, 15, "Coming of Age Day", 1949, 1999),
+    (2, 11, "National Foundation Day", 1967, LAST_YEAR),
+    (2, 23, "Emperor's Birthday", 2020, LAST_YEAR),
+    (4, 29, "Emperor's Birthday", 1949, 1988),
+    (4, 29, "Greenery Day", 1989, 2006),
+    (4, 29, "Showa Day", 2007, LAST_YEAR),
+    (5, 3, "Constitution Memorial Day", 1949, LAST_YEAR),
+    (5, 4, "Greenery Day", 2007, LAST_YEAR),
+    (5, 5, "Children's Day", 1949, LAST_YEAR),
+    (7, 20, "Marine Day", 1996, 2002),
+    (8, 11, "Mountain Day", 2016, LAST_YEAR),
+    (9, 15, "Respect for the Aged Day", 1966, 2002),
+    (10, 10, "Health and Sports Day", 1966, 1999),
+    (11, 3, "Culture Day", 1948, LAST_YEAR),
+    (11, 23, "Labour Thanksgiving Day", 1948, LAST_YEAR),
+    (12, 23, "Emperor's Birthday", 1989, 2018),
+]
+
+# (month, nth Monday, name, first year, last year)
+MONDAY_HOLIDAYS = [
+    (1, 2, "Coming of Age Day", 2000, LAST_YEAR),
+    (7, 3, "Marine Day", 2003, LAST_YEAR),
+    (9, 3, "Respect for the Aged Day", 2003, LAST_YEAR),
+    (10, 2, "Health and Sports Day", 2000, 2019),
+    (10, 2, "Sports Day", 2020, LAST_YEAR),
+]
+
+# name -> (month, base); day = floor(base + 0.242194 (y - 1980) - floor((y - 1980) / 4))
+EQUINOX_HOLIDAYS = {
+    "Vernal Equinox Day": (3, 20.8431),
+    "Autumnal Equinox Day": (9, 23.2488),
+}
+
+SPECIAL_HOLIDAYS = {
+    '1989-02-24': "Funeral of Emperor Showa",
+    '1990-11-12': "Enthronement Ceremony",
+    '1993-06-09': "Wedding of Crown Prince Naruhito",
+    '2019-05-01': "Enthronement Day",
+    '2019-10-22': "Enthronement Ceremony",
+}
+
+# (year, name) -> date the holiday was moved to for the Tokyo Olympics
+MOVED_HOLIDAYS = {
+    (2020, "Marine Day"): '2020-07-23',
+    (2020, "Sports Day"): '2020-07-24',
+    (2020, "Mountain Day"): '2020-08-10',
+    (2021, "Marine Day"): '2021-07-22',
+    (2021, "Sports Day"): '2021-07-23',
+    (2021, "Mountain Day"): '2021-08-08',
+}
+
+SUBSTITUTE_NAME = "Substitute Holiday"
+CITIZENS_NAME = "Citizens' Holiday"
+SUBSTITUTE_FROM = pd.Timestamp('1973-04-12')
+SUBSTITUTE_ANY_DAY_FROM = 2007  # Earlier, only a non-holiday Monday could substitute
+CITIZENS_FROM = 1986
+
+def make_dates(years, month, days):
+    """DatetimeIndex from year, month and day arrays, by datetime64 arithmetic."""
+    months = (np.asarray(years) - 1970).astype('datetime64[Y]').astype('datetime64[M]') + (month - 1)
+    return pd.DatetimeIndex(months.astype('datetime64[D]') + (np.asarray(days) - 1))
+
+def nth_monday(years, month, nth):
+    first = make_dates(years, month, 1)
+    # dayofweek: Monday = 0
+    return first + pd.to_timedelta((7 - first.dayofweek) % 7 + 7 * (nth - 1), unit='D')
+
+def equinox(years, month, base):
+    offset = years - 1980
+    return make_dates(years, month, np.floor(base + 0.242194 * offset - np.floor(offset / 4)).astype(int))
+
+def national_holidays(years):
+    """Series of holiday names indexed by date, before substitute and citizens' holidays."""
+    dates, names = [], []
+    for month, day, name, first, last in FIXED_HOLIDAYS:
+        dates.append(make_dates(years[(years >= first) & (years <= last)], month, day))
+    for month, nth, name, first, last in MONDAY_HOLIDAYS:
+        dates.append(nth_monday(years[(years >= first) & (years <= last)], month, nth))
+    for name, (month, base) in EQUINOX_HOLIDAYS.items():
+        dates.append(equinox(years, month, base))
+    rules = [rule[2] for rule in FIXED_HOLIDAYS + MONDAY_HOLIDAYS] + list(EQUINOX_HOLIDAYS)
+    names = np.concatenate([np.full(len(index), name, dtype=object) for index, name in zip(dates, rules)])
+    dates = np.concatenate([index.values for index in dates])
+
+    year_of = dates.astype('datetime64[Y]').astype(int) + 1970
+    for (year, name), moved_to in MOVED_HOLIDAYS.items():
+        dates[(year_of == year) & (names == name)] = np.datetime64(moved_to)
+    special = pd.DatetimeIndex(list(SPECIAL_HOLIDAYS))
+    keep = special.year.isin(years)
+    dates = np.concatenate([dates, special.values[keep]])
+    names = np.concatenate([names, np.array(list(SPECIAL_HOLIDAYS.values()), dtype=object)[keep]])
+    return pd.Series(names, index=pd.DatetimeIndex(dates)).sort_index()
+
+def citizens_holidays(holidays):
+    """Non-Sunday days sandwiched between two holidays."""
+    candidates = holidays.index + pd.Timedelta(days=1)
+    sandwiched = (
+        candidates.isin(holidays.index - pd.Timedelta(days=1))
+        & ~candidates.isin(holidays.index)
+        & (candidates.dayofweek != 6)
+        & (candidates.year >= CITIZENS_FROM)
+    )
+    return pd.Series(CITIZENS_NAME, index=candidates[sandwiched])
+
+def substitute_holidays(holidays):
+    taken = set(holidays.index)
+    substitutes = []
+    # Only a handful of holidays per year fall on a Sunday
+    for day in holidays.index[(holidays.index.dayofweek == 6) & (holidays.index >= SUBSTITUTE_FROM)]:
+        candidate = day + pd.Timedelta(days=1)
+        if day.year >= SUBSTITUTE_ANY_DAY_FROM:
+            while candidate in taken:
+                candidate += pd.Timedelta(days=1)
+        elif candidate in taken:
+            continue
+        taken.add(candidate)
+        substitutes.append(candidate)
+    return pd.Series(SUBSTITUTE_NAME, index=pd.DatetimeIndex(substitutes))
+
+def holidays(first_year, last_year):
+    """Series of Japanese holiday names indexed by date for the years first_year..last_year."""
+    if first_year < FIRST_YEAR or last_year > LAST_YEAR:
+        raise ValueError(f"Japanese holiday rules are defined for {FIRST_YEAR}-{LAST_YEAR}")
+    years = np.arange(first_year, last_year + 1)
+    national = national_holidays(years)
+    national = pd.concat([national, citizens_holidays(national)]).sort_index()
+    result = pd.concat([national, substitute_holidays(national)]).sort_index()
+    return result[~result.index.duplicated()]
@@ -0,0 +1,217 @@
+"""
+Runs the inbound ETL scripts as a dependency graph in a single process.
+
+- Fetchers (01-04) are independent and run in parallel.
+- 10 builds the dimensions from the JNTO file; each 2x fact builder needs 10
+  plus its own raw file; 30 rolls the daily facts up by month; 31 forecasts
+  the arrivals fact; 32 simulates scenarios around the forecasts from the
+  rollups; 33 correlates FX with arrivals; 34 precomputes arrivals growth
+  for every as-of month; 35 builds the city x month weather-risk matrix;
+  99 needs all of the above.
+- A stage is skipped when its fingerprint (code hash + input file hashes +
+  upstream fingerprints) matches the last successful run.
+- Stages writing to inbound_japan.db hold a shared lock, since SQLite
+  allows a single writer; they still overlap with fetchers.
+
+Usage: python run_pipeline.py [--force] [--skip-fetch] [--workers N] [--incremental] [--max-memory-mb MB]
+"""
+import argparse
+import hashlib
+import importlib.util
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+
+from staging import resolve_raw
+
+ETL_DIR = Path(__file__).parent
+DATA_DIR = ETL_DIR.parent / "data"
+RAW_DIR = DATA_DIR / "raw"
+DB_PATH = DATA_DIR / "inbound_japan.db"
+STATE_FILE = DATA_DIR / ".pipeline_state.json"
+COMMON_DIR = ETL_DIR.parent.parent / "common"
+
+# stage -> upstream stages, raw files read, whether it writes the warehouse
+STAGES = {
+    '01_fetch_jnto_arrivals': {'deps': [], 'inputs': [], 'writes_db': False},
+    '02_fetch_fx_rates': {'deps': [], 'inputs': [], 'writes_db': False},
+    '03_fetch_weather_daily': {'deps': [], 'inputs': [], 'writes_db': False},
+    '04_fetch_opensky_flights': {'deps': [], 'inputs': [], 'writes_db': False},
+    '10_build_dimensions': {'deps': ['01_fetch_jnto_arrivals'], 'inputs': ['jnto_arrivals.csv'], 'writes_db': True},
+    '20_build_fact_inbound_arrivals': {
+        'deps': ['10_build_dimensions', '01_fetch_jnto_arrivals'], 'inputs': ['jnto_arrivals.csv'], 'writes_db': True},
+    '21_build_fact_fx_rates': {
+        'deps': ['10_build_dimensions', '02_fetch_fx_rates'], 'inputs': ['fx_rates.csv'], 'writes_db': True},
+    '22_build_fact_weather': {
+        'deps': ['10_build_dimensions', '03_fetch_weather_daily'], 'inputs': ['weather_daily.csv'], 'writes_db': True},
+    '23_build_fact_flights': {
+        'deps': ['10_build_dimensions', '04_fetch_opensky_flights'], 'inputs': ['flights_daily.csv'], 'writes_db': True},
+    '30_build_monthly_rollups': {
+        'deps': ['21_build_fact_fx_rates', '22_build_fact_weather', '23_build_fact_flights'],
+        'inputs': [], 'writes_db': True},
+    '31_build_forecasts': {
+        'deps': ['20_build_fact_inbound_arrivals'], 'inputs': [], 'writes_db': True},
+    '32_build_scenarios': {
+        'deps': ['30_build_monthly_rollups', '31_build_forecasts'], 'inputs': [], 'writes_db': True},
+    '33_build_fx_correlations': {
+        'deps': ['20_build_fact_inbound_arrivals', '30_build_monthly_rollups'], 'inputs': [], 'writes_db': True},
+    '34_build_growth': {
+        'deps': ['20_build_fact_inbound_arrivals'], 'inputs': [], 'writes_db': True},
+    '35_build_weather_risk': {
+        'deps': ['22_build_fact_weather'], 'inputs': [], 'writes_db': True},
+    '99_export_for_dashboard': {
+        'deps': ['20_build_fact_inbound_arrivals', '30_build_monthly_rollups', '31_build_forecasts',
+                 '32_build_scenarios', '33_build_fx_correlations', '34_build_growth', '35_build_weather_risk'],
+        'inputs': [], 'writes_db': False},
+}
+FETCHERS = [name for name, spec in STAGES.items() if not spec['deps']]
+# Fact and rollup builders that accept --incremental (upsert / refresh instead of rebuild)
+INCREMENTAL_STAGES = [name for name in STAGES if name[0] == '2'] + ['30_build_monthly_rollups']
+# Fact builders that can stream their raw file under a memory ceiling
+STREAMING_STAGES = [name for name in STAGES if name[0] == '2']
+
+def file_hash(path):
+    """Content hash of a file, or of every file in a staged column directory."""
+    digest = hashlib.sha256()
+    for part in sorted(path.iterdir()) if path.is_dir() else [path]:
+        digest.update(part.name.encode())
+        with open(part, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+def code_hash(stage):
+    """Hash of the stage script plus the shared helper modules it may import."""
+    helpers = sorted(p for p in ETL_DIR.glob("*.py") if not p.name[0].isdigit() and p.name != Path(__file__).name)
+    helpers += sorted(COMMON_DIR.glob("*.py"))
+    digest = hashlib.sha256()
+    for path in [ETL_DIR / f"{stage}.py", *helpers]:
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+def fingerprint(stage, fingerprints):
+    """Combines code, raw inputs and upstream fingerprints; None if an input is missing."""
+    spec = STAGES[stage]
+    digest = hashlib.sha256(code_hash(stage).encode())
+    for name in spec['inputs']:
+        # Hash whichever variant (CSV or staged sibling) the stage will read
+        path, _ = resolve_raw(RAW_DIR / name)
+        if path is None:
+            return None
+        digest.update(file_hash(path).encode())
+    for dep in spec['deps']:
+        digest.update((fingerprints.get(dep) or '').encode())
+    return digest.hexdigest()
+
+def load_stage(stage):
+    # Numbered scripts are not importable by name, so load them from their path
+    spec = importlib.util.spec_from_file_location(f"stage_{stage}", ETL_DIR / f"{stage}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def run_stage(stage, db_lock, incremental=False, max_memory_mb=None):
+    module = load_stage(stage)
+    # Scripts with CLI options take argv; pass [] so they ignore the runner's own flags
+    args = ()
+    if module.main.__code__.co_argcount > 0:
+        argv = []
+        if incremental and stage in INCREMENTAL_STAGES:
+            argv.append('--incremental')
+        if max_memory_mb and stage in STREAMING_STAGES:
+            argv += ['--max-memory-mb', str(max_memory_mb)]
+        args = (argv,)
+    if STAGES[stage]['writes_db']:
+        with db_lock:
+            module.main(*args)
+    else:
+        module.main(*args)
+
+def load_state():
+    if STATE_FILE.exists() and DB_PATH.exists():
+        return json.loads(STATE_FILE.read_text())
+    return {}
+
+def run_pipeline(force=False, skip_fetch=False, workers=4, incremental=False, max_memory_mb=None):
+    state = {} if force else load_state()
+    fingerprints, results = {}, {}
+    db_lock = threading.Lock()
+    started = time.perf_counter()
+
+    pending = dict(STAGES)
+    if skip_fetch:
+        for stage in FETCHERS:
+            pending.pop(stage)
+            results[stage] = ('skipped', 0.0)
+            fingerprints[stage] = 'fetch-skipped'
+
+    def execute(stage):
+        t0 = time.perf_counter()
+        run_stage(stage, db_lock, incremental, max_memory_mb)
+        return time.perf_counter() - t0
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        running = {}
+        while pending or running:
+            for stage in [s for s, spec in pending.items() if all(d in results for d in spec['deps'])]:
+                spec = pending.pop(stage)
+                if any(results[d][0] in ('failed', 'blocked') for d in spec['deps']):
+                    results[stage] = ('blocked', 0.0)
+                    continue
+                if spec['deps']:
+                    fingerprints[stage] = fingerprint(stage, fingerprints)
+                    if fingerprints[stage] and state.get(stage) == fingerprints[stage]:
+                        results[stage] = ('unchanged', 0.0)
+                        continue
+                print(f"▶️  {stage}")
+                running[pool.submit(execute, stage)] = stage
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                try:
+                    results[stage] = ('ran', future.result())
+                except (Exception, SystemExit) as e:  # Scripts exit non-zero on fatal errors
+                    print(f"❌ {stage} failed: {e}")
+                    results[stage] = ('failed', 0.0)
+                    state.pop(stage, None)
+                    continue
+                if not STAGES[stage]['deps']:
+                    # Fetchers have external inputs; downstream stages hash their output files
+                    fingerprints[stage] = 'fetched'
+                elif fingerprints.get(stage):
+                    state[stage] = fingerprints[stage]
+
+    STATE_FILE.write_text(json.dumps(state, indent=2))
+
+    print("\n" + "=" * 52)
+    print(f"{'Stage':36} {'Status':10} {'Seconds':>6}")
+    print("-" * 52)
+    for stage in STAGES:
+        status, seconds = results.get(stage, ('blocked', 0.0))
+        print(f"{stage:36} {status:10} {seconds:6.2f}")
+    print("-" * 52)
+    print(f"{'Total wall time':47} {time.perf_counter() - started:4.2f}")
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the inbound ETL pipeline as a DAG.")
+    parser.add_argument('--force', action='store_true', help="Ignore fingerprints and rerun every stage")
+    parser.add_argument('--skip-fetch', action='store_true', help="Use the raw files already on disk")
+    parser.add_argument('--workers', type=int, default=4, help="Stages run concurrently")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Fact builders upsert changed rows instead of rebuilding their tables")
+    parser.add_argument('--max-memory-mb', type=float,
+                        help="Fact builders stream their raw files in chunks under this working set")
+    args = parser.parse_args(argv)
+    results = run_pipeline(args.force, args.skip_fetch, args.workers, args.incremental, args.max_memory_mb)
+    if any(status in ('failed', 'blocked') for status, _ in results.values()):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
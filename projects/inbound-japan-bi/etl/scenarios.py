@@ -0,0 +1,66 @@
+"""
+Vectorized Monte Carlo demand scenarios.
+
+Each scenario replays a path of historical months drawn with replacement.
+For every drawn month it takes that month's FX returns (all currencies),
+weather anomaly and flight-capacity anomaly together, so the shocks keep
+their historical joint distribution. They move a baseline forecast
+through a log-linear demand model:
+
+    visitors = baseline * exp(FX_ELASTICITY * cumulative FX log return
+                              + WEATHER_ELASTICITY * bad-weather share anomaly
+                              + CAPACITY_ELASTICITY * flight capacity log anomaly
+                              + forecast error)
+
+- FX returns accumulate along the path (a weaker yen persists); weather
+  and capacity anomalies are deseasonalized levels and do not.
+- The forecast error is normal in log space with each country/month's
+  forecast sigma.
+- Every step is an array operation over (scenario, country, month); the
+  only loop is over the small percentile list.
+
+simulate() takes a numpy Generator, so a fixed seed reproduces a run.
+"""
+import numpy as np
+
+# Demand response to each shock (log visitors per unit of shock)
+FX_ELASTICITY = 0.5  # 10% more JPY per unit of home currency -> ~5% more visitors
+WEATHER_ELASTICITY = -0.3  # Per unit of bad-weather day share above normal
+CAPACITY_ELASTICITY = 0.8  # Per log unit of flights above normal
+PERCENTILES = (10, 25, 50, 75, 90)
+
+def monthly_anomaly(month_ids, values):
+    """values minus the mean of the same calendar month, removing the seasonality the baseline already has."""
+    calendar_month = np.asarray(month_ids) % 100
+    means = np.zeros(13)
+    np.add.at(means, calendar_month, values)
+    means /= np.maximum(np.bincount(calendar_month, minlength=13), 1)
+    return values - means[calendar_month]
+
+def simulate(baseline, sigma, currency_of, fx_returns, weather, capacity, n_scenarios, rng):
+    """
+    baseline, sigma:  (n_countries, n_months) forecast and its log-space sigma
+    currency_of:      (n_countries,) column of fx_returns for each country
+    fx_returns:       (n_history, n_currencies) monthly log returns of JPY per currency
+    weather, capacity: (n_history,) deseasonalized anomalies of the same months
+    Returns visitors as a float32 (n_scenarios, n_countries, n_months) array.
+    """
+    n_countries, n_months = baseline.shape
+    draws = rng.integers(0, len(fx_returns), size=(n_scenarios, n_months))
+
+    fx_path = np.cumsum(fx_returns[draws].astype(np.float32), axis=1)  # (S, M, n_currencies)
+    fx_shock = fx_path[:, :, currency_of].transpose(0, 2, 1)  # (S, C, M)
+    common = (WEATHER_ELASTICITY * weather[draws] + CAPACITY_ELASTICITY * capacity[draws]).astype(np.float32)
+
+    # In-place updates keep a single (S, C, M) working array
+    shock = rng.standard_normal((n_scenarios, n_countries, n_months), dtype=np.float32)
+    shock *= sigma.astype(np.float32)
+    shock += FX_ELASTICITY * fx_shock
+    shock += common[:, None, :]
+    visitors = np.exp(shock, out=shock)
+    visitors *= baseline.astype(np.float32)
+    return visitors
+
+def percentile_bands(visitors, percentiles=PERCENTILES):
+    """(len(percentiles), ...) percentiles over the scenario axis, plus the mean."""
+    return np.percentile(visitors, percentiles, axis=0), visitors.mean(axis=0)
@@ -0,0 +1,308 @@
+"""
+Star schema DDL for inbound_japan.db.
+
+Every warehouse table is declared here with typed columns, its primary key
+and the secondary indexes the dashboard joins need. Builders load into
+these tables through warehouse.py instead of letting pandas infer an
+untyped, unkeyed table.
+
+- Fact tables are WITHOUT ROWID, so rows are stored clustered by their
+  (date_id | month_id, entity) key and date-range scans read contiguous pages.
+- Each fact gets an index on its non-leading foreign key; the leading one
+  is covered by the primary key.
+- analyze() refreshes the planner statistics after a load.
+
+Usage: python schema.py   (prints the DDL)
+"""
+
+# table -> columns (name, declaration), primary key, secondary indexes, WITHOUT ROWID
+TABLES = {
+    'dim_date': {
+        'columns': [
+            ('date_id', 'INTEGER NOT NULL'),  # YYYYMMDD
+            ('date', 'TEXT NOT NULL'),
+            ('year', 'INTEGER NOT NULL'),
+            ('month', 'INTEGER NOT NULL'),
+            ('day', 'INTEGER NOT NULL'),
+            ('quarter', 'INTEGER NOT NULL'),
+            ('day_of_week', 'INTEGER NOT NULL'),  # 0=Monday
+            ('is_weekend', 'INTEGER NOT NULL'),
+            ('iso_year', 'INTEGER NOT NULL'),
+            ('iso_week', 'INTEGER NOT NULL'),
+            ('fiscal_year', 'INTEGER NOT NULL'),  # April-March, named by its starting year
+            ('fiscal_quarter', 'INTEGER NOT NULL'),
+            ('fiscal_period', 'INTEGER NOT NULL'),  # 1=April
+            ('is_holiday', 'INTEGER NOT NULL'),  # Japanese national holiday
+            ('holiday_name', 'TEXT'),
+            ('is_business_day', 'INTEGER NOT NULL'),
+        ],
+        'key': ['date_id'],
+        'indexes': [['year', 'month']],
+    },
+    'dim_month': {
+        'columns': [
+            ('month_id', 'INTEGER NOT NULL'),  # YYYYMM
+            ('year', 'INTEGER NOT NULL'),
+            ('month', 'INTEGER NOT NULL'),
+            ('month_name', 'TEXT NOT NULL'),
+            ('season', 'TEXT NOT NULL'),
+            ('fiscal_year', 'INTEGER NOT NULL'),
+            ('fiscal_quarter', 'INTEGER NOT NULL'),
+            ('fiscal_period', 'INTEGER NOT NULL'),
+            ('days_in_month', 'INTEGER NOT NULL'),
+            ('business_days', 'INTEGER NOT NULL'),  # Weekdays that are not holidays
+        ],
+        'key': ['month_id'],
+        'indexes': [['year', 'month']],
+    },
+    'dim_country': {
+        'columns': [
+            ('country_id', 'INTEGER NOT NULL'),
+            ('country_name_en', 'TEXT NOT NULL UNIQUE'),
+            ('region_macro', 'TEXT'),
+            ('currency_code', 'TEXT REFERENCES dim_fx_currency (currency_code)'),  # Home currency, else USD
+        ],
+        'key': ['country_id'],
+        'indexes': [],
+    },
+    'dim_fx_currency': {
+        'columns': [
+            ('currency_code', 'TEXT NOT NULL'),
+            ('currency_name', 'TEXT'),
+        ],
+        'key': ['currency_code'],
+        'indexes': [],
+    },
+    'dim_weather_location': {
+        'columns': [
+            ('weather_loc_id', 'INTEGER NOT NULL'),
+            ('city_name', 'TEXT NOT NULL UNIQUE'),
+            ('region_jp', 'TEXT'),
+        ],
+        'key': ['weather_loc_id'],
+        'indexes': [],
+    },
+    'dim_airport': {
+        'columns': [
+            ('airport_id', 'INTEGER NOT NULL'),
+            ('airport_code', 'TEXT NOT NULL UNIQUE'),
+            ('airport_name', 'TEXT'),
+            ('region_jp', 'TEXT'),
+        ],
+        'key': ['airport_id'],
+        'indexes': [],
+    },
+    'fact_inbound_arrivals_monthly': {
+        'columns': [
+            ('month_id', 'INTEGER NOT NULL REFERENCES dim_month (month_id)'),
+            ('country_id', 'INTEGER NOT NULL REFERENCES dim_country (country_id)'),
+            ('visitors_total', 'INTEGER'),
+            ('visitors_leisure', 'INTEGER'),
+            ('visitors_business', 'INTEGER'),
+        ],
+        'key': ['month_id', 'country_id'],
+        'indexes': [['country_id']],
+        'without_rowid': True,
+    },
+    'fact_fx_rate_daily': {
+        'columns': [
+            ('date_id', 'INTEGER NOT NULL REFERENCES dim_date (date_id)'),
+            ('currency_code', 'TEXT NOT NULL REFERENCES dim_fx_currency (currency_code)'),
+            ('rate_jpy_per_currency', 'REAL'),
+        ],
+        'key': ['date_id', 'currency_code'],
+        'indexes': [['currency_code']],
+        'without_rowid': True,
+    },
+    'fact_weather_daily': {
+        'columns': [
+            ('date_id', 'INTEGER NOT NULL REFERENCES dim_date (date_id)'),
+            ('weather_loc_id', 'INTEGER NOT NULL REFERENCES dim_weather_location (weather_loc_id)'),
+            ('temp_avg', 'REAL'),
+            ('temp_max', 'REAL'),
+            ('temp_min', 'REAL'),
+            ('condition', 'TEXT'),
+            ('precipitation_mm', 'REAL'),
+        ],
+        'key': ['date_id', 'weather_loc_id'],
+        'indexes': [['weather_loc_id']],
+        'without_rowid': True,
+    },
+    'fact_flights_daily': {
+        'columns': [
+            ('date_id', 'INTEGER NOT NULL REFERENCES dim_date (date_id)'),
+            ('airport_id', 'INTEGER NOT NULL REFERENCES dim_airport (airport_id)'),
+            ('flights_count', 'INTEGER'),
+        ],
+        'key': ['date_id', 'airport_id'],
+        'indexes': [['airport_id']],
+        'without_rowid': True,
+    },
+    # Arrivals forecasts per country plus the national total (31_build_forecasts.py)
+    'fact_forecast_monthly': {
+        'columns': [
+            ('month_id', 'INTEGER NOT NULL'),  # YYYYMM, may run past dim_month
+            ('country_id', 'INTEGER NOT NULL'),  # 0 = national total
+            ('horizon', 'INTEGER NOT NULL'),  # Months after the last actual
+            ('visitors_forecast', 'REAL NOT NULL'),
+            ('visitors_lower', 'REAL NOT NULL'),  # 80% prediction interval
+            ('visitors_upper', 'REAL NOT NULL'),
+            ('method', 'TEXT NOT NULL'),
+            ('fitted_through', 'INTEGER NOT NULL'),  # month_id of the last actual
+        ],
+        'key': ['month_id', 'country_id'],
+        'indexes': [['country_id']],
+        'without_rowid': True,
+    },
+    # Percentile bands of simulated demand per country plus the national total (32_build_scenarios.py)
+    'fact_scenario_monthly': {
+        'columns': [
+            ('month_id', 'INTEGER NOT NULL'),  # YYYYMM, may run past dim_month
+            ('country_id', 'INTEGER NOT NULL'),  # 0 = national total
+            ('scenarios', 'INTEGER NOT NULL'),
+            ('visitors_p10', 'REAL NOT NULL'),
+            ('visitors_p25', 'REAL NOT NULL'),
+            ('visitors_p50', 'REAL NOT NULL'),
+            ('visitors_p75', 'REAL NOT NULL'),
+            ('visitors_p90', 'REAL NOT NULL'),
+            ('visitors_mean', 'REAL NOT NULL'),
+        ],
+        'key': ['month_id', 'country_id'],
+        'indexes': [['country_id']],
+        'without_rowid': True,
+    },
+    # Lagged FX-arrivals statistics for every market x currency (33_build_fx_correlations.py)
+    'fact_fx_correlation': {
+        'columns': [
+            ('country_id', 'INTEGER NOT NULL REFERENCES dim_country (country_id)'),
+            ('currency_code', 'TEXT NOT NULL REFERENCES dim_fx_currency (currency_code)'),
+            ('lag_months', 'INTEGER NOT NULL'),  # FX month leads the arrivals month by this much
+            ('observations', 'INTEGER NOT NULL'),
+            ('correlation', 'REAL'),  # NULL below correlation.MIN_OBSERVATIONS
+            ('elasticity', 'REAL'),  # Arrivals log growth per FX log return
+        ],
+        'key': ['country_id', 'currency_code', 'lag_months'],
+        'indexes': [['currency_code']],
+        'without_rowid': True,
+    },
+    # Monthly rollups of the daily facts (30_build_monthly_rollups.py)
+    'agg_fx_monthly': {
+        'columns': [
+            ('month_id', 'INTEGER NOT NULL REFERENCES dim_month (month_id)'),
+            ('currency_code', 'TEXT NOT NULL REFERENCES dim_fx_currency (currency_code)'),
+            ('avg_rate', 'REAL'),
+            ('min_rate', 'REAL'),
+            ('max_rate', 'REAL'),
+            ('days', 'INTEGER NOT NULL'),
+        ],
+        'key': ['month_id', 'currency_code'],
+        'indexes': [['currency_code']],
+        'without_rowid': True,
+    },
+    'agg_weather_monthly': {
+        'columns': [
+            ('month_id', 'INTEGER NOT NULL REFERENCES dim_month (month_id)'),
+            ('weather_loc_id', 'INTEGER NOT NULL REFERENCES dim_weather_location (weather_loc_id)'),
+            ('avg_temp', 'REAL'),
+            ('avg_max_temp', 'REAL'),
+            ('avg_min_temp', 'REAL'),
+            ('total_precipitation_mm', 'REAL'),
+            ('heatwave_days', 'INTEGER NOT NULL'),
+            ('rainy_days', 'INTEGER NOT NULL'),  # Rain or Typhoon
+            ('snow_days', 'INTEGER NOT NULL'),
+            ('days', 'INTEGER NOT NULL'),
+        ],
+        'key': ['month_id', 'weather_loc_id'],
+        'indexes': [['weather_loc_id']],
+        'without_rowid': True,
+    },
+    'agg_flights_monthly': {
+        'columns': [
+            ('month_id', 'INTEGER NOT NULL REFERENCES dim_month (month_id)'),
+            ('airport_id', 'INTEGER NOT NULL REFERENCES dim_airport (airport_id)'),
+            ('total_flights', 'INTEGER'),
+            ('days', 'INTEGER NOT NULL'),
+        ],
+        'key': ['month_id', 'airport_id'],
+        'indexes': [['airport_id']],
+        'without_rowid': True,
+    },
+    # Weather risk per city x month from one pass over fact_weather_daily (35_build_weather_risk.py)
+    'agg_weather_risk_monthly': {
+        'columns': [
+            ('month_id', 'INTEGER NOT NULL REFERENCES dim_month (month_id)'),
+            ('weather_loc_id', 'INTEGER NOT NULL REFERENCES dim_weather_location (weather_loc_id)'),
+            ('days', 'INTEGER NOT NULL'),
+            ('heatwave_days', 'INTEGER NOT NULL'),
+            ('rainy_days', 'INTEGER NOT NULL'),  # Rain or Typhoon
+            ('typhoon_days', 'INTEGER NOT NULL'),
+            ('snow_days', 'INTEGER NOT NULL'),
+            ('avg_max_temp', 'REAL'),
+            ('temp_max', 'REAL'),  # Hottest daily maximum
+            ('temp_min', 'REAL'),  # Coldest daily minimum
+            ('precipitation_p50_mm', 'REAL'),  # Daily precipitation percentiles
+            ('precipitation_p90_mm', 'REAL'),
+            ('precipitation_max_mm', 'REAL'),
+        ],
+        'key': ['month_id', 'weather_loc_id'],
+        'indexes': [['weather_loc_id']],
+        'without_rowid': True,
+    },
+    # Arrivals growth as of every month per country plus the national total (34_build_growth.py)
+    'agg_growth_monthly': {
+        'columns': [
+            ('month_id', 'INTEGER NOT NULL REFERENCES dim_month (month_id)'),  # As-of month
+            ('country_id', 'INTEGER NOT NULL'),  # 0 = national total
+            ('visitors_month', 'REAL NOT NULL'),
+            ('visitors_ytd', 'REAL'),  # January through the as-of month; NULL if January precedes the history
+            ('visitors_t12m', 'REAL'),  # Trailing 12 months; NULL in the first 11 months
+            ('yoy_growth', 'REAL'),  # Growth against the same period a year earlier
+            ('ytd_growth', 'REAL'),
+            ('t12m_growth', 'REAL'),
+            ('recommendation', 'TEXT'),  # Marketing priority from ytd_growth
+        ],
+        'key': ['month_id', 'country_id'],
+        'indexes': [['country_id']],
+        'without_rowid': True,
+    },
+}
+
+def primary_key(table):
+    return TABLES[table]['key']
+
+def table_ddl(table):
+    spec = TABLES[table]
+    lines = [f"    {name} {decl}" for name, decl in spec['columns']]
+    lines.append(f"    PRIMARY KEY ({', '.join(spec['key'])})")
+    suffix = " WITHOUT ROWID" if spec.get('without_rowid') else ""
+    return f"CREATE TABLE {table} (\n" + ",\n".join(lines) + f"\n){suffix}"
+
+def index_ddl(table):
+    return [
+        f"CREATE INDEX IF NOT EXISTS ix_{table}_{'_'.join(columns)} ON {table} ({', '.join(columns)})"
+        for columns in TABLES[table]['indexes']
+    ]
+
+def create_table(conn, table):
+    """Drops and recreates `table` without its secondary indexes (build those after loading)."""
+    conn.execute(f"DROP TABLE IF EXISTS {table}")
+    conn.execute(table_ddl(table))
+
+def create_indexes(conn, table):
+    for statement in index_ddl(table):
+        conn.execute(statement)
+
+def analyze(conn, table):
+    # A bounded sample keeps ANALYZE cheap on large facts; the planner only needs rough counts
+    conn.execute("PRAGMA analysis_limit = 1000")
+    conn.execute(f"ANALYZE {table}")
+
+def main():
+    for table in TABLES:
+        print(table_ddl(table) + ";")
+        for statement in index_ddl(table):
+            print(statement + ";")
+        print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Typed columnar staging for the raw inbound files.
+
+Alongside each raw CSV (e.g. data/raw/weather_daily.csv) a generator can
+write a binary sibling that keeps int, float, date and dictionary-encoded
+string columns typed, so builders load it without any text parsing:
+
+- feather:  weather_daily.feather (Arrow IPC, needs pyarrow), memory-mapped on read
+- npy:      weather_daily.cols/ with one <column>.npy per column plus
+            _meta.json (string categories); always available, memory-mapped on read
+
+read_raw() picks the freshest of the CSV and its staged siblings;
+iter_raw() reads the same variant in fixed-size row chunks.
+"""
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    HAVE_PYARROW = True
+except ImportError:
+    HAVE_PYARROW = False
+
+FORMATS = ('csv', 'feather', 'npy')
+DEFAULT_STAGED_FORMAT = 'feather' if HAVE_PYARROW else 'npy'
+META_FILE = "_meta.json"
+
+def staged_path(csv_path, fmt):
+    csv_path = Path(csv_path)
+    if fmt == 'feather':
+        return csv_path.with_suffix('.feather')
+    if fmt == 'npy':
+        return csv_path.with_suffix('.cols')
+    return csv_path
+
+def resolve_raw(csv_path):
+    """Returns (path, format) of the most recently written raw variant, or (None, None)."""
+    candidates = [(staged_path(csv_path, fmt), fmt) for fmt in FORMATS]
+    candidates = [
+        (p, fmt) for p, fmt in candidates
+        if p.exists() and (fmt != 'feather' or HAVE_PYARROW) and (fmt != 'npy' or (p / META_FILE).exists())
+    ]
+    if not candidates:
+        return None, None
+    return max(candidates, key=lambda c: _mtime(c[0]))
+
+def raw_exists(csv_path):
+    return resolve_raw(csv_path)[0] is not None
+
+def read_columns(csv_path):
+    """
+    Returns {column: array} from a staged npy directory, memory-mapped.
+    String columns come back as pandas Categoricals over int32 codes.
+    """
+    path = staged_path(csv_path, 'npy')
+    meta = json.loads((path / META_FILE).read_text())
+    columns = {}
+    for name in meta['columns']:
+        values = np.load(path / f"{name}.npy", mmap_mode='r')
+        if name in meta['categories']:
+            values = pd.Categorical.from_codes(values, meta['categories'][name], validate=False)
+        columns[name] = values
+    return columns
+
+def read_raw(csv_path, date_columns=()):
+    """
+    Loads a raw file from its freshest variant. Staged variants return typed
+    columns (datetime64 dates, categorical strings); the CSV fallback parses
+    `date_columns` so callers see the same dtypes either way.
+    """
+    path, fmt = resolve_raw(csv_path)
+    if path is None:
+        raise FileNotFoundError(csv_path)
+    if fmt == 'feather':
+        return feather.read_table(path, memory_map=True).to_pandas()
+    if fmt == 'npy':
+        return pd.DataFrame(read_columns(csv_path), copy=False)
+    return pd.read_csv(path, parse_dates=list(date_columns))
+
+def iter_raw(csv_path, chunk_rows, date_columns=()):
+    """
+    Yields (chunk DataFrame, fraction of the file read) from the freshest
+    raw variant, `chunk_rows` rows at a time, with the same dtypes as
+    read_raw(). Only the current chunk is materialized: staged variants
+    slice their memory maps, the CSV is parsed incrementally.
+    """
+    path, fmt = resolve_raw(csv_path)
+    if path is None:
+        raise FileNotFoundError(csv_path)
+    if fmt == 'feather':
+        table = feather.read_table(path, memory_map=True)
+        for start in range(0, table.num_rows, chunk_rows):
+            chunk = table.slice(start, chunk_rows)
+            yield chunk.to_pandas(), (start + chunk.num_rows) / table.num_rows
+    elif fmt == 'npy':
+        columns = read_columns(csv_path)
+        n_rows = len(next(iter(columns.values())))
+        for start in range(0, n_rows, chunk_rows):
+            stop = min(start + chunk_rows, n_rows)
+            yield pd.DataFrame({col: values[start:stop] for col, values in columns.items()}), stop / n_rows
+    else:
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size or 1
+            # The parser reads ahead in blocks, so the file position is a close progress estimate
+            for chunk in pd.read_csv(f, chunksize=chunk_rows, parse_dates=list(date_columns)):
+                yield chunk, min(f.tell() / size, 1.0)
+
+def write_frame(df, csv_path, fmt):
+    """Writes a whole DataFrame as CSV or a typed staged file. Returns the path."""
+    if fmt == 'csv':
+        df.to_csv(csv_path, index=False)
+        return Path(csv_path)
+    categories = {
+        col: sorted(df[col].dropna().unique())
+        for col in df.columns if df[col].dtype == object or pd.api.types.is_string_dtype(df[col])
+    }
+    writer = ColumnWriter(csv_path, fmt, {col: str(df[col].dtype) for col in df.columns}, len(df), categories)
+    columns = {}
+    for col in df.columns:
+        if col in categories:
+            columns[col] = pd.Categorical(df[col], categories=categories[col]).codes
+        else:
+            columns[col] = df[col].to_numpy()
+    writer.write(columns)
+    return writer.close()
+
+class ColumnWriter:
+    """
+    Streams typed column chunks into a staged file of a known row count.
+    `dtypes` maps column -> NumPy dtype; columns listed in `categories` are
+    written as int32 codes into that label list.
+    """
+
+    def __init__(self, csv_path, fmt, dtypes, n_rows, categories=None):
+        self.fmt = fmt
+        self.path = staged_path(csv_path, fmt)
+        self.columns = list(dtypes)
+        self.categories = {col: [str(c) for c in labels] for col, labels in (categories or {}).items()}
+        self.offset = 0
+
+        if fmt == 'npy':
+            self.path.mkdir(parents=True, exist_ok=True)
+            # Metadata is written last, so a half-written directory is never read
+            for stale in [*self.path.glob("*.npy"), self.path / META_FILE]:
+                stale.unlink(missing_ok=True)
+            self._arrays = {
+                col: np.lib.format.open_memmap(
+                    self.path / f"{col}.npy", mode='w+', shape=(n_rows,),
+                    dtype=np.int32 if col in self.categories else np.dtype(dtypes[col]))
+                for col in self.columns
+            }
+        elif fmt == 'feather':
+            if not HAVE_PYARROW:
+                raise RuntimeError("Feather staging needs pyarrow; use fmt='npy' instead")
+            self._dictionaries = {col: pa.array(labels, pa.string()) for col, labels in self.categories.items()}
+            fields = [
+                pa.field(col, pa.dictionary(pa.int32(), pa.string()) if col in self.categories
+                         else pa.from_numpy_dtype(np.dtype(dtypes[col])))
+                for col in self.columns
+            ]
+            self._writer = pa.ipc.new_file(str(self.path), pa.schema(fields))
+        else:
+            raise ValueError(f"Unsupported staging format: {fmt}")
+
+    def write(self, columns):
+        n = len(next(iter(columns.values())))
+        if self.fmt == 'npy':
+            for col in self.columns:
+                self._arrays[col][self.offset:self.offset + n] = columns[col]
+        else:
+            arrays = [
+                pa.DictionaryArray.from_arrays(np.asarray(columns[col], dtype=np.int32), self._dictionaries[col])
+                if col in self.categories else pa.array(np.asarray(columns[col]))
+                for col in self.columns
+            ]
+            self._writer.write_batch(pa.record_batch(arrays, names=self.columns))
+        self.offset += n
+
+    def close(self):
+        if self.fmt == 'npy':
+            for array in self._arrays.values():
+                array.flush()
+            self._arrays.clear()
+            meta = {'columns': self.columns, 'categories': self.categories, 'rows': self.offset}
+            (self.path / META_FILE).write_text(json.dumps(meta))
+        else:
+            self._writer.close()
+        return self.path
+
+def _mtime(path):
+    # A column directory is as fresh as its metadata, written last
+    return (path / META_FILE).stat().st_mtime if path.is_dir() else path.stat().st_mtime
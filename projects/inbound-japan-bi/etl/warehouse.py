@@ -0,0 +1,181 @@
+"""
+Keyed writes into the star schema tables declared in schema.py.
+
+A builder either rebuilds a table (DDL, bulk insert, indexes, ANALYZE)
+or upserts only rows whose primary key is new or whose values changed.
+Both run in a single transaction: readers never see a half-written table.
+write_chunks() streams an iterable of DataFrames through the same path, so
+a large raw file never has to be held in memory at once.
+
+Daily facts (fact_* keyed by date_id) also record the months they
+rewrite in _changed_months, in the same transaction, so the monthly
+rollups can refresh exactly those months later.
+"""
+from contextlib import contextmanager
+
+import pandas as pd
+
+import schema
+
+STAGE_TABLE = "_stage"
+CHANGED_MONTHS_TABLE = "_changed_months"  # (table, month_id) written since the rollups last read them
+
+@contextmanager
+def transaction(conn):
+    conn.execute("BEGIN")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+def drop_unkeyed(df, key):
+    """
+    Rows missing a key column (e.g. no dimension match) cannot be stored
+    under the primary key. Returns (keyed rows, number of rows dropped).
+    """
+    missing = df[key].isna().any(axis=1)
+    skipped = int(missing.sum())
+    if skipped:
+        df = df[~missing]
+    # Keys joined from a dimension come back as float when any row missed
+    return df.astype({col: 'int64' for col in key if pd.api.types.is_float_dtype(df[col])}), skipped
+
+def python_values(series):
+    # tolist() yields Python scalars that sqlite3 can bind; NaN floats are stored as NULL
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        return series.tolist()
+    return series.astype(object).where(series.notna(), None).tolist()
+
+def insert_rows(conn, table, df):
+    columns = ", ".join(f'"{col}"' for col in df.columns)
+    placeholders = ", ".join("?" * len(df.columns))
+    rows = zip(*(python_values(df[col]) for col in df.columns))
+    conn.executemany(f'INSERT INTO "{table}" ({columns}) VALUES ({placeholders})', rows)
+
+def has_key(conn, table):
+    """True when `table` exists with its schema primary key, the conflict target of upsert()."""
+    info = sorted((row for row in conn.execute(f'PRAGMA table_info("{table}")') if row[5]), key=lambda row: row[5])
+    return [row[1] for row in info] == schema.primary_key(table)
+
+def tracks_months(table, key):
+    return table.startswith('fact_') and 'date_id' in key
+
+def mark_changed_months(conn, table, months_query):
+    """Records the month_id values returned by months_query as changed in `table`."""
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS "{CHANGED_MONTHS_TABLE}" (
+            table_name TEXT NOT NULL,
+            month_id INTEGER NOT NULL,
+            PRIMARY KEY (table_name, month_id)
+        ) WITHOUT ROWID
+    """)
+    conn.execute(f'INSERT OR IGNORE INTO "{CHANGED_MONTHS_TABLE}" SELECT DISTINCT ?, month_id FROM ({months_query})',
+                 (table,))
+
+def changed_months(conn, table):
+    """Months of `table` rewritten since clear_changed_months(), oldest first."""
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (CHANGED_MONTHS_TABLE,)).fetchone():
+        return []
+    rows = conn.execute(f'SELECT month_id FROM "{CHANGED_MONTHS_TABLE}" WHERE table_name = ? ORDER BY month_id',
+                        (table,))
+    return [month_id for month_id, in rows]
+
+def clear_changed_months(conn, table):
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (CHANGED_MONTHS_TABLE,)).fetchone():
+        conn.execute(f'DELETE FROM "{CHANGED_MONTHS_TABLE}" WHERE table_name = ?', (table,))
+
+def merge_rows(conn, df, table, key):
+    """
+    Upserts df into `table` inside the caller's transaction: new keys are
+    inserted, changed rows updated, identical rows left alone.
+    Returns (inserted, updated).
+    """
+    values = [col for col in df.columns if col not in key]
+    columns = ", ".join(f'"{col}"' for col in df.columns)
+    key_match = " AND ".join(f't."{col}" = s."{col}"' for col in key)
+
+    conn.execute(f'DROP TABLE IF EXISTS temp."{STAGE_TABLE}"')
+    # Same columns and types as the target, without its keys
+    conn.execute(f'CREATE TEMP TABLE "{STAGE_TABLE}" AS SELECT {columns} FROM "{table}" WHERE 0')
+    insert_rows(conn, STAGE_TABLE, df)
+
+    inserted = conn.execute(
+        f'SELECT COUNT(*) FROM temp."{STAGE_TABLE}" s WHERE NOT EXISTS (SELECT 1 FROM "{table}" t WHERE {key_match})'
+    ).fetchone()[0]
+    if tracks_months(table, key):
+        # New keys plus rows whose values differ: exactly what the upsert below rewrites
+        differs = " OR ".join([f't."{key[0]}" IS NULL'] + [f't."{col}" IS NOT s."{col}"' for col in values])
+        mark_changed_months(conn, table, f"""
+            SELECT s.date_id / 100 AS month_id FROM temp."{STAGE_TABLE}" s
+            LEFT JOIN "{table}" t ON {key_match} WHERE {differs}
+        """)
+    before = conn.total_changes
+    # "WHERE true" disambiguates ON CONFLICT from a join constraint
+    conn.execute(f"""
+        INSERT INTO "{table}" ({columns})
+        SELECT {columns} FROM temp."{STAGE_TABLE}" WHERE true
+        ON CONFLICT ({", ".join(key)}) DO UPDATE SET
+            {", ".join(f'"{col}" = excluded."{col}"' for col in values)}
+        WHERE {" OR ".join(f'"{table}"."{col}" IS NOT excluded."{col}"' for col in values)}
+    """)
+    changed = conn.total_changes - before
+    conn.execute(f'DROP TABLE temp."{STAGE_TABLE}"')
+    return inserted, changed - inserted
+
+def write_chunks(conn, chunks, table, incremental=False):
+    """
+    Loads an iterable of DataFrames into `table` in one transaction, holding
+    one chunk at a time. Rebuilds the table (DDL, inserts, then indexes)
+    unless `incremental` and the table already has its key, in which case
+    each chunk is upserted. Returns (inserted, updated).
+    """
+    key = schema.primary_key(table)
+    upserting = incremental and has_key(conn, table)
+    inserted = updated = skipped = 0
+    with transaction(conn):
+        if not upserting:
+            schema.create_table(conn, table)
+        for df in chunks:
+            df, dropped = drop_unkeyed(df, key)
+            skipped += dropped
+            if upserting:
+                new, changed = merge_rows(conn, df, table, key)
+                inserted += new
+                updated += changed
+            else:
+                insert_rows(conn, table, df)
+                inserted += len(df)
+        if not upserting:
+            # Secondary indexes are cheaper to build once than to maintain row by row
+            schema.create_indexes(conn, table)
+            if tracks_months(table, key):
+                mark_changed_months(conn, table, f'SELECT date_id / 100 AS month_id FROM "{table}"')
+        schema.analyze(conn, table)
+    if skipped:
+        print(f"⚠️ {table}: skipped {skipped} rows without a {'/'.join(key)} match")
+    return inserted, updated
+
+def replace_table(conn, df, table):
+    """Recreates `table` from its schema DDL and loads df. Returns rows written."""
+    return write_chunks(conn, [df], table)[0]
+
+def upsert(conn, df, table):
+    """
+    Inserts rows with a new key and updates rows whose values changed;
+    identical rows are left alone. Returns (inserted, updated).
+    Tables that are missing or were built without the key are rebuilt.
+    """
+    return write_chunks(conn, [df], table, incremental=True)
+
+def write_fact(conn, chunks, table, incremental=False):
+    """Rebuilds or upserts a fact table from a DataFrame or an iterable of chunks and prints the outcome."""
+    if isinstance(chunks, pd.DataFrame):
+        chunks = [chunks]
+    upserting = incremental and has_key(conn, table)
+    inserted, updated = write_chunks(conn, chunks, table, incremental)
+    if upserting:
+        print(f"✅ {table} upserted: {inserted} new, {updated} changed rows")
+    else:
+        print(f"✅ {table} created: {inserted} rows")
@@ -1,8 +1,17 @@
-import requests
 import json
 import time
 import os
+import sys
 from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common.http_cache import CachedSession
+
+# Shared on-disk response cache (Jikan is strictly rate limited)
+CACHE_FILE = Path(__file__).parent.parent / "data" / "cache" / "http_cache.sqlite"
+CACHE_TTL = 20 * 3600  # Reuse responses within a day, refresh on the next daily run
+SESSION = CachedSession(CACHE_FILE, ttl=CACHE_TTL)
 
 # Ensure data directory exists
 os.makedirs('data', exist_ok=True)
@@ -75,8 +84,9 @@ def fetch_anime_data(mal_id):
     """Fetch anime data from Jikan API"""
     url = f"{JIKAN_BASE_URL}/anime/{mal_id}/full"
     try:
-        response = requests.get(url, timeout=15)
-        time.sleep(1.5)  # Rate limiting (Jikan is strict)
+        response = SESSION.get(url, timeout=15)
+        if not response.from_cache:
+            time.sleep(1.5)  # Rate limiting (Jikan is strict)
         
         if response.status_code == 200:
             return response.json()['data']
@@ -105,6 +115,7 @@ def extract_all():
         json.dump(results, f, indent=2, ensure_ascii=False)
     
     print(f"✅ Extracted {len(results)} anime records to {output_file}")
+    print(f"   {SESSION.summary()}")
     return results
 
 if __name__ == '__main__':
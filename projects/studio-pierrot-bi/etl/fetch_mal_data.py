@@ -4,10 +4,19 @@ Saves raw JSON responses to data/raw/mal_anime.json
 """
 import requests
 import json
+import sys
 import time
 from pathlib import Path
 from typing import List, Dict
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common.http_cache import CachedSession
+
+# Shared on-disk response cache (Jikan is strictly rate limited)
+CACHE_FILE = Path(__file__).parent.parent / "data" / "cache" / "http_cache.sqlite"
+CACHE_TTL = 20 * 3600  # Reuse responses within a day, refresh on the next daily run
+SESSION = CachedSession(CACHE_FILE, ttl=CACHE_TTL)
+
 # Jikan API base URL
 JIKAN_BASE = "https://api.jikan.moe/v4"
 
@@ -43,8 +52,9 @@ def fetch_anime_details(mal_id: int) -> Dict:
     """Fetch detailed anime information from Jikan API."""
     url = f"{JIKAN_BASE}/anime/{mal_id}/full"
     
+    response = None
     try:
-        response = requests.get(url, timeout=10)
+        response = SESSION.get(url, timeout=10)
         response.raise_for_status()
         data = response.json()
         
@@ -59,13 +69,18 @@ def fetch_anime_details(mal_id: int) -> Dict:
     except requests.exceptions.RequestException as e:
         print(f"✗ Error fetching MAL ID {mal_id}: {e}")
         return None
+    finally:
+        # Rate limiting (Jikan allows 3 req/sec, being conservative); failed requests count too
+        if response is None or not response.from_cache:
+            time.sleep(1)
 
 def fetch_anime_statistics(mal_id: int) -> Dict:
     """Fetch anime statistics (watching, completed, dropped, etc.)."""
     url = f"{JIKAN_BASE}/anime/{mal_id}/statistics"
     
+    response = None
     try:
-        response = requests.get(url, timeout=10)
+        response = SESSION.get(url, timeout=10)
         response.raise_for_status()
         data = response.json()
         
@@ -77,6 +92,9 @@ def fetch_anime_statistics(mal_id: int) -> Dict:
     except requests.exceptions.RequestException as e:
         print(f"✗ Error fetching statistics for MAL ID {mal_id}: {e}")
         return None
+    finally:
+        if response is None or not response.from_cache:
+            time.sleep(1)  # Rate limiting
 
 def main():
     """Main ETL process to fetch MAL data."""
@@ -103,7 +121,6 @@ def main():
         
         if anime_data:
             # Fetch statistics
-            time.sleep(1)  # Rate limiting (Jikan allows 3 req/sec, being conservative)
             stats = fetch_anime_statistics(mal_id)
             
             if stats:
@@ -111,8 +128,6 @@ def main():
             
             all_anime_data.append(anime_data)
         
-        # Rate limiting
-        time.sleep(1)
         print()
     
     # Save to JSON
@@ -122,6 +137,7 @@ def main():
     
     print("=" * 60)
     print(f"✓ Saved {len(all_anime_data)} anime records to {output_file}")
+    print(f"  {SESSION.summary()}")
     print("=" * 60)
     
     # Summary
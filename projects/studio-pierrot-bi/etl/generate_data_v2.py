@@ -2,6 +2,11 @@ import sqlite3
 from datetime import datetime, timedelta
 import random
 import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common.sqlite_bulk import bulk_load
 
 # Configuration
 DB_PATH = 'studio_pierrot.db'
@@ -161,14 +166,14 @@ def generate_facts():
 
     print(f"Generated {len(fact_rows)} daily fact rows.")
     
-    # Batch insert
-    cursor.executemany('''
-        INSERT INTO fact_daily_performance 
-        (date_id, anime_id, platform_id, region_id, views, watch_time_minutes, revenue_usd, unique_viewers, avg_completion_rate, social_mentions, sentiment_score)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', fact_rows)
-
-    conn.commit()
+    # Batch insert under bulk-load settings; the fact indexes are built once afterwards
+    with bulk_load(conn, defer_indexes=['fact_daily_performance']):
+        cursor.executemany('''
+            INSERT INTO fact_daily_performance 
+            (date_id, anime_id, platform_id, region_id, views, watch_time_minutes, revenue_usd, unique_viewers, avg_completion_rate, social_mentions, sentiment_score)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', fact_rows)
+        conn.commit()
     conn.close()
     print("Facts populated.")
 
@@ -7,12 +7,15 @@ Key figures:
 - Revenue split: 72% merchandising, 28% streaming
 - Industry total: ~¥3.8 trillion ($25B USD) in 2024
 """
-import requests
 import json
+import sys
 import time
 import csv
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common.http_cache import CachedSession
+
 # Studio/Producer IDs from MAL/Jikan
 STUDIOS = {
     'pierrot': 1,  # Studio Pierrot
@@ -25,6 +28,11 @@ STUDIOS = {
 BASE_URL = "https://api.jikan.moe/v4"
 OUTPUT_DIR = Path(__file__).parent.parent / "data" / "raw"
 
+# Shared on-disk response cache (Jikan is strictly rate limited)
+CACHE_FILE = Path(__file__).parent.parent / "data" / "cache" / "http_cache.sqlite"
+CACHE_TTL = 20 * 3600  # Reuse responses within a day, refresh on the next daily run
+SESSION = CachedSession(CACHE_FILE, ttl=CACHE_TTL)
+
 def fetch_anime_by_producer(producer_id, studio_name, limit=50):
     """Fetch anime from a specific producer/studio"""
     anime_list = []
@@ -36,8 +44,9 @@ def fetch_anime_by_producer(producer_id, studio_name, limit=50):
         url = f"{BASE_URL}/anime?producers={producer_id}&page={page}&limit=25&order_by=members&sort=desc"
         
         try:
-            response = requests.get(url)
-            time.sleep(1.5)  # Rate limiting
+            response = SESSION.get(url)
+            if not response.from_cache:
+                time.sleep(1.5)  # Rate limiting
             
             if response.status_code != 200:
                 print(f"  Error {response.status_code} on page {page}")
@@ -173,6 +182,7 @@ def main():
     all_anime.extend(fetch_anime_by_producer(STUDIOS['madhouse'], 'Madhouse', limit=50))
     
     print(f"\n✓ Total anime fetched: {len(all_anime)}")
+    print(f"  {SESSION.summary()}")
     
     # Save raw MAL data
     mal_output = OUTPUT_DIR / "mal_anime.json"
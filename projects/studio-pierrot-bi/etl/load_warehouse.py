@@ -5,9 +5,13 @@ Transforms and loads data into dimension and fact tables.
 import sqlite3
 import json
 import csv
+import sys
 from pathlib import Path
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from common.sqlite_bulk import bulk_load
+
 def load_mal_data():
     """Load MAL anime JSON data."""
     data_file = Path(__file__).parent.parent / "data" / "raw" / "mal_anime.json"
@@ -266,32 +270,34 @@ def main():
     conn = sqlite3.connect(db_path)
     
     try:
-        # Clear existing data
-        clear_tables(conn)
-        print()
-        
-        # Load raw data
-        print("Loading raw data files...")
-        anime_data = load_mal_data()
-        production_data = load_csv_data("production.csv")
-        marketing_data = load_csv_data("marketing.csv")
-        financial_data = load_csv_data("financials.csv")
-        print(f"✓ Loaded all raw data files")
-        print()
-        
-        # Load dimensions first
-        print("Loading dimension tables...")
-        mal_to_anime_id = load_dim_anime(conn, anime_data)
-        load_dim_season(conn, production_data, mal_to_anime_id)
-        print()
-        
-        # Load facts
-        print("Loading fact tables...")
-        load_fact_anime_metrics(conn, anime_data, mal_to_anime_id)
-        load_fact_marketing(conn, marketing_data, mal_to_anime_id)
-        load_fact_finance(conn, financial_data, mal_to_anime_id)
-        print()
-        
+        # WAL, relaxed sync and indexes rebuilt once after the load
+        with bulk_load(conn, defer_indexes=sorted(VALID_TABLES)):
+            # Clear existing data
+            clear_tables(conn)
+            print()
+
+            # Load raw data
+            print("Loading raw data files...")
+            anime_data = load_mal_data()
+            production_data = load_csv_data("production.csv")
+            marketing_data = load_csv_data("marketing.csv")
+            financial_data = load_csv_data("financials.csv")
+            print(f"✓ Loaded all raw data files")
+            print()
+
+            # Load dimensions first
+            print("Loading dimension tables...")
+            mal_to_anime_id = load_dim_anime(conn, anime_data)
+            load_dim_season(conn, production_data, mal_to_anime_id)
+            print()
+
+            # Load facts
+            print("Loading fact tables...")
+            load_fact_anime_metrics(conn, anime_data, mal_to_anime_id)
+            load_fact_marketing(conn, marketing_data, mal_to_anime_id)
+            load_fact_finance(conn, financial_data, mal_to_anime_id)
+            print()
+
         # Verification
         print("=" * 70)
         print("Data Warehouse Load Summary")